@@ -25,10 +25,16 @@ import models.invoice
 import models.payment
 import models.subscription
 import models.promo
+import models.revenue
 import models.target
 import models.task
 import models.territory
 import models.comment
+import models.notification
+import models.backup
+import models.job_run
+import models.email_outbox
+import models.kv_entry
 
 # Alembic config
 config = context.config
@@ -0,0 +1,56 @@
+"""add user_daily_revenue rollup table
+
+Revision ID: 202610171000
+Revises: 202604101500
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171000"
+down_revision: Union[str, Sequence[str], None] = "202604101500"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_daily_revenue",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("closed_won_amount", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("deal_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "day", name="uq_user_daily_revenue_user_day"),
+    )
+    op.create_index(op.f("ix_user_daily_revenue_id"), "user_daily_revenue", ["id"], unique=False)
+    op.create_index(op.f("ix_user_daily_revenue_user_id"), "user_daily_revenue", ["user_id"], unique=False)
+    op.create_index(op.f("ix_user_daily_revenue_day"), "user_daily_revenue", ["day"], unique=False)
+
+    # Backfill from existing CLOSED_WON deals (same rules as target achievement).
+    op.execute(
+        """
+        INSERT INTO user_daily_revenue (user_id, day, closed_won_amount, deal_count)
+        SELECT assigned_to, CAST(close_date AS DATE), COALESCE(SUM(amount), 0), COUNT(id)
+        FROM deals
+        WHERE assigned_to IS NOT NULL
+          AND stage = 'CLOSED_WON'
+          AND close_date IS NOT NULL
+        GROUP BY assigned_to, CAST(close_date AS DATE)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_user_daily_revenue_day"), table_name="user_daily_revenue")
+    op.drop_index(op.f("ix_user_daily_revenue_user_id"), table_name="user_daily_revenue")
+    op.drop_index(op.f("ix_user_daily_revenue_id"), table_name="user_daily_revenue")
+    op.drop_table("user_daily_revenue")
@@ -0,0 +1,86 @@
+"""add denormalized company_id to CRM entity tables
+
+Revision ID: 202610171100
+Revises: 202610171000
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171100"
+down_revision: Union[str, Sequence[str], None] = "202610171000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL_BATCH_SIZE = 5000
+
+# table -> user columns the tenant is derived from, in priority order (mirrors models/tenant.py)
+TENANT_TABLES = {
+    "accounts": ("assigned_to", "created_by"),
+    "contacts": ("assigned_to", "created_by"),
+    "deals": ("assigned_to", "created_by"),
+    "tasks": ("assigned_to", "created_by"),
+    "calls": ("assigned_to", "created_by"),
+    "meetings": ("assigned_to", "created_by"),
+    "quotes": ("assigned_to", "created_by"),
+    "statements_of_account": ("created_by", "assigned_to"),
+    "leads": ("lead_owner", "created_by"),
+    "comments": ("comment_by",),
+}
+
+
+def _fk_name(table: str) -> str:
+    return f"fk_{table}_company_id_companies"
+
+
+def _backfill(conn, table: str, source_columns) -> None:
+    """Fill company_id in id-range batches so no single UPDATE locks the whole table."""
+    lookups = ", ".join(
+        f"(SELECT u.related_to_company FROM users u WHERE u.id = {table}.{column})"
+        for column in source_columns
+    )
+    company_expr = f"COALESCE({lookups})" if len(source_columns) > 1 else lookups
+
+    bounds = conn.execute(text(f"SELECT MIN(id), MAX(id) FROM {table}")).first()
+    if not bounds or bounds[0] is None:
+        return
+
+    low, high = bounds
+    while low <= high:
+        conn.execute(
+            text(
+                f"UPDATE {table} SET company_id = {company_expr} "
+                f"WHERE id >= :low AND id < :upper AND company_id IS NULL"
+            ),
+            {"low": low, "upper": low + BACKFILL_BATCH_SIZE},
+        )
+        low += BACKFILL_BATCH_SIZE
+
+
+def upgrade() -> None:
+    for table in TENANT_TABLES:
+        op.add_column(table, sa.Column("company_id", sa.Integer(), nullable=True))
+        op.create_foreign_key(_fk_name(table), table, "companies", ["company_id"], ["id"], ondelete="CASCADE")
+
+    # Each batch commits on its own so large tenants are not backfilled in one transaction.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for table, source_columns in TENANT_TABLES.items():
+            _backfill(conn, table, source_columns)
+
+    for table in TENANT_TABLES:
+        op.create_index(op.f(f"ix_{table}_company_id"), table, ["company_id"], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(list(TENANT_TABLES)):
+        op.drop_index(op.f(f"ix_{table}_company_id"), table_name=table)
+        op.drop_constraint(_fk_name(table), table, type_="foreignkey")
+        op.drop_column(table, "company_id")
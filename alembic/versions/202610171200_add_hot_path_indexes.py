@@ -0,0 +1,76 @@
+"""add composite and partial indexes for hot query paths
+
+Revision ID: 202610171200
+Revises: 202610171100
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171200"
+down_revision: Union[str, Sequence[str], None] = "202610171100"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial WHERE or None) -- mirrors backend/models/indexes.py
+INDEXES = [
+    ("ix_audit_logs_user_id_timestamp", "audit_logs", ["user_id", "timestamp", "id"], None),
+    ("ix_audit_logs_user_id_unread", "audit_logs", ["user_id"], "is_read = false"),
+    ("ix_deals_assigned_to_stage_close_date", "deals", ["assigned_to", "stage", "close_date"], None),
+    ("ix_subscriptions_company_id_created_at", "subscriptions", ["company_id", "created_at", "id"], None),
+    ("ix_subscriptions_live_end_date", "subscriptions", ["end_date"], "status IN ('Active', 'Trial')"),
+    ("ix_subscriptions_active_company_id", "subscriptions", ["company_id"], "status = 'Active'"),
+    ("ix_subscriptions_trial_end_date", "subscriptions", ["end_date"], "status = 'Trial' AND is_trial = true"),
+    ("ix_subscriptions_promo_discount_ends_at", "subscriptions", ["promo_discount_ends_at"], "promo_discount_is_active = true"),
+    ("ix_users_related_to_company_role", "users", ["related_to_company", "role"], None),
+    ("ix_territories_manager_id_user_id", "territories", ["manager_id", "user_id"], None),
+    ("ix_territories_user_id", "territories", ["user_id"], None),
+    ("ix_accounts_assigned_to", "accounts", ["assigned_to"], None),
+    ("ix_accounts_created_by", "accounts", ["created_by"], None),
+    ("ix_contacts_assigned_to", "contacts", ["assigned_to"], None),
+    ("ix_contacts_created_by", "contacts", ["created_by"], None),
+    ("ix_deals_created_by", "deals", ["created_by"], None),
+    ("ix_leads_lead_owner", "leads", ["lead_owner"], None),
+    ("ix_leads_created_by", "leads", ["created_by"], None),
+    ("ix_tasks_assigned_to", "tasks", ["assigned_to"], None),
+    ("ix_tasks_created_by", "tasks", ["created_by"], None),
+    ("ix_calls_assigned_to", "calls", ["assigned_to"], None),
+    ("ix_calls_created_by", "calls", ["created_by"], None),
+    ("ix_meetings_assigned_to", "meetings", ["assigned_to"], None),
+    ("ix_meetings_created_by", "meetings", ["created_by"], None),
+    ("ix_quotes_assigned_to", "quotes", ["assigned_to"], None),
+    ("ix_quotes_created_by", "quotes", ["created_by"], None),
+    ("ix_statements_of_account_created_by", "statements_of_account", ["created_by"], None),
+    ("ix_contacts_account_id", "contacts", ["account_id"], None),
+    ("ix_deals_account_id", "deals", ["account_id"], None),
+    ("ix_quotes_account_id", "quotes", ["account_id"], None),
+    ("ix_tasks_related_to_account", "tasks", ["related_to_account"], None),
+    ("ix_calls_related_to_account", "calls", ["related_to_account"], None),
+    ("ix_meetings_related_to_account", "meetings", ["related_to_account"], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on PostgreSQL so writes are not blocked while large tables are indexed;
+    # that cannot run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            kwargs = {}
+            if where:
+                kwargs.update(postgresql_where=sa.text(where), sqlite_where=sa.text(where))
+            op.create_index(
+                name, table, columns, unique=False, if_not_exists=True,
+                postgresql_concurrently=True, **kwargs
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,53 @@
+"""add notification_counters (unread badge counts) and the replay cursor index
+
+Revision ID: 202610171300
+Revises: 202610171200
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171300"
+down_revision: Union[str, Sequence[str], None] = "202610171200"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_counters",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_log_id", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+    # Backfill from existing audit logs
+    op.execute(
+        """
+        INSERT INTO notification_counters (user_id, unread_count, last_log_id)
+        SELECT user_id,
+               SUM(CASE WHEN is_read = false THEN 1 ELSE 0 END),
+               MAX(id)
+        FROM audit_logs
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_audit_logs_user_id_id", "audit_logs", ["user_id", "id"], unique=False,
+            if_not_exists=True, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_audit_logs_user_id_id", table_name="audit_logs", if_exists=True, postgresql_concurrently=True)
+    op.drop_table("notification_counters")
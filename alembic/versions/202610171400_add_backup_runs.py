@@ -0,0 +1,46 @@
+"""add backup_runs (full / differential backup history per company)
+
+Revision ID: 202610171400
+Revises: 202610171300
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171400"
+down_revision: Union[str, Sequence[str], None] = "202610171300"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "backup_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_id", sa.Integer(), sa.ForeignKey("companies.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("mode", sa.String(length=20), nullable=False, server_default="full"),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("backup_runs.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("base_id", sa.Integer(), sa.ForeignKey("backup_runs.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("since", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("snapshot_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="running"),
+        sa.Column("tables_exported", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rows_exported", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("deletions", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_backup_runs_id", "backup_runs", ["id"])
+    op.create_index("ix_backup_runs_company_id", "backup_runs", ["company_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backup_runs_company_id", table_name="backup_runs")
+    op.drop_index("ix_backup_runs_id", table_name="backup_runs")
+    op.drop_table("backup_runs")
@@ -0,0 +1,44 @@
+"""backup_runs as background jobs: trigger, error, on-disk artifact and expiry
+
+Revision ID: 202610171500
+Revises: 202610171400
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171500"
+down_revision: Union[str, Sequence[str], None] = "202610171400"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("backup_runs", sa.Column("trigger", sa.String(length=20), nullable=False, server_default="manual"))
+    op.add_column("backup_runs", sa.Column("error", sa.String(length=500), nullable=True))
+    op.add_column("backup_runs", sa.Column("artifact_path", sa.String(length=500), nullable=True))
+    op.add_column("backup_runs", sa.Column("artifact_bytes", sa.BigInteger(), nullable=True))
+    op.add_column("backup_runs", sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("backup_runs", sa.Column("started_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_backup_runs_artifact_expires_at",
+        "backup_runs",
+        ["expires_at"],
+        postgresql_where=sa.text("artifact_path IS NOT NULL"),
+        sqlite_where=sa.text("artifact_path IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backup_runs_artifact_expires_at", table_name="backup_runs")
+    op.drop_column("backup_runs", "started_at")
+    op.drop_column("backup_runs", "expires_at")
+    op.drop_column("backup_runs", "artifact_bytes")
+    op.drop_column("backup_runs", "artifact_path")
+    op.drop_column("backup_runs", "error")
+    op.drop_column("backup_runs", "trigger")
@@ -0,0 +1,43 @@
+"""add job_runs (scheduled job history)
+
+Revision ID: 202610171600
+Revises: 202610171500
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171600"
+down_revision: Union[str, Sequence[str], None] = "202610171500"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.String(length=100), nullable=False),
+        sa.Column("worker_id", sa.String(length=200), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="running"),
+        sa.Column("rows_affected", sa.Integer(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_job_runs_id", "job_runs", ["id"])
+    op.create_index("ix_job_runs_job_id_started_at", "job_runs", ["job_id", "started_at"])
+    op.create_index("ix_job_runs_started_at", "job_runs", ["started_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_runs_started_at", table_name="job_runs")
+    op.drop_index("ix_job_runs_job_id_started_at", table_name="job_runs")
+    op.drop_index("ix_job_runs_id", table_name="job_runs")
+    op.drop_table("job_runs")
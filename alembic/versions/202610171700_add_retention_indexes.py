@@ -0,0 +1,38 @@
+"""indexes for chunked retention deletes (audit_logs by age, converted leads by updated_at)
+
+Revision ID: 202610171700
+Revises: 202610171600
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171700"
+down_revision: Union[str, Sequence[str], None] = "202610171600"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_audit_logs_timestamp", "audit_logs", ["timestamp"], unique=False,
+            if_not_exists=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            "ix_leads_converted_updated_at", "leads", ["updated_at"], unique=False,
+            if_not_exists=True, postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'Converted'"),
+            sqlite_where=sa.text("status = 'Converted'"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_leads_converted_updated_at", table_name="leads", if_exists=True, postgresql_concurrently=True)
+        op.drop_index("ix_audit_logs_timestamp", table_name="audit_logs", if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""add kv_entries (shared short-lived key/value store)
+
+Revision ID: 202610171900
+Revises: 202610171800
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "202610171900"
+down_revision: Union[str, Sequence[str], None] = "202610171800"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "kv_entries",
+        sa.Column("key", sa.String(length=255), primary_key=True),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_kv_entries_expires_at", "kv_entries", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_kv_entries_expires_at", table_name="kv_entries")
+    op.drop_table("kv_entries")
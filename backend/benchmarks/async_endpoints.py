@@ -0,0 +1,262 @@
+"""Requests per second of one worker on the sync vs the async (AsyncSession) read endpoints.
+
+Seeds a scratch database, starts a single Uvicorn worker on it and load-tests the read
+endpoints that moved to get_async_db (/auth/me, /logs/notifications, /announcements/current,
+/deals/admin/fetch-all). The same worker also serves sync twins of the previous handlers
+under /api/bench-sync (def handlers on get_db, run in Starlette's threadpool), so
+"before" and "after" share one process, database and seed. Every endpoint is driven by
+--concurrency clients for --seconds, signed in as the CEOs of the seeded tenants. Run
+from the backend folder against a throwaway database:
+
+    python -m benchmarks.async_endpoints --database-url sqlite:///./async_bench.db
+    python -m benchmarks.async_endpoints --database-url postgresql://localhost/crm_bench --concurrency 16 --concurrency 32
+
+The load generator shares the machine with the worker; on a single core, compare the two
+modes with each other rather than with production numbers. From 40 clients (Starlette's
+threadpool size) the sync twins can stall for DB_POOL_TIMEOUT when the sync pool is
+smaller than that: every thread waits for a connection and get_db's cleanup, which would
+return one, needs a thread too. The async handlers only queue on the pool.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from jose import jwt
+from sqlalchemy import create_engine, text
+
+from benchmarks.index_advisor import seed
+
+BENCH_SECRET_KEY = "async-endpoints-bench"
+BENCH_PORT = 8765
+
+# label -> (before path, after path)
+ENDPOINTS = {
+    "auth_me": ("/api/bench-sync/auth/me", "/api/auth/me"),
+    "notifications": ("/api/bench-sync/logs/notifications", "/api/logs/notifications"),
+    "announcement": ("/api/bench-sync/announcements/current", "/api/announcements/current"),
+    "deals_fetch_all": ("/api/bench-sync/deals/admin/fetch-all?limit=50", "/api/deals/admin/fetch-all?limit=50"),
+}
+
+
+# =====================================================
+# Worker app: the application plus sync twins of the migrated handlers
+# =====================================================
+def create_app():
+    """Uvicorn factory (runs in the worker process)."""
+    from typing import List, Optional, Union
+
+    from fastapi import APIRouter, Depends, HTTPException, Request
+    from sqlalchemy import or_
+    from sqlalchemy.orm import Session, joinedload
+
+    import main
+    from database import get_db
+    from models.announcement import Announcement
+    from models.auditlog import Auditlog
+    from models.auth import User
+    from models.deal import Deal
+    from routers.auth_utils import get_current_user
+    from routers.deal import DEAL_LIST_SPEC
+    from routers.pagination_utils import ListParams, list_params, paginate_query
+    from schemas.announcement import AnnouncementResponse
+    from schemas.auditlog import LeadResponse
+    from schemas.auth import UserResponse
+    from schemas.deal import DealResponse
+    from schemas.pagination import Page
+    from services.role_scope import scoped_query
+
+    router = APIRouter(prefix="/api/bench-sync")
+
+    @router.get("/auth/me", response_model=UserResponse)
+    def me(request: Request, db: Session = Depends(get_db)):
+        user = get_current_user(request, db)
+        user = db.query(User).options(joinedload(User.company)).filter(User.id == user.id).first()
+        if user.company and not user.company.is_subscription_active:
+            raise HTTPException(status_code=403, detail="Company subscription has been suspended.")
+        return user
+
+    @router.get("/logs/notifications", response_model=List[LeadResponse])
+    def notifications(limit: Optional[int] = None, db: Session = Depends(get_db),
+                      current_user: User = Depends(get_current_user)):
+        return (
+            db.query(Auditlog)
+            .filter(Auditlog.user_id == current_user.id)
+            .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
+            .limit(limit or 50)
+            .all()
+        )
+
+    @router.get("/announcements/current", response_model=AnnouncementResponse)
+    def announcement(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+        now_utc = datetime.now(timezone.utc)
+        active = (
+            Announcement.is_active == True,
+            Announcement.starts_at <= now_utc,
+            or_(Announcement.ends_at.is_(None), Announcement.ends_at >= now_utc),
+        )
+        order = (Announcement.starts_at.desc(), Announcement.created_at.desc())
+        row = (
+            db.query(Announcement).filter(*active, Announcement.target_role == (current_user.role or "").upper())
+            .order_by(*order).first()
+            or db.query(Announcement).filter(*active, Announcement.target_role == "ALL").order_by(*order).first()
+        )
+        if not row:
+            return AnnouncementResponse(message="", target_role="ALL", starts_at=None, ends_at=None, updated_at=None)
+        return AnnouncementResponse(message=row.message, target_role=row.target_role, starts_at=row.starts_at,
+                                    ends_at=row.ends_at, updated_at=row.updated_at or row.created_at)
+
+    @router.get("/deals/admin/fetch-all", response_model=Union[List[DealResponse], Page[DealResponse]])
+    def deals(params: ListParams = Depends(list_params), db: Session = Depends(get_db),
+              current_user: User = Depends(get_current_user)):
+        query = scoped_query(db, current_user, Deal).options(joinedload(Deal.deal_creator))
+        return paginate_query(query, DEAL_LIST_SPEC, params)
+
+    # Ahead of the SPA catch-all route
+    main.app.router.routes[0:0] = router.routes
+    return main.app
+
+
+# =====================================================
+# Load generation
+# =====================================================
+async def _drive(base_url: str, path: str, tokens: list, concurrency: int, seconds: float) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop(token: str):
+        nonlocal errors
+        async with httpx.AsyncClient(base_url=base_url, cookies={"access_token": token}, timeout=30) as client:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(tokens[i % len(tokens)]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1) if latencies else None,
+    }
+
+
+def _wait_until_up(base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("benchmark worker exited during startup")
+        try:
+            httpx.get(f"{base_url}/api/auth/me", timeout=1)
+            return
+        except httpx.TransportError:
+            time.sleep(0.25)
+    raise RuntimeError("benchmark worker did not start")
+
+
+def _tokens(engine) -> list:
+    with engine.connect() as conn:
+        ceo_ids = conn.execute(text("SELECT id FROM users WHERE role = 'CEO' ORDER BY id")).scalars().all()
+    expires = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [jwt.encode({"sub": str(user_id), "exp": expires}, BENCH_SECRET_KEY, algorithm="HS256") for user_id in ceo_ids]
+
+
+def _seed_announcements(engine):
+    with engine.begin() as conn:
+        if not conn.execute(text("SELECT COUNT(*) FROM announcements")).scalar():
+            conn.execute(
+                text("INSERT INTO announcements (message, target_role, is_active, starts_at, created_at) "
+                     "VALUES (:message, 'ALL', :active, :starts_at, :starts_at)"),
+                {"message": "Benchmark announcement", "active": True,
+                 "starts_at": datetime.now(timezone.utc) - timedelta(days=1)},
+            )
+
+
+def run(database_url: str, companies: int, concurrencies: list, seconds: float, seed_value: int) -> list:
+    engine = create_engine(database_url)
+    seed(engine, random.Random(seed_value), companies, users_per_company=25, deals_per_user=40, logs_per_user=200)
+    _seed_announcements(engine)
+    tokens = _tokens(engine)
+    engine.dispose()
+
+    env = {**os.environ, "DATABASE_URL": database_url, "SECRET_KEY": BENCH_SECRET_KEY}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "benchmarks.async_endpoints:create_app",
+         "--port", str(BENCH_PORT), "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{BENCH_PORT}"
+    results = []
+    try:
+        _wait_until_up(base_url, server)
+        for label, paths in ENDPOINTS.items():
+            for concurrency in concurrencies:
+                for mode, path in zip(("sync", "async"), paths):
+                    asyncio.run(_drive(base_url, path, tokens, concurrency, min(seconds, 1.0)))  # warm up
+                    row = asyncio.run(_drive(base_url, path, tokens, concurrency, seconds))
+                    row.update(endpoint=label, mode=mode, concurrency=concurrency)
+                    results.append(row)
+                    print(f"[Async Endpoints] {label:<16} {mode:<5} c={concurrency:<4} {row['per_second']:>8}/s "
+                          f"p50={row['p50_ms']}ms p95={row['p95_ms']}ms errors={row['errors']}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return results
+
+
+def print_report(results: list):
+    print(f"\n{'endpoint':<18}{'clients':>8}{'sync req/s':>12}{'async req/s':>13}{'change':>9}"
+          f"{'sync p95':>10}{'async p95':>11}")
+    print("-" * 81)
+    rows = {(row["endpoint"], row["concurrency"], row["mode"]): row for row in results}
+    for endpoint, concurrency in sorted({(row["endpoint"], row["concurrency"]) for row in results},
+                                        key=lambda key: (list(ENDPOINTS).index(key[0]), key[1])):
+        before, after = rows[(endpoint, concurrency, "sync")], rows[(endpoint, concurrency, "async")]
+        change = f"{after['per_second'] / before['per_second']:.2f}x" if before["per_second"] else "-"
+        print(f"{endpoint:<18}{concurrency:>8}{before['per_second']:>12}{after['per_second']:>13}{change:>9}"
+              f"{str(before['p95_ms']):>10}{str(after['p95_ms']):>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Requests/sec of one worker: sync vs AsyncSession read endpoints.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="Scratch database (never the app database)")
+    parser.add_argument("--companies", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, action="append", dest="concurrencies",
+                        help="Concurrent clients; repeatable (default: 8 and 32)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Measured duration per endpoint, mode and concurrency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+    if args.database_url == os.getenv("DATABASE_URL"):
+        parser.error("refusing to seed the application database; point --database-url at a scratch database")
+
+    report = run(args.database_url, args.companies, args.concurrencies or [8, 32], args.seconds, args.seed)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n[Async Endpoints] Results written to {args.json_path}")
@@ -0,0 +1,182 @@
+"""Peak memory of the CSV backup export against tenant size.
+
+Grows one synthetic tenant step by step (audit logs and deals) and, at every step,
+exports it twice in a fresh child process -- once with the previous in-memory
+approach (every CSV built in a StringIO, the archive in a BytesIO) and once with
+services.backup_export.stream_backup_zip -- reporting the child's peak RSS. Run from
+the backend folder against a throwaway database:
+
+    python -m benchmarks.backup_rss --database-url sqlite:///./backup_bench.db
+    python -m benchmarks.backup_rss --database-url postgresql://localhost/crm_bench --steps 5
+
+Streaming RSS should stay flat while the buffered column grows with the row count.
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+import models  # noqa: F401  (registers every table for the export)
+from benchmarks.index_advisor import _insert, seed
+from models import Account, Auditlog, Deal, User
+from services.backup_export import ExportStats, exportable_models, scoped_select, serialize_csv_value, stream_backup_zip
+
+BENCH_COMPANY_ID = 1
+
+
+# =====================================================
+# Exporters under test
+# =====================================================
+def buffered_backup_zip(db, company_id, company_user_ids, stats):
+    """The previous exporter: whole CSVs and the whole archive in memory, then chunked out."""
+    with io.BytesIO() as buffer:
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for table_name, model in exportable_models():
+                fieldnames = [c.key for c in model.__mapper__.columns]
+                output = io.StringIO(newline="")
+                writer = csv.writer(output)
+                writer.writerow(fieldnames)
+                for row in db.execute(scoped_select(model, company_id, company_user_ids)):
+                    writer.writerow([serialize_csv_value(value) for value in row])
+                    stats.rows_exported += 1
+                zf.writestr(f"{table_name}.csv", output.getvalue().encode("utf-8"))
+                stats.tables_exported += 1
+        buffer.seek(0)
+        while True:
+            chunk = buffer.read(8192)
+            if not chunk:
+                break
+            stats.bytes_written += len(chunk)
+            yield chunk
+
+
+EXPORTERS = {"buffered": buffered_backup_zip, "streaming": stream_backup_zip}
+
+
+def _measure_child(database_url: str, exporter: str, queue):
+    engine = create_engine(database_url)
+    db = sessionmaker(bind=engine)()
+    try:
+        user_ids = [row[0] for row in db.execute(select(User.id).where(User.related_to_company == BENCH_COMPANY_ID))]
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        stats = ExportStats()
+        started = time.perf_counter()
+        for _chunk in EXPORTERS[exporter](db, BENCH_COMPANY_ID, user_ids, stats):
+            pass  # sent to the client in the app; discarded here
+        elapsed = time.perf_counter() - started
+
+        queue.put({
+            "exporter": exporter,
+            "rows": stats.rows_exported,
+            "archive_mb": round(stats.bytes_written / 1024 / 1024, 2),
+            "seconds": round(elapsed, 2),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024, 1),
+        })
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def measure(database_url: str, exporter: str) -> dict:
+    # A fresh interpreter per run so peak RSS is not inherited from earlier runs
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure_child, args=(database_url, exporter, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+# =====================================================
+# Growing the tenant
+# =====================================================
+def grow(engine, rng: random.Random, rows: int):
+    """Add `rows` audit logs and rows // 4 deals to the benchmark tenant."""
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        user_ids = [r[0] for r in conn.execute(select(User.id).where(User.related_to_company == BENCH_COMPANY_ID))]
+        next_log = (conn.execute(select(func.max(Auditlog.id))).scalar() or 0) + 1
+        next_deal = (conn.execute(select(func.max(Deal.id))).scalar() or 0) + 1
+        account_id = conn.execute(select(func.min(Account.id)).where(Account.company_id == BENCH_COMPANY_ID)).scalar()
+
+        _insert(conn, Auditlog, [
+            {
+                "id": next_log + i, "description": "bench backup " * 4, "user_id": rng.choice(user_ids),
+                "action": "UPDATE", "entity_type": "deal", "entity_id": str(i),
+                "new_data": {"amount": rng.randint(1, 100000), "stage": "PROPOSAL"},
+                "is_read": True, "timestamp": now - timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ])
+        _insert(conn, Deal, [
+            {
+                "id": next_deal + i, "name": f"Deal {next_deal + i}", "account_id": account_id,
+                "stage": "PROPOSAL", "status": "Active", "amount": rng.randint(100, 100000),
+                "close_date": now, "assigned_to": rng.choice(user_ids), "created_by": rng.choice(user_ids),
+                "company_id": BENCH_COMPANY_ID,
+            }
+            for i in range(rows // 4)
+        ])
+
+
+def run(database_url: str, steps: int, rows_per_step: int, seed_value: int) -> list:
+    engine = create_engine(database_url)
+    rng = random.Random(seed_value)
+    seed(engine, rng, companies=1, users_per_company=25, deals_per_user=0, logs_per_user=0)
+
+    results = []
+    for step in range(1, steps + 1):
+        grow(engine, rng, rows_per_step)
+        for exporter in EXPORTERS:
+            row = measure(database_url, exporter)
+            row["step"] = step
+            results.append(row)
+            print(f"[Backup RSS] step {step} {exporter:<10} rows={row['rows']:<9} "
+                  f"peak_rss={row['peak_rss_mb']} MB (+{row['rss_growth_mb']} MB) {row['seconds']}s")
+    engine.dispose()
+    return results
+
+
+def print_report(results: list):
+    print(f"\n{'rows':>10}{'exporter':>12}{'archive MB':>12}{'seconds':>10}{'peak RSS MB':>14}{'growth MB':>12}")
+    print("-" * 70)
+    for row in results:
+        print(f"{row['rows']:>10}{row['exporter']:>12}{row['archive_mb']:>12.2f}{row['seconds']:>10.2f}"
+              f"{row['peak_rss_mb']:>14.1f}{row['rss_growth_mb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Peak RSS of buffered vs streaming CSV backup export by tenant size.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="Scratch database (never the app database)")
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--rows-per-step", type=int, default=200000, help="Audit logs added per step (plus a quarter as many deals)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+    if args.database_url == os.getenv("DATABASE_URL"):
+        parser.error("refusing to seed the application database; point --database-url at a scratch database")
+
+    report = run(args.database_url, args.steps, args.rows_per_step, args.seed)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n[Backup RSS] Results written to {args.json_path}")
@@ -0,0 +1,281 @@
+"""Index advisor benchmark for the hot-path index pack (models/indexes.py).
+
+Seeds a scratch database with synthetic tenants, then runs the hot queries twice --
+without the index pack and with it -- printing the EXPLAIN plan and median timing of
+each query for both runs. Run from the backend folder against a throwaway database:
+
+    python -m benchmarks.index_advisor --database-url postgresql://localhost/crm_bench
+    python -m benchmarks.index_advisor --database-url sqlite:///./bench.db --companies 5
+
+The seed is deterministic (--seed), so runs can be compared across branches.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+from database import Base
+from models import Account, Auditlog, Company, Deal, Subscription, Task, Territory, User
+from models.indexes import HOT_PATH_INDEXES
+
+SEED_CHUNK = 5000
+
+# name -> SQL; parameters are filled from the seeded data by _query_params()
+QUERIES = {
+    "notifications_latest": (
+        "SELECT id FROM audit_logs WHERE user_id = :user_id "
+        "ORDER BY timestamp DESC, id DESC LIMIT 50"
+    ),
+    "notifications_unread_count": (
+        "SELECT COUNT(*) FROM audit_logs WHERE user_id = :user_id AND is_read = false"
+    ),
+    "target_closed_won_sum": (
+        "SELECT COALESCE(SUM(amount), 0) FROM deals WHERE assigned_to = :user_id "
+        "AND stage = 'CLOSED_WON' AND close_date >= :start AND close_date < :end"
+    ),
+    "latest_subscription": (
+        "SELECT id FROM subscriptions WHERE company_id = :company_id "
+        "ORDER BY created_at DESC, id DESC LIMIT 1"
+    ),
+    "subscription_expiry_alerts": (
+        "SELECT id FROM subscriptions WHERE end_date <= :soon AND end_date > :now "
+        "AND status IN ('Active', 'Trial')"
+    ),
+    "trial_sweep": (
+        "SELECT id FROM subscriptions WHERE status = 'Trial' AND is_trial = true AND end_date <= :now"
+    ),
+    "company_users_by_role": (
+        "SELECT id, role FROM users WHERE related_to_company = :company_id"
+    ),
+    "manager_territory_members": (
+        "SELECT DISTINCT user_id FROM territories WHERE manager_id = :manager_id"
+    ),
+    "sales_deal_list": (
+        "SELECT id FROM deals WHERE assigned_to IN (:user_id) OR created_by = :user_id "
+        "ORDER BY id DESC LIMIT 50"
+    ),
+    "account_activity_tasks": (
+        "SELECT id FROM tasks WHERE related_to_account = :account_id"
+    ),
+}
+
+
+# =====================================================
+# Seeding
+# =====================================================
+def _insert(conn, model, rows):
+    for start in range(0, len(rows), SEED_CHUNK):
+        conn.execute(model.__table__.insert(), rows[start:start + SEED_CHUNK])
+
+
+def seed(engine, rng: random.Random, companies: int, users_per_company: int, deals_per_user: int, logs_per_user: int):
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT COUNT(*) FROM companies")).scalar():
+            print("[Index Advisor] Database already seeded; reusing existing data.")
+            return
+
+        _insert(conn, Company, [
+            {"id": c, "company_name": f"Bench {c}", "company_number": f"B{c}", "tenant_number": f"BT{c:08d}"}
+            for c in range(1, companies + 1)
+        ])
+
+        users, subs, territories, accounts = [], [], [], []
+        user_id = territory_id = account_id = sub_id = 0
+        for company_id in range(1, companies + 1):
+            manager_id = None
+            for i in range(users_per_company):
+                user_id += 1
+                role = "CEO" if i == 0 else "Manager" if i % 10 == 1 else "Sales"
+                if role == "Manager":
+                    manager_id = user_id
+                users.append({
+                    "id": user_id, "first_name": "Bench", "last_name": str(user_id),
+                    "email": f"bench{user_id}@example.com", "role": role,
+                    "related_to_company": company_id, "is_active": True,
+                })
+                if role == "Sales" and manager_id:
+                    territory_id += 1
+                    territories.append({
+                        "id": territory_id, "name": f"T{manager_id}", "manager_id": manager_id,
+                        "user_id": user_id, "company_id": company_id,
+                    })
+            for _ in range(users_per_company):
+                account_id += 1
+                accounts.append({
+                    "id": account_id, "name": f"Account {account_id}", "company_id": company_id,
+                    "assigned_to": user_id - rng.randrange(users_per_company), "created_by": user_id,
+                })
+            for k in range(rng.randint(1, 4)):
+                sub_id += 1
+                status = rng.choice(["Active", "Trial", "Cancelled", "Expired"])
+                subs.append({
+                    "id": sub_id, "company_id": company_id, "plan_name": "Pro", "price": 0.0,
+                    "status": status, "is_trial": status == "Trial", "promo_discount_is_active": False,
+                    "created_at": now - timedelta(days=30 * k), "end_date": now + timedelta(days=rng.randint(-30, 60)),
+                })
+
+        _insert(conn, User, users)
+        _insert(conn, Territory, territories)
+        _insert(conn, Account, accounts)
+        _insert(conn, Subscription, subs)
+
+        deals, logs, tasks = [], [], []
+        deal_id = log_id = task_id = 0
+        for user in users:
+            company_accounts = range((user["related_to_company"] - 1) * users_per_company + 1,
+                                     user["related_to_company"] * users_per_company + 1)
+            for _ in range(deals_per_user):
+                deal_id += 1
+                deals.append({
+                    "id": deal_id, "name": f"Deal {deal_id}", "account_id": rng.choice(company_accounts),
+                    "stage": rng.choice(["PROSPECTING", "PROPOSAL", "CLOSED_WON", "CLOSED_LOST"]),
+                    "status": rng.choice(["Active", "Active", "Active", "Inactive"]),
+                    "amount": rng.randint(100, 100000), "close_date": now - timedelta(days=rng.randint(0, 720)),
+                    "assigned_to": user["id"], "created_by": user["id"], "company_id": user["related_to_company"],
+                })
+            for _ in range(logs_per_user):
+                log_id += 1
+                logs.append({
+                    "id": log_id, "description": "bench", "user_id": user["id"], "action": "UPDATE",
+                    "is_read": rng.random() < 0.8, "timestamp": now - timedelta(minutes=rng.randint(0, 525600)),
+                })
+            for _ in range(max(1, deals_per_user // 4)):
+                task_id += 1
+                tasks.append({
+                    "id": task_id, "title": f"Task {task_id}", "related_to_account": rng.choice(company_accounts),
+                    "assigned_to": user["id"], "created_by": user["id"], "company_id": user["related_to_company"],
+                })
+
+        _insert(conn, Deal, deals)
+        _insert(conn, Auditlog, logs)
+        _insert(conn, Task, tasks)
+
+    print(f"[Index Advisor] Seeded {companies} companies, {len(users)} users, {len(deals)} deals, "
+          f"{len(logs)} audit logs, {len(tasks)} tasks.")
+
+
+# =====================================================
+# Measuring
+# =====================================================
+def _query_params(conn) -> dict:
+    now = datetime.now(timezone.utc)
+    sales_id = conn.execute(text("SELECT id FROM users WHERE role = 'Sales' ORDER BY id LIMIT 1 OFFSET 3")).scalar()
+    manager_id = conn.execute(text("SELECT id FROM users WHERE role = 'Manager' ORDER BY id LIMIT 1")).scalar()
+    company_id = conn.execute(text("SELECT MAX(id) FROM companies")).scalar()
+    account_id = conn.execute(text("SELECT MAX(id) FROM accounts")).scalar()
+    return {
+        "user_id": sales_id, "manager_id": manager_id, "company_id": company_id, "account_id": account_id,
+        "start": now - timedelta(days=90), "end": now, "now": now, "soon": now + timedelta(days=7),
+    }
+
+
+def _explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).fetchall()
+        return "\n".join(row[0] for row in rows)
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).fetchall()
+        return "\n".join(str(row[-1]) for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {sql}"), params).fetchall()
+    return "\n".join(" ".join(str(col) for col in row) for row in rows)
+
+
+def _time(conn, sql: str, params: dict, runs: int) -> float:
+    conn.execute(text(sql), params).fetchall()  # warm-up
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _set_index_pack(engine, present: bool):
+    with engine.begin() as conn:
+        for index in HOT_PATH_INDEXES:
+            if present:
+                index.create(conn, checkfirst=True)
+            else:
+                index.drop(conn, checkfirst=True)
+        conn.execute(text("ANALYZE"))
+
+
+def measure(engine, runs: int) -> dict:
+    with engine.connect() as conn:
+        params = _query_params(conn)
+        return {
+            name: {"plan": _explain(conn, sql, params), "median_ms": round(_time(conn, sql, params, runs), 3)}
+            for name, sql in QUERIES.items()
+        }
+
+
+def run(database_url: str, companies: int, users_per_company: int, deals_per_user: int,
+        logs_per_user: int, runs: int, seed_value: int) -> dict:
+    engine = create_engine(database_url)
+    seed(engine, random.Random(seed_value), companies, users_per_company, deals_per_user, logs_per_user)
+
+    _set_index_pack(engine, present=False)
+    before = measure(engine, runs)
+    _set_index_pack(engine, present=True)
+    after = measure(engine, runs)
+    engine.dispose()
+
+    report = {}
+    for name in QUERIES:
+        b, a = before[name]["median_ms"], after[name]["median_ms"]
+        report[name] = {
+            "before_ms": b,
+            "after_ms": a,
+            "speedup": round(b / a, 2) if a else None,
+            "plan_before": before[name]["plan"],
+            "plan_after": after[name]["plan"],
+        }
+    return report
+
+
+def print_report(report: dict, show_plans: bool = True):
+    print(f"\n{'query':<32}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    print("-" * 66)
+    for name, row in report.items():
+        print(f"{name:<32}{row['before_ms']:>12.3f}{row['after_ms']:>12.3f}{(row['speedup'] or 0):>9.2f}x")
+
+    if show_plans:
+        for name, row in report.items():
+            print(f"\n=== {name} ===\n-- before --\n{row['plan_before']}\n-- after --\n{row['plan_after']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic data and compare query plans with / without the hot-path index pack.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"), help="Scratch database (never the app database)")
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--users-per-company", type=int, default=25)
+    parser.add_argument("--deals-per-user", type=int, default=200)
+    parser.add_argument("--logs-per-user", type=int, default=400)
+    parser.add_argument("--runs", type=int, default=7, help="Timed runs per query (median is reported)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-plans", action="store_true", help="Only print the timing table")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url (or BENCH_DATABASE_URL) is required")
+    if args.database_url == os.getenv("DATABASE_URL"):
+        parser.error("refusing to seed the application database; point --database-url at a scratch database")
+
+    result = run(args.database_url, args.companies, args.users_per_company, args.deals_per_user,
+                 args.logs_per_user, args.runs, args.seed)
+    print_report(result, show_plans=not args.no_plans)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(result, fh, indent=2)
+        print(f"\n[Index Advisor] Report written to {args.json_path}")
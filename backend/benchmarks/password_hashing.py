@@ -0,0 +1,116 @@
+"""Login throughput per core under different Argon2 cost settings.
+
+A login is dominated by one password verification. For every cost setting this hashes a
+password once, then runs --logins verifications on a thread pool of 1 thread and of
+--threads threads (the production pool, services/password_hashing.py, defaults to one per
+core), reporting verifications per second, per second per busy core, and the latency
+percentiles a login would see. A legacy bcrypt row is included for reference. Run from
+the backend folder (no database needed):
+
+    python -m benchmarks.password_hashing
+    python -m benchmarks.password_hashing --setting t=3,m=65536,p=4 --setting t=2,m=19456,p=1 --logins 64
+
+Pick the most expensive setting whose per-core rate still covers the peak login rate with
+headroom; changing ARGON2_* makes existing hashes rehash on their next successful login.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from services.password_hashing import make_context
+
+PASSWORD = "correct horse battery staple"
+
+# time cost, memory KiB, parallelism: current default, then the OWASP recommendations
+DEFAULT_SETTINGS = ["t=3,m=65536,p=4", "t=2,m=19456,p=1", "t=1,m=47104,p=1", "t=3,m=12288,p=1"]
+
+
+def parse_setting(value: str) -> dict:
+    parts = dict(part.split("=", 1) for part in value.split(","))
+    return {"time_cost": int(parts["t"]), "memory_cost": int(parts["m"]), "parallelism": int(parts.get("p", 1))}
+
+
+def measure(label: str, verify, logins: int, threads: int) -> dict:
+    latencies = []
+
+    def one():
+        started = time.perf_counter()
+        if not verify():
+            raise RuntimeError(f"{label}: verification failed")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    verify()  # warm up (allocator, backend load)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(one) for _ in range(logins)]:
+            future.result()
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    per_second = logins / seconds
+    return {
+        "setting": label,
+        "threads": threads,
+        "logins": logins,
+        "per_second": round(per_second, 1),
+        "per_core": round(per_second / min(threads, os.cpu_count() or 1), 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+    }
+
+
+def run(settings: list, logins: int, threads: int, bcrypt_rounds: int) -> list:
+    results = []
+    for setting in settings:
+        params = parse_setting(setting)
+        context = make_context(params["time_cost"], params["memory_cost"], params["parallelism"])
+        hashed = context.hash(PASSWORD)
+        for pool_size in sorted({1, threads}):
+            row = measure(setting, lambda: context.verify(PASSWORD, hashed), logins, pool_size)
+            row["memory_mb_per_login"] = round(params["memory_cost"] / 1024, 1)
+            results.append(row)
+            print(f"[Password Hashing] {setting:<18} threads={pool_size:<3} {row['per_second']:>8}/s "
+                  f"{row['per_core']:>7}/s/core p50={row['p50_ms']}ms p95={row['p95_ms']}ms")
+
+    label = f"bcrypt rounds={bcrypt_rounds}"
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds))
+    for pool_size in sorted({1, threads}):
+        row = measure(label, lambda: bcrypt.checkpw(PASSWORD.encode(), hashed), logins, pool_size)
+        row["memory_mb_per_login"] = 0.0
+        results.append(row)
+        print(f"[Password Hashing] {label:<18} threads={pool_size:<3} {row['per_second']:>8}/s "
+              f"{row['per_core']:>7}/s/core p50={row['p50_ms']}ms p95={row['p95_ms']}ms")
+    return results
+
+
+def print_report(results: list):
+    print(f"\n{'setting':<20}{'threads':>8}{'logins/s':>10}{'per core':>10}{'p50 ms':>9}{'p95 ms':>9}{'MiB/login':>11}")
+    print("-" * 77)
+    for row in results:
+        print(f"{row['setting']:<20}{row['threads']:>8}{row['per_second']:>10}{row['per_core']:>10}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['memory_mb_per_login']:>11}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password verification (login) throughput per core by Argon2 cost.")
+    parser.add_argument("--setting", action="append", dest="settings",
+                        help="Argon2 cost as t=<time>,m=<memory KiB>,p=<parallelism>; repeatable")
+    parser.add_argument("--logins", type=int, default=32, help="Verifications per setting and pool size")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Pool size to compare against 1")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    report = run(args.settings or DEFAULT_SETTINGS, args.logins, args.threads, args.bcrypt_rounds)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\n[Password Hashing] Results written to {args.json_path}")
@@ -1,16 +1,163 @@
 #database.py
 import os
+import json
+import logging
+import threading
+import time
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 SECRET_KEY = os.getenv("SECRET_KEY")
 
+sql_logger = logging.getLogger("crm.sql")
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Engine profile (all optional; defaults are safe for production)
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_SQL_LOG = _env_bool("DB_SQL_LOG", False)              # structured JSON line per statement on "crm.sql"
+DB_SQL_LOG_SLOW_MS = _env_int("DB_SQL_LOG_SLOW_MS", 0)   # only log statements slower than this (0 = all)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 10)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 20)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_TIMEOUT_MS = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)  # PostgreSQL only (0 = server default)
+
+
+class PoolMetrics:
+    """Counters for pool checkouts and time spent waiting for a connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_count = 0
+        self.wait_time_total_ms = 0.0
+        self.wait_time_max_ms = 0.0
+        self.timeouts = 0
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_time_total_ms += elapsed_ms
+            self.wait_time_max_ms = max(self.wait_time_max_ms, elapsed_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = (self.wait_time_total_ms / self.wait_count) if self.wait_count else 0.0
+            return {
+                "checkouts_total": self.checkouts,
+                "wait_count": self.wait_count,
+                "wait_time_total_ms": round(self.wait_time_total_ms, 3),
+                "wait_time_avg_ms": round(avg, 3),
+                "wait_time_max_ms": round(self.wait_time_max_ms, 3),
+                "timeouts": self.timeouts,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MetricsQueuePool(QueuePool):
+    """QueuePool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        pool_metrics.record_wait((time.perf_counter() - start) * 1000)
+        return conn
+
+
+def _engine_kwargs(url: str) -> dict:
+    kwargs = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool class; pool sizing does not apply.
+        return kwargs
+
+    kwargs.update(
+        poolclass=MetricsQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgres"):
+        kwargs["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+
+    return kwargs
+
+
+def _install_sql_logging(target: Engine):
+    if not sql_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        sql_logger.addHandler(handler)
+    sql_logger.setLevel(logging.INFO)
+
+    @event.listens_for(target, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("crm_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["crm_query_start"].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < DB_SQL_LOG_SLOW_MS:
+            return
+        sql_logger.info(json.dumps({
+            "event": "sql",
+            "duration_ms": round(elapsed_ms, 3),
+            "rowcount": getattr(cursor, "rowcount", None),
+            "executemany": bool(executemany),
+            "statement": " ".join(statement.split()),
+        }))
+
+
+def _install_pool_counters(target: Engine):
+    @event.listens_for(target, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_metrics.record_checkout()
+
+
 if DATABASE_URL:
-    engine: Engine = create_engine(DATABASE_URL, echo=True)
+    engine: Engine = create_engine(DATABASE_URL, **_engine_kwargs(DATABASE_URL))
+    _install_pool_counters(engine)
+    if DB_SQL_LOG:
+        _install_sql_logging(engine)
 else:
     engine = None
 
@@ -19,16 +166,105 @@ if engine:
 else:
     SessionLocal = None
 
+# =====================================================
+# Async engine (asyncpg on PostgreSQL, aiosqlite on SQLite) for I/O-heavy read endpoints
+# =====================================================
+# Sync handlers run in Starlette's threadpool, so a worker serves at most that many
+# requests at once; handlers on get_async_db wait for the database on the event loop.
+# Pool sizing and the statement timeout follow the sync engine's settings.
+DB_ASYNC_POOL_SIZE = _env_int("DB_ASYNC_POOL_SIZE", DB_POOL_SIZE)
+DB_ASYNC_MAX_OVERFLOW = _env_int("DB_ASYNC_MAX_OVERFLOW", DB_MAX_OVERFLOW)
+
+
+def async_database_url(url: str):
+    """DATABASE_URL with the async driver; libpq's sslmode becomes asyncpg's ssl argument."""
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+")[0]
+    connect_args = {}
+    if backend in ("postgresql", "postgres"):
+        query = dict(parsed.query)
+        sslmode = query.pop("sslmode", None)
+        if sslmode:
+            connect_args["ssl"] = sslmode
+        parsed = parsed.set(drivername="postgresql+asyncpg", query=query)
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed, connect_args
+
+
+def _async_engine_kwargs(url: str, connect_args: dict) -> dict:
+    kwargs = {"echo": DB_ECHO, "pool_pre_ping": DB_POOL_PRE_PING}
+
+    if url.startswith("sqlite"):
+        return kwargs
+
+    kwargs.update(
+        pool_size=DB_ASYNC_POOL_SIZE,
+        max_overflow=DB_ASYNC_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0 and url.startswith("postgres"):
+        connect_args = {**connect_args, "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+
+    return kwargs
+
+
+if DATABASE_URL:
+    _async_url, _async_connect_args = async_database_url(DATABASE_URL)
+    async_engine: AsyncEngine = create_async_engine(
+        _async_url, **_async_engine_kwargs(DATABASE_URL, _async_connect_args)
+    )
+    if DB_SQL_LOG:
+        _install_sql_logging(async_engine.sync_engine)
+    # expire_on_commit=False: response models read attributes after the handler returns,
+    # where an async session cannot lazy-load
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
-        print("Database session yield successfully")
     finally:
         db.close()
-        print("Database session closed")
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_pool_stats() -> dict:
+    """Current pool occupancy plus cumulative checkout / wait counters."""
+    if engine is None:
+        return {"configured": False}
+
+    pool = engine.pool
+    stats = {
+        "configured": True,
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+        **pool_metrics.snapshot(),
+    }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=getattr(pool, "_max_overflow", None),
+        )
+    if async_engine is not None:
+        stats["async_pool"] = {"pool_class": type(async_engine.pool).__name__, "status": async_engine.pool.status()}
+    return stats
 
 def test_connection():
     try:
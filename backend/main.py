@@ -6,7 +6,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from database import Base, engine
 from contextlib import asynccontextmanager
-from services.scheduler import start_scheduler
+from services.scheduler import start_scheduler, stop_scheduler
+from services.loop_monitor import loop_monitor
 
 from dotenv import load_dotenv
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -26,10 +27,16 @@ import models.quote
 import models.soa
 import models.subscription
 import models.promo
+import models.revenue
 import models.target
 import models.task
 import models.territory
 import models.comment
+import models.notification
+import models.backup
+import models.job_run
+import models.email_outbox
+import models.kv_entry
 
 # Import routers
 import routers.auth as auth_router
@@ -61,9 +68,13 @@ import routers.forecast_revenue as forecast_revenue_router
 async def lifespan(app: FastAPI):
     print("[Startup] Starting background scheduler...")
     scheduler = start_scheduler()
+    await ws_notification.start_notification_backplane()
+    await loop_monitor.start()
     yield
+    await loop_monitor.stop()
     print("[Shutdown] Stopping background scheduler...")
-    scheduler.shutdown(wait=False)
+    stop_scheduler(scheduler)
+    await ws_notification.stop_notification_backplane()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -14,16 +14,24 @@ from .invoice import Invoice, InvoiceItem
 from .payment import Payment
 from .subscription import Subscription
 from .promo import PromoCode, PromoRedemption
+from .revenue import UserDailyRevenue
 from .target import Target
 from .task import Task
 from .territory import Territory
 from .comment import Comment
+from .notification import NotificationCounter
+from .backup import BackupRun
+from .job_run import JobRun
+from .email_outbox import EmailOutbox
+from .kv_entry import KvEntry
+from . import tenant  # registers the company_id sync hook
+from . import indexes  # composite / partial hot-path indexes
 
 __all__ = [
     "Account", "Announcement", "Auditlog", "User", "Call", "Company",
     "Contact", "Deal", "Lead", "Meeting", "Quote", "QuoteItem",
     "StatementOfAccount", "SoaItem",
     "Invoice", "InvoiceItem", "Payment",
-    "Subscription", "PromoCode", "PromoRedemption", "Target", "Task", "Territory", 
-    "Comment"
+    "Subscription", "PromoCode", "PromoRedemption", "UserDailyRevenue", "Target", "Task", "Territory", 
+    "Comment", "NotificationCounter", "BackupRun", "JobRun", "EmailOutbox", "KvEntry"
 ]
\ No newline at end of file
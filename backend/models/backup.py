@@ -0,0 +1,35 @@
+#backend/models/backup.py
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, func
+from database import Base
+
+
+class BackupRun(Base):
+    """One CSV backup of a company; differential runs chain to their parent run."""
+    __tablename__ = "backup_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+
+    mode = Column(String(20), nullable=False, default="full")  # full | differential
+    parent_id = Column(Integer, ForeignKey("backup_runs.id", ondelete="SET NULL"), nullable=True)
+    base_id = Column(Integer, ForeignKey("backup_runs.id", ondelete="SET NULL"), nullable=True)  # full run the chain starts from
+
+    since = Column(DateTime(timezone=True), nullable=True)  # rows changed after this are included (differential)
+    snapshot_at = Column(DateTime(timezone=True), nullable=False)  # next differential starts here
+
+    status = Column(String(20), nullable=False, default="running")  # queued | running | completed | failed
+    trigger = Column(String(20), nullable=False, default="manual")  # manual | scheduled | download (streamed GET /admin/backup/csv)
+    error = Column(String(500), nullable=True)
+    tables_exported = Column(Integer, nullable=False, default=0)
+    rows_exported = Column(Integer, nullable=False, default=0)
+    deletions = Column(Integer, nullable=False, default=0)
+
+    # Background jobs: zip written under MEDIA_ROOT (relative path), deleted at expires_at
+    artifact_path = Column(String(500), nullable=True)
+    artifact_bytes = Column(BigInteger, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
@@ -29,6 +29,7 @@ class Call(Base):
     related_to_deal = Column(Integer, ForeignKey("deals.id", ondelete="CASCADE"), nullable=True)
     related_to_quote = Column(Integer, ForeignKey("quotes.id", ondelete="CASCADE"), nullable=True)
     created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=True, index=True)  # denormalized tenant (see models/tenant.py)
     assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
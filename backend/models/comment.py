@@ -10,6 +10,7 @@ class Comment(Base):
     id = Column(Integer, primary_key=True, index=True)
     comment = Column(String, nullable=True)
     comment_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)  
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=True, index=True)  # denormalized tenant (see models/tenant.py)
 
     related_to_account = Column(Integer, ForeignKey("accounts.id", ondelete="CASCADE"), nullable=True)
     related_to_contact = Column(Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=True)
@@ -0,0 +1,32 @@
+#backend/models/email_outbox.py
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime, func
+from database import Base
+
+
+class EmailOutbox(Base):
+    """One outbound email, delivered by services/email_outbox.py; bodies are cleared once it is final."""
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)  # welcome | otp | password_reset | trial_ending
+    to_email = Column(String(320), nullable=False)
+    subject = Column(String(500), nullable=False)
+    body_text = Column(Text, nullable=True)
+    body_html = Column(Text, nullable=True)
+
+    status = Column(String(20), nullable=False, default="queued")  # queued | sending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)  # not worth sending after this (OTP codes)
+    last_error = Column(String(500), nullable=True)
+    transport = Column(String(20), nullable=True)
+    message_id = Column(String(200), nullable=True)  # provider message id
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        Index("ix_email_outbox_created_at", "created_at"),
+    )
@@ -0,0 +1,86 @@
+#backend/models/indexes.py
+"""Composite / partial indexes for the hot query paths.
+
+Declared here (rather than per model) so the whole pack is visible at once; migration
+202610171200 creates the same set, and benchmarks/index_advisor.py drops and re-creates
+it to compare plans.
+"""
+from sqlalchemy import Index, text
+
+from .account import Account
+from .auditlog import Auditlog
+from .auth import User
+from .backup import BackupRun
+from .call import Call
+from .contact import Contact
+from .deal import Deal
+from .lead import Lead
+from .meeting import Meeting
+from .quote import Quote
+from .soa import StatementOfAccount
+from .subscription import Subscription
+from .task import Task
+from .territory import Territory
+
+
+def _partial(where: str) -> dict:
+    return {"postgresql_where": text(where), "sqlite_where": text(where)}
+
+
+HOT_PATH_INDEXES = [
+    # /logs/notifications: latest logs per user; unread counts / mark-all-read
+    Index("ix_audit_logs_user_id_timestamp", Auditlog.user_id, Auditlog.timestamp, Auditlog.id),
+    Index("ix_audit_logs_user_id_unread", Auditlog.user_id, **_partial("is_read = false")),
+    # /logs/notifications?since=<id>: replay cursor (migration 202610171300)
+    Index("ix_audit_logs_user_id_id", Auditlog.user_id, Auditlog.id),
+
+    # backup artifact expiry sweep (migration 202610171500)
+    Index("ix_backup_runs_artifact_expires_at", BackupRun.expires_at, **_partial("artifact_path IS NOT NULL")),
+
+    # retention jobs: min/max id of the expired rows (migration 202610171700)
+    Index("ix_audit_logs_timestamp", Auditlog.timestamp),
+    Index("ix_leads_converted_updated_at", Lead.updated_at, **_partial("status = 'Converted'")),
+
+    # target achievement / revenue rollup refresh: closed-won sums per owner and close date
+    Index("ix_deals_assigned_to_stage_close_date", Deal.assigned_to, Deal.stage, Deal.close_date),
+
+    # get_latest_subscription(): newest subscription per company
+    Index("ix_subscriptions_company_id_created_at", Subscription.company_id, Subscription.created_at, Subscription.id),
+    # admin expiry alerts / active counts only look at live subscriptions
+    Index("ix_subscriptions_live_end_date", Subscription.end_date, **_partial("status IN ('Active', 'Trial')")),
+    Index("ix_subscriptions_active_company_id", Subscription.company_id, **_partial("status = 'Active'")),
+    # scheduler: trial expiry and promo discount lifecycle sweeps
+    Index("ix_subscriptions_trial_end_date", Subscription.end_date, **_partial("status = 'Trial' AND is_trial = true")),
+    Index("ix_subscriptions_promo_discount_ends_at", Subscription.promo_discount_ends_at, **_partial("promo_discount_is_active = true")),
+
+    # role scope: company user lists and manager -> territory members
+    Index("ix_users_related_to_company_role", User.related_to_company, User.role),
+    Index("ix_territories_manager_id_user_id", Territory.manager_id, Territory.user_id),
+    Index("ix_territories_user_id", Territory.user_id),
+
+    # role scope predicate: owner IN (...) OR created_by = me
+    Index("ix_accounts_assigned_to", Account.assigned_to),
+    Index("ix_accounts_created_by", Account.created_by),
+    Index("ix_contacts_assigned_to", Contact.assigned_to),
+    Index("ix_contacts_created_by", Contact.created_by),
+    Index("ix_deals_created_by", Deal.created_by),
+    Index("ix_leads_lead_owner", Lead.lead_owner),
+    Index("ix_leads_created_by", Lead.created_by),
+    Index("ix_tasks_assigned_to", Task.assigned_to),
+    Index("ix_tasks_created_by", Task.created_by),
+    Index("ix_calls_assigned_to", Call.assigned_to),
+    Index("ix_calls_created_by", Call.created_by),
+    Index("ix_meetings_assigned_to", Meeting.assigned_to),
+    Index("ix_meetings_created_by", Meeting.created_by),
+    Index("ix_quotes_assigned_to", Quote.assigned_to),
+    Index("ix_quotes_created_by", Quote.created_by),
+    Index("ix_statements_of_account_created_by", StatementOfAccount.created_by),
+
+    # account / deal activity pages
+    Index("ix_contacts_account_id", Contact.account_id),
+    Index("ix_deals_account_id", Deal.account_id),
+    Index("ix_quotes_account_id", Quote.account_id),
+    Index("ix_tasks_related_to_account", Task.related_to_account),
+    Index("ix_calls_related_to_account", Call.related_to_account),
+    Index("ix_meetings_related_to_account", Meeting.related_to_account),
+]
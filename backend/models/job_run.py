@@ -0,0 +1,25 @@
+#backend/models/job_run.py
+from sqlalchemy import Column, Index, Integer, String, Text, DateTime
+from database import Base
+
+
+class JobRun(Base):
+    """One execution of a scheduled job (services/scheduler.py) on the leader worker."""
+    __tablename__ = "job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(100), nullable=False)
+    worker_id = Column(String(200), nullable=False)
+
+    status = Column(String(20), nullable=False, default="running")  # running | success | failed
+    rows_affected = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_job_runs_job_id_started_at", "job_id", "started_at"),
+        Index("ix_job_runs_started_at", "started_at"),
+    )
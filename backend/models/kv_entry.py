@@ -0,0 +1,16 @@
+#backend/models/kv_entry.py
+from sqlalchemy import Column, Index, String, Text, DateTime
+from database import Base
+
+
+class KvEntry(Base):
+    """Short-lived shared key/value entry (services/ttl_store.py); invalid after expires_at."""
+    __tablename__ = "kv_entries"
+
+    key = Column(String(255), primary_key=True)
+    value = Column(Text, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_kv_entries_expires_at", "expires_at"),
+    )
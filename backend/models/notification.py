@@ -0,0 +1,13 @@
+#backend/models/notification.py
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, func
+from database import Base
+
+
+class NotificationCounter(Base):
+    """Per-user unread notification count, maintained by services/notification_counters.py."""
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_log_id = Column(Integer, nullable=False, default=0, server_default="0")  # newest audit log id for the user
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
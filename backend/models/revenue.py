@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Date, DateTime, func, ForeignKey, Numeric, UniqueConstraint
+from database import Base
+
+
+class UserDailyRevenue(Base):
+    """Per-user, per-day rollup of CLOSED_WON deal amounts (keyed by deal.assigned_to and close_date)."""
+    __tablename__ = "user_daily_revenue"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_user_daily_revenue_user_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    day = Column(Date, nullable=False, index=True)
+
+    closed_won_amount = Column(Numeric(14, 2), nullable=False, default=0)
+    deal_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,69 @@
+#backend/models/tenant.py
+"""Keeps the denormalized `company_id` on CRM entity tables in sync.
+
+company_id is the company of the record's owner (assigned_to / lead_owner / comment_by),
+falling back to its creator. It is filled on insert and recomputed whenever the owner or
+creator changes, so tenant filters can use `Model.company_id == X` instead of joining users.
+"""
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .account import Account
+from .auth import User
+from .call import Call
+from .comment import Comment
+from .contact import Contact
+from .deal import Deal
+from .lead import Lead
+from .meeting import Meeting
+from .quote import Quote
+from .soa import StatementOfAccount
+from .task import Task
+
+# model -> user columns to derive the tenant from, in priority order
+TENANT_SOURCE_COLUMNS = {
+    Account: ("assigned_to", "created_by"),
+    Contact: ("assigned_to", "created_by"),
+    Deal: ("assigned_to", "created_by"),
+    Task: ("assigned_to", "created_by"),
+    Call: ("assigned_to", "created_by"),
+    Meeting: ("assigned_to", "created_by"),
+    Quote: ("assigned_to", "created_by"),
+    StatementOfAccount: ("created_by", "assigned_to"),
+    Lead: ("lead_owner", "created_by"),
+    Comment: ("comment_by",),
+}
+
+
+def _company_of(session: Session, user_id):
+    if not user_id:
+        return None
+    user = session.get(User, user_id)
+    return user.related_to_company if user else None
+
+
+def resolve_company_id(session: Session, obj):
+    for column in TENANT_SOURCE_COLUMNS[type(obj)]:
+        company_id = _company_of(session, getattr(obj, column, None))
+        if company_id:
+            return company_id
+    return None
+
+
+def _sources_changed(obj) -> bool:
+    attrs = inspect(obj).attrs
+    return any(attrs[column].history.has_changes() for column in TENANT_SOURCE_COLUMNS[type(obj)])
+
+
+@event.listens_for(Session, "before_flush")
+def _sync_company_id(session, flush_context, instances):
+    with session.no_autoflush:
+        for obj in session.new:
+            if type(obj) in TENANT_SOURCE_COLUMNS and obj.company_id is None:
+                obj.company_id = resolve_company_id(session, obj)
+
+        for obj in session.dirty:
+            if type(obj) in TENANT_SOURCE_COLUMNS and _sources_changed(obj):
+                company_id = resolve_company_id(session, obj)
+                if company_id:
+                    obj.company_id = company_id
@@ -4,17 +4,22 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Union
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.account import AccountBase, AccountCreate, AccountResponse, AccountUpdate, AccountBulkDelete
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
 from models.auth import User
 from models.account import Account, AccountStatus
 from models.territory import Territory
 from models.contact import Contact
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from .ws_notification import broadcast_notification
+from services.revenue_rollup import deal_revenue_keys, refresh_user_daily_revenue
 
 
 def normalize_account_status(status: Optional[str]) -> Optional[str]:
@@ -37,6 +42,21 @@ router = APIRouter(
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER"}
 
+ACCOUNT_LIST_SPEC = ListSpec(
+    model=Account,
+    sort_fields={
+        "name": Account.name,
+        "status": Account.status,
+        "industry": Account.industry,
+        "created_at": Account.created_at,
+        "updated_at": Account.updated_at,
+    },
+    status_column=Account.status,
+    owner_column=Account.assigned_to,
+    date_column=Account.created_at,
+    text_columns=(Account.name, Account.industry, Account.website, Account.parent_company),
+)
+
 
 def _push_notif(
     background_tasks: BackgroundTasks,
@@ -187,53 +207,16 @@ def get_account(
     return account
 
 
-@router.get("/admin/fetch-all", response_model=list[AccountResponse])
-def admin_get_accounts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[list[AccountResponse], Page[AccountResponse]])
+async def admin_get_accounts(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        accounts = (
-            db.query(Account)
-            .join(User, Account.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        accounts = (
-            db.query(Account)
-            .join(User, Account.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
-
-        accounts = (
-            db.query(Account)
-            .join(User, Account.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Account.assigned_to == current_user.id) | # Leads owned by manager
-                (Account.created_by == current_user.id)
-            ).all()
-        )
-    else:
-        accounts = (
-            db.query(Account)
-            .filter(
-                (Account.assigned_to == current_user.id) | 
-                (Account.created_by == current_user.id)
-            ).all()
-        )
+    def build_query(session: Session):
+        return scoped_query(session, current_user, Account)
 
-    return accounts
+    return await paginate_query_async(db, build_query, ACCOUNT_LIST_SPEC, params, AccountResponse)
 
 @router.get("/sales/fetch-all", response_model=list[AccountResponse])
 def admin_get_accounts(
@@ -434,6 +417,7 @@ def admin_create_account(
 @router.delete("/admin/bulk-delete", status_code=status.HTTP_200_OK)
 def admin_bulk_delete_accounts(
     data: AccountBulkDelete,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     request: Request = None
@@ -477,47 +461,58 @@ def admin_bulk_delete_accounts(
     if not accounts_to_delete:
         raise HTTPException(status_code=404, detail="No matching accounts found for deletion.")
 
-    deleted_count = 0
-    for account in accounts_to_delete:
-        account_name = account.name
-        target_user_id = account.assigned_to or account.created_by
-
-        if role in ALLOWED_ADMIN_ROLES:
-            # Admins perform hard delete
-            deleted_data = serialize_instance(account)
-            db.delete(account)
-
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=account,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete account '{account_name}' via admin panel",
-            )
-        else:
-            # Sales users perform soft delete (mark as INACTIVE)
-            old_status = account.status
-            account.status = AccountStatus.INACTIVE.value
-            db.commit()
-
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=account,
-                action="UPDATE",
-                request=request,
-                old_data={"status": old_status},
-                new_data={"status": account.status},
-                target_user_id=target_user_id,
-                custom_message=f"bulk mark as inactive account '{account_name}' by creator via sales panel",
-            )
-        
-        deleted_count += 1
-
-    db.commit()
+    with buffered_audit_logs(db, background_tasks) as audit_logs:
+        revenue_keys = set()
+        deleted_count = 0
+        for account in accounts_to_delete:
+            account_name = account.name
+            target_user_id = account.assigned_to or account.created_by
+
+            if role in ALLOWED_ADMIN_ROLES:
+                # Admins perform hard delete (deals cascade with the account)
+                deleted_data = serialize_instance(account)
+                for deal in account.deals:
+                    revenue_keys |= deal_revenue_keys(deal)
+                db.delete(account)
+
+                log_entry = create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=account,
+                    action="DELETE",
+                    request=request,
+                    old_data=deleted_data,
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk delete account '{account_name}' via admin panel",
+                )
+                if target_user_id != current_user.id:
+                    audit_logs.notify(log_entry, target_user_id, {
+                        "type": "account_deleted",
+                        "title": f"Account deleted: {account_name}",
+                        "accountId": account.id,
+                        "deletedBy": f"{current_user.first_name} {current_user.last_name}",
+                    })
+            else:
+                # Sales users perform soft delete (mark as INACTIVE)
+                old_status = account.status
+                account.status = AccountStatus.INACTIVE.value
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=account,
+                    action="UPDATE",
+                    request=request,
+                    old_data={"status": old_status},
+                    new_data={"status": account.status},
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk mark as inactive account '{account_name}' by creator via sales panel",
+                )
+
+            deleted_count += 1
+
+        refresh_user_daily_revenue(db, revenue_keys)
+        audit_logs.commit()
 
     return {"detail": f"Successfully {'deleted' if role in ALLOWED_ADMIN_ROLES else 'archived'} {deleted_count} account(s)."}
 
@@ -675,9 +670,13 @@ def admin_delete_account(
     target_user_id = account.assigned_to or account.created_by
 
     if role in ALLOWED_ADMIN_ROLES:
-        # Admins perform hard delete
+        # Admins perform hard delete (deals cascade with the account)
         deleted_data = serialize_instance(account)
+        revenue_keys = set()
+        for deal in account.deals:
+            revenue_keys |= deal_revenue_keys(deal)
         db.delete(account)
+        refresh_user_daily_revenue(db, revenue_keys)
         db.commit()
 
         create_audit_log(
@@ -2,12 +2,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Body, File, UploadFile, Form
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, or_
-from database import SessionLocal
+from database import get_db, get_pool_stats
 from models.auth import User, UserRole
 from models.company import Company
 from models.promo import PromoCode, PromoRedemption
 from models.subscription import Subscription, StatusList, PlanName
 from models.auditlog import Auditlog
+from models.job_run import JobRun
+from models.email_outbox import EmailOutbox
 from schemas.company import CompanyCreate
 from schemas.promo import PromoCreate, PromoUpdate
 from services.promo_service import (
@@ -19,6 +21,14 @@ from services.promo_service import (
     normalize_promo_code,
     validate_promo_configuration,
 )
+from services.subscription_lifecycle import invalidate_plan_status
+from services.notification_backplane import WORKER_ID, backplane, backplane_metrics
+from services.scheduler import scheduler_jobs
+from services.scheduler_leader import leader
+from services.retention import retention_metrics
+from services.password_hashing import hash_metrics
+from services.loop_monitor import loop_monitor
+from routers.ws_notification import connection_stats
 from jose import jwt, JWTError
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
@@ -30,13 +40,6 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 
 SECRET_KEY = os.getenv("SECRET_KEY", "defaultsecretkey")
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Dependency to check if user is super admin
 def get_current_super_admin(request: Request, db: Session = Depends(get_db)):
     access_token = request.cookies.get("access_token")
@@ -265,7 +268,7 @@ def get_all_tenants(
 
 # Create a new tenant
 @router.post("/tenants")
-async def create_tenant(
+def create_tenant(
     company_name: str = Form(...),
     company_number: str = Form(...),
     slug: Optional[str] = Form(None),
@@ -304,7 +307,7 @@ async def create_tenant(
     logo_base64 = None
     if company_logo:
         try:
-            contents = await company_logo.read()
+            contents = company_logo.file.read()
             encoded = base64.b64encode(contents).decode('utf-8')
             mime_type = company_logo.content_type or "image/png"
             logo_base64 = f"data:{mime_type};base64,{encoded}"
@@ -355,6 +358,7 @@ async def create_tenant(
     
     db.add(subscription)
     db.commit()
+    invalidate_plan_status(new_company.id)
     db.refresh(subscription)
     
     return {
@@ -477,7 +481,7 @@ def get_tenant_details(
 
 # Update tenant details
 @router.put("/tenants/{tenant_id}")
-async def update_tenant(
+def update_tenant(
     tenant_id: int,
     company_name: Optional[str] = Form(None),
     company_number: Optional[str] = Form(None),
@@ -552,7 +556,7 @@ async def update_tenant(
     # Handle logo upload if provided
     elif company_logo:
         try:
-            contents = await company_logo.read()
+            contents = company_logo.file.read()
             encoded = base64.b64encode(contents).decode('utf-8')
             mime_type = company_logo.content_type or "image/png"
             company.company_logo = f"data:{mime_type};base64,{encoded}"
@@ -595,6 +599,7 @@ def delete_tenant(
     # Delete company (cascade will handle related records)
     db.delete(company)
     db.commit()
+    invalidate_plan_status(tenant_id)
     
     return {
         "message": f"Tenant '{company_name}' deleted successfully"
@@ -678,6 +683,7 @@ def update_subscription_status(
     subscription.status = new_status
     subscription.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_plan_status(subscription.company_id)
     db.refresh(subscription)
     
     return {
@@ -687,6 +693,140 @@ def update_subscription_status(
         "message": f"Subscription status updated to {new_status}"
     }
 
+# Get database connection pool metrics
+@router.get("/db/pool-stats")
+def get_db_pool_stats(
+    current_admin: User = Depends(get_current_super_admin),
+):
+    """Connection pool occupancy (checked out, overflow) and wait-time counters for this worker"""
+    return {
+        "pid": os.getpid(),
+        **get_pool_stats(),
+    }
+
+# Get websocket notification fan-out metrics
+@router.get("/ws/stats")
+def get_ws_stats(
+    current_admin: User = Depends(get_current_super_admin),
+):
+    """Connected sockets and backplane publish / delivery / fan-out latency counters for this worker"""
+    return {
+        "pid": os.getpid(),
+        "worker_id": WORKER_ID,
+        "backplane": backplane.name,
+        **connection_stats(),
+        **backplane_metrics.snapshot(),
+    }
+
+# Get event-loop lag metrics
+@router.get("/event-loop/stats")
+def get_event_loop_stats(
+    current_admin: User = Depends(get_current_super_admin),
+):
+    """Event-loop lag samples, stall count, lag histogram and recent stalls (with the blocking stack) for this worker"""
+    return {
+        "pid": os.getpid(),
+        "worker_id": WORKER_ID,
+        **loop_monitor.snapshot(),
+    }
+
+# Get password hashing pool metrics
+@router.get("/auth/hash-stats")
+def get_hash_stats(
+    current_admin: User = Depends(get_current_super_admin),
+):
+    """Password hashing pool size, Argon2 cost, queue depth and wait / hashing time for this worker"""
+    return {
+        "pid": os.getpid(),
+        **hash_metrics.snapshot(),
+    }
+
+def _serialize_job_run(run: JobRun) -> dict:
+    return {
+        "id": run.id,
+        "job_id": run.job_id,
+        "worker_id": run.worker_id,
+        "status": run.status,
+        "rows_affected": run.rows_affected,
+        "error": run.error,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+        "duration_ms": run.duration_ms,
+    }
+
+# Get scheduler leadership and the latest run of each job
+@router.get("/scheduler")
+def get_scheduler_status(
+    current_admin: User = Depends(get_current_super_admin),
+    db: Session = Depends(get_db),
+):
+    """Which worker leads the scheduler (from this worker's view), registered jobs and their last run"""
+    latest_ids = db.query(func.max(JobRun.id)).group_by(JobRun.job_id).subquery()
+    latest = {run.job_id: run for run in db.query(JobRun).filter(JobRun.id.in_(latest_ids.select()))}
+
+    jobs = scheduler_jobs()
+    for job in jobs:
+        run = latest.get(job["id"])
+        job["last_run"] = _serialize_job_run(run) if run else None
+
+    return {
+        "pid": os.getpid(),
+        "leader": leader.snapshot(),
+        "jobs": jobs,
+        "retention": retention_metrics.snapshot(),
+    }
+
+# Get scheduler run history
+@router.get("/scheduler/runs")
+def get_scheduler_runs(
+    job_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    current_admin: User = Depends(get_current_super_admin),
+    db: Session = Depends(get_db),
+):
+    """Most recent job runs, newest first; filter by job_id and/or status (running | success | failed)"""
+    query = db.query(JobRun)
+    if job_id:
+        query = query.filter(JobRun.job_id == job_id)
+    if status:
+        query = query.filter(JobRun.status == status)
+    runs = query.order_by(JobRun.started_at.desc(), JobRun.id.desc()).limit(max(1, min(limit, 500))).all()
+    return [_serialize_job_run(run) for run in runs]
+
+# Get outbound email queue status
+@router.get("/email-outbox")
+def get_email_outbox(
+    status: Optional[str] = None,
+    limit: int = 50,
+    current_admin: User = Depends(get_current_super_admin),
+    db: Session = Depends(get_db),
+):
+    """Email counts per delivery status and the most recent emails (queued | sending | sent | failed)"""
+    counts = dict(db.query(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all())
+    query = db.query(EmailOutbox)
+    if status:
+        query = query.filter(EmailOutbox.status == status)
+    emails = query.order_by(EmailOutbox.id.desc()).limit(max(1, min(limit, 500))).all()
+    return {
+        "counts": counts,
+        "emails": [
+            {
+                "id": email.id,
+                "kind": email.kind,
+                "to_email": email.to_email,
+                "status": email.status,
+                "attempts": email.attempts,
+                "last_error": email.last_error,
+                "transport": email.transport,
+                "created_at": email.created_at.isoformat() if email.created_at else None,
+                "next_attempt_at": email.next_attempt_at.isoformat() if email.next_attempt_at else None,
+                "sent_at": email.sent_at.isoformat() if email.sent_at else None,
+            }
+            for email in emails
+        ],
+    }
+
 # Get subscription alerts (expiring soon, expired)
 @router.get("/subscriptions/alerts")
 def get_subscription_alerts(
@@ -972,6 +1112,7 @@ def update_subscription(
     
     subscription.updated_at = datetime.now(timezone.utc)
     db.commit()
+    invalidate_plan_status(subscription.company_id)
     db.refresh(subscription)
     
     return {
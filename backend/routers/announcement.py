@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timezone
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select
 
-from database import get_db
+from database import get_db, get_async_db
 from models.auth import User
 from models.announcement import Announcement
 from schemas.announcement import (
@@ -12,7 +13,7 @@ from schemas.announcement import (
     AnnouncementMutationResponse,
     AnnouncementClearResponse,
 )
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
 
 
 router = APIRouter(prefix="/announcements", tags=["Announcements"])
@@ -52,9 +53,9 @@ def _require_super_admin(current_user: User) -> None:
 
 
 @router.get("/current", response_model=AnnouncementResponse)
-def get_current_announcement(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_current_announcement(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     # Any authenticated user can read the active announcement.
     _ = current_user
@@ -63,17 +64,17 @@ def get_current_announcement(
     user_role_key = _normalize_role(current_user.role)
 
     # Prefer role-specific announcement when present.
-    role_announcement = (
-        db.query(Announcement)
-        .filter(
+    role_announcement = (await db.execute(
+        select(Announcement)
+        .where(
             Announcement.is_active == True,
             Announcement.starts_at <= now_utc,
             or_(Announcement.ends_at.is_(None), Announcement.ends_at >= now_utc),
             Announcement.target_role == user_role_key,
         )
         .order_by(Announcement.starts_at.desc(), Announcement.created_at.desc())
-        .first()
-    )
+        .limit(1)
+    )).scalars().first()
 
     if role_announcement:
         return AnnouncementResponse(
@@ -84,17 +85,17 @@ def get_current_announcement(
             updated_at=role_announcement.updated_at or role_announcement.created_at,
         )
 
-    announcement = (
-        db.query(Announcement)
-        .filter(
+    announcement = (await db.execute(
+        select(Announcement)
+        .where(
             Announcement.is_active == True,
             Announcement.starts_at <= now_utc,
             or_(Announcement.ends_at.is_(None), Announcement.ends_at >= now_utc),
             or_(Announcement.target_role == "ALL", Announcement.target_role.is_(None)),
         )
         .order_by(Announcement.starts_at.desc(), Announcement.created_at.desc())
-        .first()
-    )
+        .limit(1)
+    )).scalars().first()
 
     if not announcement:
         return AnnouncementResponse(message="", target_role="ALL", starts_at=None, ends_at=None, updated_at=None)
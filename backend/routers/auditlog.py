@@ -1,15 +1,18 @@
 # backend/routers/auditlog.py
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from database import get_db, get_async_db
 from schemas.auditlog import LogBase, LeadResponse
-from .auth_utils import get_current_user, hash_password,get_default_avatar
+from .auth_utils import get_current_user, get_current_user_async, hash_password,get_default_avatar
 from models.auth import User
 from models.auditlog import Auditlog
-from models.territory import Territory
 from .logs_utils import serialize_instance, create_audit_log
 from services.plan_access import enforce_starter_restriction
+from services.role_scope import scoped_query
+from services.notification_counters import get_unread_summary, mark_read, mark_all_read
 
 router = APIRouter(
     prefix="/logs",
@@ -30,19 +33,35 @@ NOTIFICATION_ACTIONS = [
     "ACCOUNT_UPDATE",
 ]
 
+@router.get("/notifications/unread-count")
+async def get_unread_notification_count(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Unread badge count and newest notification id (the replay cursor for ?since=)"""
+    return await db.run_sync(get_unread_summary, current_user.id)
+
 @router.get("/notifications", response_model=List[LeadResponse])
-def get_user_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_user_notifications(
+    since: Optional[int] = Query(None, ge=0, description="Replay notifications with id > since, oldest first"),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get all audit logs for the current user as notifications"""
-    notifications = (
-        db.query(Auditlog)
-        .filter(Auditlog.user_id == current_user.id)
+    # LeadResponse includes the logger; load it up front (no lazy loads on an async session)
+    query = select(Auditlog).options(selectinload(Auditlog.logger)).where(Auditlog.user_id == current_user.id)
+
+    if since is not None:
+        # Catch-up after a websocket reconnect: only what the client has not seen yet
+        query = query.where(Auditlog.id > since).order_by(Auditlog.id.asc()).limit(limit or 100)
+        return (await db.execute(query)).scalars().all()
+
+    notifications = (await db.execute(
+        query
         .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
-        .limit(50)  # Limit to recent 50 notifications
-        .all()
-    )
+        .limit(limit or 50)  # Limit to recent 50 notifications
+    )).scalars().all()
     
     return notifications
 
@@ -53,54 +72,13 @@ def get_audit_logs(
 ):
     enforce_starter_restriction(db, current_user, "Audit logs")
 
-    # CEO or Admin: get all logs from the same company (including themselves)
-    if current_user.role in ["CEO", "Admin"]:
-        logs = (
-            db.query(Auditlog)
-            .join(User, Auditlog.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
-            .all()
-        )
-
-    # Group Manager or Manager: get all logs in company, excluding CEO/Admin logs
-    elif current_user.role in ["Group Manager"]:
-        logs = (
-            db.query(Auditlog)
-            .join(User, Auditlog.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
-            .all()
-        )
-    elif current_user.role in ["Manager"]:
-        # 1. Identify all users (Sales/Marketing) assigned to territories managed by this Manager
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
-
-        # 2. Fetch logs of those users + the Manager's own logs
-        logs = (
-            db.query(Auditlog)
-            .join(User, Auditlog.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            # Filter: The log must belong to a user in the managed territory OR the manager themselves
-            .filter(
-                (Auditlog.user_id.in_(subquery_user_ids)) | 
-                (Auditlog.user_id == current_user.id)
-            )
-            .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
-            .all()
-        )
-    else:
-        logs = (
-            db.query(Auditlog)
-            .filter(Auditlog.user_id == current_user.id)
-            .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
-            .all()
-        )    
+    # CEO/Admin: every company user's logs; Group Manager: all but CEO/Admin logs;
+    # Manager: their territory users' logs + their own; everyone else: their own.
+    logs = (
+        scoped_query(db, current_user, Auditlog, owner_attr="user_id", creator_attr=None)
+        .order_by(Auditlog.timestamp.desc(), Auditlog.id.desc())
+        .all()
+    )
 
     return logs
 
@@ -110,17 +88,10 @@ def mark_log_as_read(
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
-    # Find the log that belongs to this user
-    log = db.query(Auditlog).filter(
-        Auditlog.id == log_id, 
-        Auditlog.user_id == current_user.id
-    ).first()
-    
-    if not log:
+    # Only logs that belong to this user; the unread counter is decremented in the same commit
+    if mark_read(db, current_user.id, log_id) is None:
         raise HTTPException(status_code=404, detail="Notification not found")
-        
-    log.is_read = True
-    db.commit()
+
     return {"status": "success"}
 
 @router.patch("/mark-all-read")
@@ -129,11 +100,7 @@ def mark_all_logs_as_read(
     current_user: User = Depends(get_current_user)
 ):
     """Mark all unread notifications as read for the current user"""
-    db.query(Auditlog).filter(
-        Auditlog.user_id == current_user.id,
-        Auditlog.is_read == False
-    ).update({"is_read": True})
-    db.commit()
+    mark_all_read(db, current_user.id)
     return {"status": "success", "message": "All notifications marked as read"}
 
 
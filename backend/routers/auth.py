@@ -1,66 +1,40 @@
 #backend/routers/auth.py
 from fastapi import APIRouter, Depends, HTTPException, Response, Cookie, Request
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session, joinedload
-from database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from database import get_db, get_async_db
 from jose import jwt, JWTError
 from models.auth import User
 from models.auditlog import Auditlog
 from schemas.auth import UserCreate, UserLogin, UserResponse, EmailCheck, EmailCheckResponse, UserWithCompany, ForgotPasswordRequest, ForgotPasswordResponse, VerifyOtpRequest, VerifyOtpResponse, ResetPasswordRequest, ResetPasswordResponse
-from .auth_utils import hash_password, verify_password, create_access_token, get_default_avatar
+from .auth_utils import hash_password, verify_and_update_password, create_access_token, get_default_avatar
 from .aws_ses_utils import send_otp_email
 import requests, os
 from datetime import datetime, timezone, timedelta
 import random
-import time
-from services.subscription_lifecycle import apply_trial_lifecycle
+from services.ttl_store import ttl_store
+from services.subscription_lifecycle import apply_trial_lifecycle, get_plan_status
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 SECRET_KEY = os.getenv("SECRET_KEY", "defaultsecretkey")
 
-# 🔐 In-memory OTP store with expiration (email -> {otp, timestamp})
-otp_store = {}
+# 🔐 OTPs live in the shared TTL store (services/ttl_store.py) so any worker can verify them
+OTP_KEY_PREFIX = "otp:"
 
 def generate_otp() -> str:
     """Generate a random 6-digit OTP"""
     return "".join([str(random.randint(0, 9)) for _ in range(6)])
 
 def store_otp(email: str, otp: str, expiration_minutes: int = 1):
-    """Store OTP with expiration timestamp"""
-    otp_store[email] = {
-        "otp": otp,
-        "timestamp": time.time(),
-        "expiration_minutes": expiration_minutes
-    }
+    """Store OTP with expiration (replaces any earlier code for this email)"""
+    ttl_store.put(OTP_KEY_PREFIX + email, otp, ttl_seconds=expiration_minutes * 60)
 
 def verify_otp(email: str, otp: str) -> bool:
-    """Verify OTP and check if it's expired"""
-    if email not in otp_store:
-        return False
-    
-    stored = otp_store[email]
-    elapsed_minutes = (time.time() - stored["timestamp"]) / 60
-    
-    # Check if expired
-    if elapsed_minutes > stored["expiration_minutes"]:
-        del otp_store[email]
-        return False
-    
-    # Check if OTP matches
-    if stored["otp"] == otp:
-        del otp_store[email]  # Delete after successful verification
-        return True
-    
-    return False
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
+    """Verify OTP; a matching, unexpired code is consumed atomically (usable once)"""
+    return ttl_store.take(OTP_KEY_PREFIX + email, expected=otp) is not None
 
 def log_login_event(db: Session, db_user: User, request: Request):
     login_log = Auditlog(
@@ -79,7 +53,7 @@ from fastapi import Request
 from sqlalchemy.orm import joinedload
 
 @router.get("/me", response_model=UserResponse)
-def get_me(request: Request, db: Session = Depends(get_db)):
+async def get_me(request: Request, db: AsyncSession = Depends(get_async_db)):
     access_token = request.cookies.get("access_token")
     if not access_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -90,7 +64,12 @@ def get_me(request: Request, db: Session = Depends(get_db)):
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    user = db.query(User).options(joinedload(User.company)).filter(User.id == user_id).first()
+    # Everything UserResponse reads is loaded here: an async session cannot lazy-load later
+    user = (await db.execute(
+        select(User)
+        .options(joinedload(User.company), joinedload(User.manager), selectinload(User.assigned_territory))
+        .where(User.id == user_id)
+    )).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -103,7 +82,7 @@ def get_me(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=403, detail="Company subscription has been suspended. Please contact support or your administrator.")
         # Trial lifecycle / free-tier access rule
     if user.related_to_company:
-        subscription_status = apply_trial_lifecycle(db, user.related_to_company)
+        subscription_status = await db.run_sync(get_plan_status, user.related_to_company)
         if subscription_status.get("is_free_tier") and (user.role or "").strip().upper() != "CEO":
             raise HTTPException(
                 status_code=403,
@@ -173,7 +152,8 @@ def login(user: UserLogin, response: Response, request: Request, db: Session = D
     db_user = db.query(User).options(joinedload(User.company)).filter(User.email == user.email).first()
     if not db_user or not db_user.hashed_password:
         raise HTTPException(status_code=400, detail="Invalid credentials")
-    if not verify_password(user.password, db_user.hashed_password):
+    password_ok, upgraded_hash = verify_and_update_password(user.password, db_user.hashed_password)
+    if not password_ok:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
     # Check if user is active
@@ -193,6 +173,10 @@ def login(user: UserLogin, response: Response, request: Request, db: Session = D
             )
         setattr(db_user, "subscription_status", subscription_status)
     
+    # Legacy bcrypt / outdated Argon2 parameters: store the current hash (we know the password now)
+    if upgraded_hash:
+        db_user.hashed_password = upgraded_hash
+
     db_user.last_login = datetime.now(timezone.utc)
     log_login_event(db, db_user, request)
     db.commit()
@@ -381,14 +365,14 @@ def get_subscription_status(request: Request, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    return apply_trial_lifecycle(db, user.related_to_company)
+    return get_plan_status(db, user.related_to_company)
 
 
 @router.post("/forgot-password", response_model=ForgotPasswordResponse)
 def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db)):
     """
     Step 1: Request password reset with email.
-    Generates a 6-digit OTP and sends it via AWS SES email.
+    Generates a 6-digit OTP and queues it for email delivery (services/email_outbox.py).
     OTP expires in 1 minute. Returns generic message for security.
     """
     # Validate email format
@@ -415,8 +399,8 @@ def forgot_password(request: ForgotPasswordRequest, db: Session = Depends(get_db
     otp = generate_otp()
     store_otp(request.email, otp, expiration_minutes=1)
     
-    # Send OTP via AWS SES
-    email_sent = send_otp_email(request.email, otp)
+    # Queue the OTP email; it is delivered in the background
+    email_sent = send_otp_email(db, request.email, otp, expiration_minutes=1)
     
     if email_sent:
         return {
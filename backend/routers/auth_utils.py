@@ -1,39 +1,24 @@
-from passlib.context import CryptContext
-from passlib.exc import UnknownHashError
 from jose import JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import SessionLocal, SECRET_KEY
+from database import SECRET_KEY, get_db, get_async_db
 from datetime import datetime, timedelta
 import os
 from fastapi import Depends, HTTPException, Request
 from models.auth import User
 import string
-from services.subscription_lifecycle import apply_trial_lifecycle
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-# Support legacy bcrypt hashes and new argon2 hashes.
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+from services.subscription_lifecycle import get_plan_status
+from services.password_hashing import hash_password, verify_and_update as verify_and_update_password
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 
-def hash_password(password: str) -> str:
-    """Hash password safely using Argon2"""
-    return pwd_context.hash(password)
+# Argon2 hashing (legacy bcrypt hashes still verify) runs on a bounded pool: services/password_hashing.py
 
 def verify_password(plain_password, hashed_password) -> bool:
     """Verify password using configured hash schemes."""
-    try:
-        return pwd_context.verify(plain_password, hashed_password)
-    except (UnknownHashError, ValueError, TypeError):
-        return False
+    return verify_and_update_password(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -41,7 +26,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+def _token_subject(request: Request) -> str:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -53,7 +38,10 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
             raise HTTPException(status_code=401, detail="Invalid token")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id
+
 
+def _load_current_user(db: Session, user_id: str) -> User:
     user = db.query(User).filter(User.id == int(user_id)).first()
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
@@ -64,7 +52,7 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
 
     # Trial lifecycle / plan enforcement
     if user.related_to_company:
-        subscription_status = apply_trial_lifecycle(db, user.related_to_company)
+        subscription_status = get_plan_status(db, user.related_to_company)
 
         # Free tier: only the tenant (CEO) can access the account
         if subscription_status.get("is_free_tier") and (user.role or "").strip().upper() != "CEO":
@@ -79,6 +67,15 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
     return user
 
 
+def get_current_user(request: Request, db: Session = Depends(get_db)):
+    return _load_current_user(db, _token_subject(request))
+
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for async handlers on get_async_db (the user is bound to that session)."""
+    return await db.run_sync(_load_current_user, _token_subject(request))
+
+
 # Avatar based on first letter of first name
 DEFAULT_AVATAR_BASE = "https://ik.imagekit.io/cafedejur/avatars"
 
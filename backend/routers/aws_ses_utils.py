@@ -1,12 +1,24 @@
-from dotenv import load_dotenv
-import os
-import boto3
-from botocore.exceptions import ClientError
+"""Email templates. Each send_* helper queues its email in the outbox (services/email_outbox.py)
+and returns at once; delivery, retries and status tracking happen in the background.
+Pass commit=False to queue inside a larger transaction (the email goes out when it commits).
+"""
+from datetime import timedelta
 
-load_dotenv()
+from sqlalchemy.orm import Session
 
-def send_welcome_email(to_email: str, first_name: str, password: str, role: str):
-    ses = boto3.client("ses", region_name=os.getenv("AWS_DEFAULT_REGION"))
+from services.email_outbox import enqueue_email
+
+
+def _queue(db: Session, kind: str, to_email: str, subject: str, body_text: str, body_html: str,
+           commit: bool, expires_in: timedelta | None = None):
+    email = enqueue_email(db, kind, to_email, subject, body_text, body_html, expires_in=expires_in)
+    if commit:
+        db.commit()
+    return email
+
+
+def send_welcome_email(db: Session, to_email: str, first_name: str, password: str, role: str, commit: bool = True):
+    """Queue the welcome email with the new user's login credentials"""
 
     subject = "Welcome to Forekas CRM"
     body_text = (
@@ -34,26 +46,11 @@ def send_welcome_email(to_email: str, first_name: str, password: str, role: str)
     </html>
     """
 
-    try:
-        ses.send_email(
-            Source="no-reply@forekas.com",  # must be verified in SES
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    "Text": {"Data": body_text},
-                    "Html": {"Data": body_html},
-                },
-            },
-        )
-        print(f"✅ Email sent to {to_email}")
-    except ClientError as e:
-        print(f"❌ Failed to send email to {to_email}: {e.response['Error']['Message']}")
-
-
-def send_otp_email(to_email: str, otp: str):
-    """Send OTP via AWS SES for password reset"""
-    ses = boto3.client("ses", region_name=os.getenv("AWS_DEFAULT_REGION"))
+    return _queue(db, "welcome", to_email, subject, body_text, body_html, commit)
+
+
+def send_otp_email(db: Session, to_email: str, otp: str, expiration_minutes: int = 1, commit: bool = True):
+    """Queue the password reset OTP; it is dropped if it cannot be delivered before the code expires"""
 
     subject = "Your Password Reset Code"
     body_text = (
@@ -78,31 +75,12 @@ def send_otp_email(to_email: str, otp: str):
     </html>
     """
 
-    try:
-        ses.send_email(
-            Source="no-reply@forekas.com",  # must be verified in SES
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    "Text": {"Data": body_text},
-                    "Html": {"Data": body_html},
-                },
-            },
-        )
-        print(f"✅ OTP email sent to {to_email}")
-        return True
-    except ClientError as e:
-        error_msg = e.response['Error']['Message']
-        print(f"❌ Failed to send OTP email to {to_email}: {error_msg}")
-        # 🔧 Fallback for testing - print OTP to console if AWS SES fails
-        print(f"⚠️  TESTING MODE: OTP for {to_email} is: {otp}")
-        return True  # Return True to allow testing even if AWS fails
-
-
-def send_trial_ending_soon_email(to_email: str, first_name: str, days_remaining: int):
-    """Send trial ending reminder via AWS SES."""
-    ses = boto3.client("ses", region_name=os.getenv("AWS_DEFAULT_REGION"))
+    return _queue(db, "otp", to_email, subject, body_text, body_html, commit,
+                  expires_in=timedelta(minutes=expiration_minutes))
+
+
+def send_trial_ending_soon_email(db: Session, to_email: str, first_name: str, days_remaining: int, commit: bool = True):
+    """Queue the trial ending reminder."""
 
     subject = f"Your Forekas CRM trial ends in {days_remaining} day(s)"
     body_text = (
@@ -127,26 +105,12 @@ def send_trial_ending_soon_email(to_email: str, first_name: str, days_remaining:
     </html>
     """
 
-    try:
-        ses.send_email(
-            Source="no-reply@forekas.com",
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    "Text": {"Data": body_text},
-                    "Html": {"Data": body_html},
-                },
-            },
-        )
-        print(f"✅ Trial ending email sent to {to_email}")
-    except ClientError as e:
-        print(f"❌ Failed to send trial email to {to_email}: {e.response['Error']['Message']}")
-
-
-def send_password_reset_email(to_email: str, first_name: str, last_name: str, new_password: str):
-    """Send new password via AWS SES after admin resets user password"""
-    ses = boto3.client("ses", region_name=os.getenv("AWS_DEFAULT_REGION"))
+    return _queue(db, "trial_ending", to_email, subject, body_text, body_html, commit)
+
+
+def send_password_reset_email(db: Session, to_email: str, first_name: str, last_name: str, new_password: str,
+                              commit: bool = True):
+    """Queue the new password after an admin resets a user's password"""
 
     subject = "Your Password Has Been Reset"
     body_text = (
@@ -176,20 +140,4 @@ def send_password_reset_email(to_email: str, first_name: str, last_name: str, ne
     </html>
     """
 
-    try:
-        ses.send_email(
-            Source="no-reply@forekas.com",
-            Destination={"ToAddresses": [to_email]},
-            Message={
-                "Subject": {"Data": subject},
-                "Body": {
-                    "Text": {"Data": body_text},
-                    "Html": {"Data": body_html},
-                },
-            },
-        )
-        print(f"✅ Password reset email sent to {to_email}")
-        return True
-    except ClientError as e:
-        print(f"❌ Failed to send password reset email to {to_email}: {e.response['Error']['Message']}")
-        return False
+    return _queue(db, "password_reset", to_email, subject, body_text, body_html, commit)
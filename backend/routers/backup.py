@@ -1,23 +1,24 @@
 from __future__ import annotations
 
-import csv
-import io
-import zipfile
 from datetime import datetime, timezone
-from typing import Any
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
 from fastapi.responses import StreamingResponse
-from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
-from database import Base, get_db
+from database import engine, get_db
 from models.auditlog import Auditlog
 from models.auth import User
+from models.backup import BackupRun
 from models.company import Company
+from .admin import get_current_super_admin
 from .auth_utils import get_current_user
 from .logs_utils import create_audit_log
 from services.plan_access import get_current_plan
+from services.backup_export import ExportStats, finish_backup_run, run_manifest, start_backup_run, stream_backup_zip
+from services.backup_jobs import backup_filename, enqueue_backup_job, serialize_backup_job
+from services.backup_restore import RestoreError, restore_archives
 
 
 router = APIRouter(
@@ -29,66 +30,8 @@ def _normalize_role(role: str | None) -> str:
     return (role or "").strip().upper()
 
 
-def _serialize_csv_value(value: Any) -> Any:
-    if value is None:
-        return None
-    if isinstance(value, datetime):
-        # Keep consistent, machine-readable timestamps
-        if value.tzinfo is None:
-            return value.replace(tzinfo=timezone.utc).isoformat()
-        return value.isoformat()
-    return str(value) if not isinstance(value, (int, float, bool, str)) else value
-
-
-def _write_model_to_csv_bytes(
-    db: Session,
-    model,
-    company_id: int | None,
-    company_user_ids: list[int],
-) -> bytes:
-    mapper = model.__mapper__
-    columns = list(mapper.columns)
-    fieldnames = [c.key for c in columns]
-
-    query = db.query(model)
-
-    # Prefer explicit company scoping.
-    col_keys = {c.key for c in columns}
-    if company_id is not None and "company_id" in col_keys:
-        query = query.filter(getattr(model, "company_id") == company_id)
-    elif company_id is not None and "related_to_company" in col_keys:
-        query = query.filter(getattr(model, "related_to_company") == company_id)
-    elif company_user_ids:
-        # Heuristic: if a table references users, scope by user ids.
-        user_fk_cols = []
-        for c in columns:
-            try:
-                if any(getattr(fk.column.table, "name", None) == "users" for fk in c.foreign_keys):
-                    user_fk_cols.append(c)
-            except Exception:
-                continue
-        if user_fk_cols:
-            query = query.filter(or_(*[col.in_(company_user_ids) for col in user_fk_cols]))
-
-    output = io.StringIO(newline="")
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction="ignore")
-    writer.writeheader()
-
-    for row in query.yield_per(1000):
-        writer.writerow({
-            name: _serialize_csv_value(getattr(row, name, None))
-            for name in fieldnames
-        })
-
-    return output.getvalue().encode("utf-8")
-
-
-@router.get("/admin/backup/csv")
-def download_backup_csv_zip(
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+def _authorize_backup(db: Session, current_user: User) -> int:
+    """Role and plan checks shared by the download and job endpoints; returns the company id."""
     role = _normalize_role(current_user.role)
     if role not in {"CEO", "ADMIN"}:
         raise HTTPException(status_code=403, detail="Only Admin/CEO can download backups")
@@ -131,6 +74,18 @@ def download_backup_csv_zip(
                 ),
             )
 
+    return company_id
+
+
+@router.get("/admin/backup/csv")
+def download_backup_csv_zip(
+    request: Request,
+    mode: str = Query("full", pattern="^(full|differential)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    company_id = _authorize_backup(db, current_user)
+
     company_user_ids = [
         row[0]
         for row in db.query(User.id)
@@ -138,42 +93,26 @@ def download_backup_csv_zip(
         .all()
     ]
 
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
-    filename = f"crm-backup-company-{company_id}-{timestamp}.zip"
+    # Differential: only rows changed since the company's last completed backup. Recorded as a
+    # "download" run so it never counts as a manual job in progress (POST /admin/backup/jobs).
+    run = start_backup_run(db, company_id, current_user.id, mode=mode, trigger="download")
+
+    filename = backup_filename(company_id, run.mode, datetime.now(timezone.utc))
 
     def zip_generator():
-        with io.BytesIO() as buffer:
-            with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-                tables_exported = 0
-                for mapper in Base.registry.mappers:
-                    model = mapper.class_
-                    table_name = mapper.local_table.name
-                    if not table_name or table_name.startswith("sqlite_"):
-                        continue
-                    try:
-                        csv_bytes = _write_model_to_csv_bytes(
-                            db=db,
-                            model=model,
-                            company_id=company_id,
-                            company_user_ids=company_user_ids,
-                        )
-                        zf.writestr(f"{table_name}.csv", csv_bytes)
-                        tables_exported += 1
-                    except Exception as exc:
-                        import traceback
-                        error_details = f"Exception: {exc}\n\nTraceback:\n{traceback.format_exc()}"
-                        zf.writestr(f"{table_name}.ERROR.txt", error_details)
-                        try:
-                            db.rollback()
-                        except Exception:
-                            pass
-            buffer.seek(0)
-            chunk_size = 8192
-            while True:
-                chunk = buffer.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
+        # Compressed chunks are sent as rows are read; the archive is never held in memory.
+        stats = ExportStats()
+        try:
+            yield from stream_backup_zip(
+                db, company_id, company_user_ids, stats,
+                since=run.since, manifest=run_manifest(db, run),
+            )
+        except BaseException:
+            # Includes GeneratorExit / cancellation when the client disconnects mid-download
+            finish_backup_run(db, run, stats, status="failed")
+            raise
+        finish_backup_run(db, run, stats)
+        tables_exported = stats.tables_exported
 
         # Record audit log (best-effort): the backup was generated for download.
         try:
@@ -188,8 +127,11 @@ def download_backup_csv_zip(
                     "format": "csv",
                     "company_id": company_id,
                     "tables_exported": tables_exported,
+                    "mode": run.mode,
+                    "backup_id": run.id,
+                    "rows_exported": stats.rows_exported,
                 },
-                custom_message=f"downloaded CSV backup (tables: {tables_exported})",
+                custom_message=f"downloaded {run.mode} CSV backup (tables: {tables_exported})",
             )
         except Exception:
             pass
@@ -199,3 +141,117 @@ def download_backup_csv_zip(
         media_type="application/zip",
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
+
+
+# =====================================================
+# Background backup jobs
+# =====================================================
+@router.post("/admin/backup/jobs", status_code=202)
+def create_backup_job(
+    mode: str = Query("full", pattern="^(full|differential)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queue a backup; poll GET /admin/backup/jobs/{id} (or wait for the backup_ready
+    notification) for the download_url.
+    """
+    company_id = _authorize_backup(db, current_user)
+
+    active = (
+        db.query(BackupRun)
+        .filter(
+            BackupRun.company_id == company_id,
+            BackupRun.trigger == "manual",
+            BackupRun.status.in_(["queued", "running"]),
+        )
+        .first()
+    )
+    if active:
+        raise HTTPException(status_code=409, detail={"message": "A backup is already in progress", "job": serialize_backup_job(active)})
+
+    run = enqueue_backup_job(db, company_id, current_user.id, mode=mode)
+    return serialize_backup_job(run)
+
+
+@router.get("/admin/backup/jobs")
+def list_backup_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if _normalize_role(current_user.role) not in {"CEO", "ADMIN"}:
+        raise HTTPException(status_code=403, detail="Only Admin/CEO can view backups")
+
+    runs = (
+        db.query(BackupRun)
+        .filter(BackupRun.company_id == current_user.related_to_company)
+        .order_by(BackupRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [serialize_backup_job(run) for run in runs]
+
+
+@router.get("/admin/backup/jobs/{job_id}")
+def get_backup_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if _normalize_role(current_user.role) not in {"CEO", "ADMIN"}:
+        raise HTTPException(status_code=403, detail="Only Admin/CEO can view backups")
+
+    run = (
+        db.query(BackupRun)
+        .filter(BackupRun.id == job_id, BackupRun.company_id == current_user.related_to_company)
+        .first()
+    )
+    if not run:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    return serialize_backup_job(run)
+
+
+@router.post("/admin/backup/restore")
+def restore_backup_csv_zip(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    company_id: Optional[int] = Form(None),
+    dry_run: bool = Form(True),
+    db: Session = Depends(get_db),
+    current_admin: User = Depends(get_current_super_admin),
+):
+    """
+    Restore a backup chain (full zip, then differential zips in order) into `company_id`,
+    or into a new company when it is omitted. Defaults to a dry-run validation pass.
+    """
+    try:
+        report = restore_archives(engine, [upload.file for upload in files], company_id=company_id, dry_run=dry_run)
+    except RestoreError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    result = report.to_dict()
+    if not report.ok:
+        raise HTTPException(status_code=422, detail=result)
+
+    if not dry_run:
+        try:
+            company = db.query(Company).filter(Company.id == report.company_id).first()
+            create_audit_log(
+                db=db,
+                current_user=current_admin,
+                instance=company or current_admin,
+                action="RESTORE",
+                request=request,
+                new_data={
+                    "format": "csv",
+                    "company_id": report.company_id,
+                    "archives": [a.get("backup_id") for a in report.archives],
+                    "rows": result["rows"],
+                },
+                custom_message=f"restored CSV backup into company {report.company_id} ({result['rows']} rows)",
+            )
+        except Exception:
+            pass
+
+    return result
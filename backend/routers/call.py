@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Union
 from datetime import datetime, timezone
 import json
 
-from database import get_db
+from database import get_db, get_async_db
 from models.call import Call, CallStatus, CallDirection
 from models.auth import User
 from models.account import Account
@@ -13,9 +14,11 @@ from models.lead import Lead
 from models.deal import Deal
 from models.quote import Quote
 from schemas.call import CallCreate, CallResponse, CallUpdate, CallBulkDelete
-from .auth_utils import get_current_user
-from .logs_utils import serialize_instance, create_audit_log
-from models.territory import Territory
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from services.plan_access import get_current_plan
 
 router = APIRouter(
@@ -24,6 +27,21 @@ router = APIRouter(
 )
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
+
+CALL_LIST_SPEC = ListSpec(
+    model=Call,
+    sort_fields={
+        "subject": Call.subject,
+        "status": Call.status,
+        "call_time": Call.call_time,
+        "created_at": Call.created_at,
+        "updated_at": Call.updated_at,
+    },
+    status_column=Call.status,
+    owner_column=Call.assigned_to,
+    date_column=Call.call_time,
+    text_columns=(Call.subject, Call.notes),
+)
 FREE_CALLS_MONTHLY_LIMIT = 50
 
 
@@ -40,9 +58,8 @@ def _enforce_free_monthly_calls_limit(db: Session, current_user: User):
 
     calls_count = (
         db.query(Call.id)
-        .join(User, Call.created_by == User.id)
         .filter(
-            User.related_to_company == current_user.related_to_company,
+            Call.company_id == current_user.related_to_company,
             Call.created_at >= month_start,
             Call.created_at < next_month_start,
         )
@@ -56,7 +73,7 @@ def _enforce_free_monthly_calls_limit(db: Session, current_user: User):
         )
 
 @router.post("/create", response_model=CallResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(
+def create_task(
     payload: CallCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -142,62 +159,21 @@ async def create_task(
     return new_call
 
 
-@router.get("/admin/fetch-all", response_model=List[CallResponse])
-def admin_get_calls(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[List[CallResponse], Page[CallResponse]])
+async def admin_get_calls(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Get all calls for admin users"""
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        # Admins can see all calls including INACTIVE ones
-        call = (
-            db.query(Call)
-            .join(User, Call.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        # GROUP MANAGER can see all company calls (except those assigned to CEO/ADMIN and INACTIVE)
-        call = (
-            db.query(Call)
-            .join(User, Call.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "ADMIN"]))
-            .filter(Call.status != CallStatus.INACTIVE)
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+    def build_query(session: Session):
+        query = scoped_query(session, current_user, Call)
+        if current_user.role.upper() not in ["CEO", "ADMIN"]:
+            # Only admins see INACTIVE (archived) calls
+            query = query.filter(Call.status != CallStatus.INACTIVE)
+        return query
 
-        call = (
-            db.query(Call)
-            .join(User, Call.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Call.assigned_to == current_user.id) | # Calls assigned to manager
-                (Call.created_by == current_user.id)
-            )
-            .filter(Call.status != CallStatus.INACTIVE)
-            .all()
-        )
-    else:
-        # SALES users - show only their active (non-INACTIVE) calls
-        call = (
-            db.query(Call)
-            .filter(
-                (Call.assigned_to == current_user.id) | 
-                (Call.created_by == current_user.id)
-            )
-            .filter(Call.status != CallStatus.INACTIVE)
-            .all()
-        )
-
-    return call
+    return await paginate_query_async(db, build_query, CALL_LIST_SPEC, params, CallResponse)
 
 
 @router.put("/bulk-archive", status_code=status.HTTP_200_OK)
@@ -224,29 +200,30 @@ def bulk_archive_calls(
     if not calls_to_archive:
         raise HTTPException(status_code=404, detail="No matching calls found for archiving.")
 
-    archived_count = 0
-    for call in calls_to_archive:
-        old_data = serialize_instance(call)
-        call_name = call.subject
-        
-        # Mark as INACTIVE instead of hard delete
-        call.status = CallStatus.INACTIVE
-        db.flush()
-        new_data = serialize_instance(call)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=call,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            new_data=new_data,
-            custom_message=f"archive call '{call_name}'"
-        )
-        archived_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        for call in calls_to_archive:
+            old_data = serialize_instance(call)
+            call_name = call.subject
 
-    db.commit()
+            # Mark as INACTIVE instead of hard delete
+            call.status = CallStatus.INACTIVE
+            db.flush()
+            new_data = serialize_instance(call)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=call,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                new_data=new_data,
+                custom_message=f"archive call '{call_name}'"
+            )
+            archived_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {archived_count} call(s)."}
 
@@ -462,29 +439,30 @@ def bulk_delete_calls(
     if not calls_to_archive:
         raise HTTPException(status_code=404, detail="No matching calls found for archiving.")
 
-    archived_count = 0
-    for call in calls_to_archive:
-        old_data = serialize_instance(call)
-        call_name = call.subject
-        
-        # Mark as INACTIVE instead of hard delete
-        call.status = CallStatus.INACTIVE
-        db.flush()  # Flush changes but don't commit yet
-        new_data = serialize_instance(call)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=call,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            new_data=new_data,
-            custom_message=f"archive call '{call_name}'"
-        )
-        archived_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        for call in calls_to_archive:
+            old_data = serialize_instance(call)
+            call_name = call.subject
 
-    db.commit()
+            # Mark as INACTIVE instead of hard delete
+            call.status = CallStatus.INACTIVE
+            db.flush()  # Flush changes but don't commit yet
+            new_data = serialize_instance(call)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=call,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                new_data=new_data,
+                custom_message=f"archive call '{call_name}'"
+            )
+            archived_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {archived_count} call(s)."}
 
@@ -512,29 +490,30 @@ def admin_bulk_delete_calls(
         if not calls_to_delete:
             raise HTTPException(status_code=404, detail="No matching calls found for archiving.")
 
-        archived_count = 0
-        for call in calls_to_delete:
-            old_data = serialize_instance(call)
-            call_name = call.subject
-            
-            # Archive instead of hard delete
-            call.status = CallStatus.INACTIVE
-            db.flush()
-            new_data = serialize_instance(call)
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=call,
-                action="UPDATE",
-                request=request,
-                old_data=old_data,
-                new_data=new_data,
-                custom_message=f"bulk archive call '{call_name}'"
-            )
-            archived_count += 1
-
-        db.commit()
+        with buffered_audit_logs(db) as audit_logs:
+            archived_count = 0
+            for call in calls_to_delete:
+                old_data = serialize_instance(call)
+                call_name = call.subject
+
+                # Archive instead of hard delete
+                call.status = CallStatus.INACTIVE
+                db.flush()
+                new_data = serialize_instance(call)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=call,
+                    action="UPDATE",
+                    request=request,
+                    old_data=old_data,
+                    new_data=new_data,
+                    custom_message=f"bulk archive call '{call_name}'"
+                )
+                archived_count += 1
+
+            audit_logs.commit()
         return {"detail": f"Successfully archived {archived_count} call(s)."}
     else:
         # CEO, ADMIN, MANAGER can hard delete any calls in their company
@@ -552,27 +531,28 @@ def admin_bulk_delete_calls(
         if not calls_to_delete:
             raise HTTPException(status_code=404, detail="No matching calls found for deletion.")
 
-        deleted_count = 0
-        for call in calls_to_delete:
-            deleted_data = serialize_instance(call)
-            call_name = call.subject
-            target_user_id = call.assigned_to or call.created_by
-
-            db.delete(call)
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=call,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete call '{call_name}' via admin panel"
-            )
-            deleted_count += 1
-
-        db.commit()
+        with buffered_audit_logs(db) as audit_logs:
+            deleted_count = 0
+            for call in calls_to_delete:
+                deleted_data = serialize_instance(call)
+                call_name = call.subject
+                target_user_id = call.assigned_to or call.created_by
+
+                db.delete(call)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=call,
+                    action="DELETE",
+                    request=request,
+                    old_data=deleted_data,
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk delete call '{call_name}' via admin panel"
+                )
+                deleted_count += 1
+
+            audit_logs.commit()
 
         return {"detail": f"Successfully deleted {deleted_count} call(s)."}
 
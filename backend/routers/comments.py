@@ -16,8 +16,8 @@ from models.task import Task
 from models.meeting import Meeting
 from models.call import Call
 from models.quote import Quote
-from models.territory import Territory
 from routers.auth_utils import get_current_user
+from services.role_scope import scoped_query
 from schemas.comment import CommentCreate, CommentResponse
 
 
@@ -35,64 +35,16 @@ _RELATED_TYPE_MAP: dict[str, tuple[str, Type[Any]]] = {
 }
 
 
-def _get_company_user_ids_subquery(db: Session, current_user: User):
-    if not getattr(current_user, "related_to_company", None):
-        return None
-    return (
-        db.query(User.id)
-        .filter(User.related_to_company == current_user.related_to_company)
-        .subquery()
-    )
-
-
 def _role_scoped_entity_query(db: Session, current_user: User, model: Type[Any]):
-    role = (current_user.role or "").upper()
-    query = db.query(model)
-
     if not hasattr(model, "assigned_to") or not hasattr(model, "created_by"):
-        return query
-
-    company_user_ids = _get_company_user_ids_subquery(db, current_user)
-
-    if role in ["CEO", "ADMIN"]:
-        if company_user_ids is None:
-            return query.filter(or_(model.assigned_to == current_user.id, model.created_by == current_user.id))
-        return query.filter(or_(model.assigned_to.in_(company_user_ids), model.created_by.in_(company_user_ids)))
-
-    if role == "GROUP MANAGER":
-        if company_user_ids is None:
-            return query.filter(or_(model.assigned_to == current_user.id, model.created_by == current_user.id))
-
-        non_admin_company_user_ids = (
-            db.query(User.id)
-            .filter(
-                User.related_to_company == current_user.related_to_company,
-                ~User.role.in_(["CEO", "Admin"]),
-            )
-            .subquery()
-        )
-        return query.filter(or_(model.assigned_to.in_(non_admin_company_user_ids), model.created_by.in_(non_admin_company_user_ids)))
-
-    if role == "MANAGER":
-        territory_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
-
-        if company_user_ids is not None:
-            query = query.filter(or_(model.assigned_to.in_(company_user_ids), model.created_by.in_(company_user_ids)))
-
-        return query.filter(
-            or_(
-                model.assigned_to.in_(territory_user_ids),
-                model.assigned_to == current_user.id,
-                model.created_by == current_user.id,
-            )
-        )
+        return db.query(model)
 
-    # Sales/Marketing/others: own records only
-    return query.filter(or_(model.assigned_to == current_user.id, model.created_by == current_user.id))
+    # Company-wide roles match records assigned to *or* created by anyone in scope.
+    role = (current_user.role or "").upper()
+    return scoped_query(
+        db, current_user, model,
+        match_creator_in_scope=role in ["CEO", "ADMIN", "GROUP MANAGER"],
+    )
 
 
 def _get_entity_or_403(db: Session, current_user: User, model: Type[Any], entity_id: int):
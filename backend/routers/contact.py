@@ -3,17 +3,21 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks, Body
 from sqlalchemy.orm import Session
+from typing import Union
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.contact import ContactBase, ContactResponse, ContactCreate, ContactUpdate, ContactBulkDelete
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
 from models.auth import User
 from models.contact import Contact, ContactStatus
 from models.account import Account
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from .ws_notification import broadcast_notification
-from models.territory import Territory
 
 router = APIRouter(
     prefix="/contacts",
@@ -22,6 +26,21 @@ router = APIRouter(
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER"}
 
+CONTACT_LIST_SPEC = ListSpec(
+    model=Contact,
+    sort_fields={
+        "first_name": Contact.first_name,
+        "last_name": Contact.last_name,
+        "status": Contact.status,
+        "created_at": Contact.created_at,
+        "updated_at": Contact.updated_at,
+    },
+    status_column=Contact.status,
+    owner_column=Contact.assigned_to,
+    date_column=Contact.created_at,
+    text_columns=(Contact.first_name, Contact.last_name, Contact.email, Contact.work_email, Contact.title),
+)
+
 
 def _clean_optional_string(value: str | None) -> str | None:
     if value is None:
@@ -119,58 +138,22 @@ def create_contact(
     return new_contact
 
 
-@router.get("/admin/fetch-all", response_model=list[ContactResponse])
-def admin_get_contacts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[list[ContactResponse], Page[ContactResponse]])
+async def admin_get_contacts(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     role = current_user.role.upper()
     
-    if role in ["CEO", "ADMIN"]:
-        contacts = (
-            db.query(Contact)
-            .join(User, Contact.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif role == "GROUP MANAGER":
-        contacts = (
-            db.query(Contact)
-            .join(User, Contact.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .all()
-        )
-    elif role == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+    def build_query(session: Session):
+        query = scoped_query(session, current_user, Contact)
+        if role not in ["CEO", "ADMIN", "GROUP MANAGER", "MANAGER"]:
+            # Sales users - exclude INACTIVE contacts
+            query = query.filter(Contact.status != ContactStatus.INACTIVE.value)
+        return query
 
-        contacts = (
-            db.query(Contact)
-            .join(User, Contact.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Contact.assigned_to == current_user.id) | # Leads owned by manager
-                (Contact.created_by == current_user.id)
-            ).all()
-        )
-    else:
-        # Sales users - exclude INACTIVE contacts
-        contacts = (
-            db.query(Contact)
-            .filter(
-                (Contact.assigned_to == current_user.id) | 
-                (Contact.created_by == current_user.id)
-            )
-            .filter(Contact.status != ContactStatus.INACTIVE.value)
-            .all()
-        )
-
-    return contacts
+    return await paginate_query_async(db, build_query, CONTACT_LIST_SPEC, params, ContactResponse)
 
 
 @router.get("/from-acc/{accID}", response_model=list[ContactResponse])
@@ -567,46 +550,46 @@ def admin_bulk_delete_contacts(
     if not contacts_to_delete:
         raise HTTPException(status_code=404, detail="No matching contacts found for deletion.")
 
-    deleted_count = 0
-    for contact in contacts_to_delete:
-        contact_name = ' '.join(filter(None, [contact.first_name, contact.last_name]))
-        target_user_id = contact.assigned_to or contact.created_by
-
-        if role in ALLOWED_ADMIN_ROLES:
-            # Admins perform hard delete
-            deleted_data = serialize_instance(contact)
-            db.delete(contact)
-
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=contact,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete contact '{contact_name}' via admin panel",
-            )
-        else:
-            # Sales users perform soft delete (mark as INACTIVE)
-            old_status = contact.status
-            contact.status = ContactStatus.INACTIVE.value
-            db.commit()
-
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=contact,
-                action="UPDATE",
-                request=request,
-                old_data={"status": old_status},
-                new_data={"status": contact.status},
-                target_user_id=target_user_id,
-                custom_message=f"bulk mark as inactive contact '{contact_name}' by creator via sales panel"
-            )
-        deleted_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+        for contact in contacts_to_delete:
+            contact_name = ' '.join(filter(None, [contact.first_name, contact.last_name]))
+            target_user_id = contact.assigned_to or contact.created_by
+
+            if role in ALLOWED_ADMIN_ROLES:
+                # Admins perform hard delete
+                deleted_data = serialize_instance(contact)
+                db.delete(contact)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=contact,
+                    action="DELETE",
+                    request=request,
+                    old_data=deleted_data,
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk delete contact '{contact_name}' via admin panel",
+                )
+            else:
+                # Sales users perform soft delete (mark as INACTIVE)
+                old_status = contact.status
+                contact.status = ContactStatus.INACTIVE.value
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=contact,
+                    action="UPDATE",
+                    request=request,
+                    old_data={"status": old_status},
+                    new_data={"status": contact.status},
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk mark as inactive contact '{contact_name}' by creator via sales panel"
+                )
+            deleted_count += 1
 
-    db.commit()
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} contact(s)."}
 
@@ -2,22 +2,27 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Union
 from datetime import datetime
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.deal import DealBase, DealResponse, DealCreate, DealUpdate, DealBulkDelete
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
 from models.auth import User
 from models.deal import Deal, DealStage, DealStatus, STAGE_PROBABILITY_MAP
 from models.account import Account
 from models.contact import Contact
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from .ws_notification import broadcast_notification
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import joinedload
-from models.territory import Territory
 from services.plan_access import get_current_plan
+from services.revenue_rollup import deal_revenue_keys, refresh_user_daily_revenue
 
 router = APIRouter(
     prefix="/deals",
@@ -27,6 +32,24 @@ router = APIRouter(
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
 FREE_DEALS_LIMIT = 50
 
+DEAL_LIST_SPEC = ListSpec(
+    model=Deal,
+    sort_fields={
+        "name": Deal.name,
+        "stage": Deal.stage,
+        "status": Deal.status,
+        "amount": Deal.amount,
+        "close_date": Deal.close_date,
+        "created_at": Deal.created_at,
+        "updated_at": Deal.updated_at,
+    },
+    status_column=Deal.status,
+    stage_column=Deal.stage,
+    owner_column=Deal.assigned_to,
+    date_column=Deal.created_at,
+    text_columns=(Deal.name, Deal.deal_id, Deal.description),
+)
+
 
 def _enforce_free_deals_limit(db: Session, current_user: User):
     if get_current_plan(db, current_user) != "free":
@@ -34,8 +57,7 @@ def _enforce_free_deals_limit(db: Session, current_user: User):
 
     deals_count = (
         db.query(Deal.id)
-        .join(User, Deal.created_by == User.id)
-        .filter(User.related_to_company == current_user.related_to_company)
+        .filter(Deal.company_id == current_user.related_to_company)
         .count()
     )
     if deals_count >= FREE_DEALS_LIMIT:
@@ -166,63 +188,20 @@ def create_deal(
     return new_deal
 
 
-@router.get("/admin/fetch-all", response_model=list[DealResponse])
-def admin_get_deals(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[list[DealResponse], Page[DealResponse]])
+async def admin_get_deals(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        # Admin users can see all deals including archived ones
-        deals = (
-            db.query(Deal)
-            .join(User, Deal.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .options(joinedload(Deal.deal_creator))
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        deals = (
-            db.query(Deal)
-            .join(User, Deal.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .filter(Deal.status != DealStatus.INACTIVE.value)
-            .options(joinedload(Deal.deal_creator))
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+    def build_query(session: Session):
+        query = scoped_query(session, current_user, Deal).options(joinedload(Deal.deal_creator))
+        if current_user.role.upper() not in ["CEO", "ADMIN"]:
+            # Only admins see archived deals
+            query = query.filter(Deal.status != DealStatus.INACTIVE.value)
+        return query
 
-        deals = (
-            db.query(Deal)
-            .join(User, Deal.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Deal.assigned_to == current_user.id) |
-                (Deal.created_by == current_user.id)
-            )
-            .filter(Deal.status != DealStatus.INACTIVE.value)
-            .options(joinedload(Deal.deal_creator))
-            .all()
-        )
-    else:
-        deals = (
-            db.query(Deal)
-            .filter(
-                (Deal.assigned_to == current_user.id) | 
-                (Deal.created_by == current_user.id)
-            )
-            .filter(Deal.status != DealStatus.INACTIVE.value)
-            .options(joinedload(Deal.deal_creator))
-            .all()
-        )
-
-    return deals
+    return await paginate_query_async(db, build_query, DEAL_LIST_SPEC, params, DealResponse)
 
 
 @router.get("/from-acc/{accID}", response_model=list[DealResponse])
@@ -318,6 +297,7 @@ def admin_create_deal(
     db.add(new_deal)
     db.flush()
     new_deal.generate_deal_id(db)
+    refresh_user_daily_revenue(db, deal_revenue_keys(new_deal))
     db.commit()
     db.refresh(new_deal)
 
@@ -381,6 +361,7 @@ def admin_update_deal(
 
     old_data = serialize_instance(deal)
     old_assigned_to = deal.assigned_to
+    old_revenue_keys = deal_revenue_keys(deal)
 
     # Update fields if provided
     if data.name is not None:
@@ -440,6 +421,7 @@ def admin_update_deal(
                 raise HTTPException(status_code=404, detail="Assigned user not found in your company.")
             deal.assigned_to = data.assigned_to
 
+    refresh_user_daily_revenue(db, old_revenue_keys | deal_revenue_keys(deal))
     db.commit()
     db.refresh(deal)
 
@@ -508,27 +490,31 @@ def admin_bulk_delete_deals(
     if not deals_to_delete:
         raise HTTPException(status_code=404, detail="No matching deals found for deletion.")
 
-    deleted_count = 0
-    for deal in deals_to_delete:
-        deleted_data = serialize_instance(deal)
-        deal_name = deal.name
-        target_user_id = deal.assigned_to or deal.created_by
-
-        db.delete(deal)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=deal,
-            action="DELETE",
-            request=request,
-            old_data=deleted_data,
-            target_user_id=target_user_id,
-            custom_message=f"bulk delete deal '{deal_name}' via admin panel"
-        )
-        deleted_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        revenue_keys = set()
+        deleted_count = 0
+        for deal in deals_to_delete:
+            revenue_keys |= deal_revenue_keys(deal)
+            deleted_data = serialize_instance(deal)
+            deal_name = deal.name
+            target_user_id = deal.assigned_to or deal.created_by
+
+            db.delete(deal)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=deal,
+                action="DELETE",
+                request=request,
+                old_data=deleted_data,
+                target_user_id=target_user_id,
+                custom_message=f"bulk delete deal '{deal_name}' via admin panel"
+            )
+            deleted_count += 1
 
-    db.commit()
+        refresh_user_daily_revenue(db, revenue_keys)
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} deal(s)."}
 
@@ -559,29 +545,30 @@ def bulk_archive_deals(
     if not deals_to_archive:
         raise HTTPException(status_code=404, detail="No matching deals found for archiving.")
 
-    archived_count = 0
-    for deal in deals_to_archive:
-        old_data = serialize_instance(deal)
-        deal_name = deal.name
-        
-        # Mark as INACTIVE instead of hard delete
-        deal.status = DealStatus.INACTIVE.value
-        db.flush()
-        new_data = serialize_instance(deal)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=deal,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            new_data=new_data,
-            custom_message=f"archive deal '{deal_name}'"
-        )
-        archived_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        for deal in deals_to_archive:
+            old_data = serialize_instance(deal)
+            deal_name = deal.name
+
+            # Mark as INACTIVE instead of hard delete
+            deal.status = DealStatus.INACTIVE.value
+            db.flush()
+            new_data = serialize_instance(deal)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=deal,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                new_data=new_data,
+                custom_message=f"archive deal '{deal_name}'"
+            )
+            archived_count += 1
 
-    db.commit()
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {archived_count} deal(s)."}
 
@@ -654,8 +641,10 @@ def admin_delete_deal(
     old_data = serialize_instance(deal)
     deal_name = deal.name
     target_user_id = deal.assigned_to or deal.created_by
+    revenue_keys = deal_revenue_keys(deal)
 
     db.delete(deal)
+    refresh_user_daily_revenue(db, revenue_keys)
     db.commit()
 
     create_audit_log(
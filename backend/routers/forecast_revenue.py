@@ -32,8 +32,7 @@ def get_forecast_revenue_summary(
 			date_filter = None
 
 	# Get all deals for the user's company, filter by date if custom
-	deals_query = db.query(Deal).join(User, Deal.assigned_to == User.id)
-	deals_query = deals_query.filter(User.related_to_company == current_user.related_to_company)
+	deals_query = db.query(Deal).filter(Deal.company_id == current_user.related_to_company)
 	deals_query = deals_query.filter(Deal.status != "Inactive")
 	if date_filter:
 		deals_query = deals_query.filter(Deal.close_date != None)
@@ -67,8 +66,8 @@ def get_forecast_revenue_summary(
 		Deal.stage == DealStage.CLOSED_WON.value,
 		Deal.status != "Inactive",
 		Deal.close_date != None,
-		User.related_to_company == current_user.related_to_company
-	).join(User, Deal.assigned_to == User.id)
+		Deal.company_id == current_user.related_to_company
+	)
 	if date_filter:
 		actuals_query = actuals_query.filter(Deal.close_date >= date_filter[0], Deal.close_date <= date_filter[1])
 	actuals = actuals_query.group_by('month').all()
@@ -112,8 +111,8 @@ def get_forecast_revenue_summary(
 				Deal.stage != DealStage.CLOSED_WON.value,
 				Deal.status != "Inactive",
 				Deal.close_date != None,
-				User.related_to_company == current_user.related_to_company
-			).join(User, Deal.assigned_to == User.id)
+				Deal.company_id == current_user.related_to_company
+			)
 			if date_filter:
 				forecasts_query = forecasts_query.filter(Deal.close_date >= date_filter[0], Deal.close_date <= date_filter[1])
 			forecasts = forecasts_query.group_by('month').all()
@@ -1,20 +1,25 @@
 # backend/routers/lead.py
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks, Body
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
+from typing import List, Union
+from database import get_db, get_async_db
 from schemas.lead import LeadCreate, LeadResponse, LeadStatusUpdate, LeadUpdate, LeadBulkDelete
 from schemas.auth import UserWithTerritories, UserResponse
-from .auth_utils import get_current_user, hash_password,get_default_avatar
+from .auth_utils import get_current_user, get_current_user_async, hash_password,get_default_avatar
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
 from models.auth import User
 from models.lead import Lead
 from models.account import Account
 from models.contact import Contact
 from models.territory import Territory
 from models.deal import Deal
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from sqlalchemy.orm import joinedload
 from .ws_notification import broadcast_notification
+from services.revenue_rollup import deal_revenue_keys, refresh_user_daily_revenue
 import asyncio
 from datetime import datetime
 
@@ -27,54 +32,32 @@ router = APIRouter(
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
 
-@router.get("/admin/getLeads", response_model=List[LeadResponse])
-def get_leads_admin(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # ✅ Get all leads whose owners belong to the same company as the current user
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        leads = (
-            db.query(Lead)
-            .join(User, Lead.lead_owner == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        leads = (
-            db.query(Lead)
-            .join(User, Lead.lead_owner == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+LEAD_LIST_SPEC = ListSpec(
+    model=Lead,
+    sort_fields={
+        "first_name": Lead.first_name,
+        "last_name": Lead.last_name,
+        "company_name": Lead.company_name,
+        "status": Lead.status,
+        "created_at": Lead.created_at,
+        "updated_at": Lead.updated_at,
+    },
+    status_column=Lead.status,
+    owner_column=Lead.lead_owner,
+    date_column=Lead.created_at,
+    text_columns=(Lead.first_name, Lead.last_name, Lead.company_name, Lead.email),
+)
 
-        leads = (
-            db.query(Lead)
-            .join(User, Lead.lead_owner == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Lead.lead_owner == current_user.id) | # Leads owned by manager
-                (Lead.created_by == current_user.id)
-            ).all()
-        )
-    else:
-        leads = (
-            db.query(Lead)
-            .filter(
-                (Lead.lead_owner == current_user.id) | 
-                (Lead.created_by == current_user.id)
-            ).all()
-        )
+@router.get("/admin/getLeads", response_model=Union[List[LeadResponse], Page[LeadResponse]])
+async def get_leads_admin(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    def build_query(session: Session):
+        return scoped_query(session, current_user, Lead, owner_attr="lead_owner")
 
-    return leads
+    return await paginate_query_async(db, build_query, LEAD_LIST_SPEC, params, LeadResponse)
 
 
 @router.get("/getUsers", response_model=list[UserResponse])
@@ -335,6 +318,7 @@ def delete_lead(
 
     old_data = serialize_instance(lead)
     lead_name = f"{lead.first_name} {lead.last_name}"
+    revenue_keys = set()
     
     # If lead is converted, find and delete associated Account, Contact, and Deal
     if lead.status == 'Converted':
@@ -369,6 +353,7 @@ def delete_lead(
             # Delete in order: Deal -> Contact -> Account (due to foreign key constraints)
             if deal:
                 deal_old_data = serialize_instance(deal)
+                revenue_keys |= deal_revenue_keys(deal)
                 db.delete(deal)
                 create_audit_log(
                     db=db,
@@ -395,6 +380,8 @@ def delete_lead(
             
             if account:
                 account_old_data = serialize_instance(account)
+                for account_deal in account.deals:
+                    revenue_keys |= deal_revenue_keys(account_deal)
                 db.delete(account)
                 create_audit_log(
                     db=db,
@@ -407,6 +394,7 @@ def delete_lead(
                 )
     
     db.delete(lead)
+    refresh_user_daily_revenue(db, revenue_keys)
     db.commit()
 
     create_audit_log(
@@ -567,26 +555,27 @@ def admin_bulk_delete_leads(
     if not leads_to_delete:
         raise HTTPException(status_code=404, detail="No matching leads found for deletion.")
 
-    deleted_count = 0
-    for lead in leads_to_delete:
-        deleted_data = serialize_instance(lead)
-        lead_name = f"{lead.first_name} {lead.last_name}"
-        target_user_id = lead.lead_owner or lead.created_by
-
-        db.delete(lead)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=lead,
-            action="DELETE",
-            request=request,
-            old_data=deleted_data,
-            target_user_id=target_user_id,
-            custom_message=f"bulk delete lead '{lead_name}' via admin panel"
-        )
-        deleted_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+        for lead in leads_to_delete:
+            deleted_data = serialize_instance(lead)
+            lead_name = f"{lead.first_name} {lead.last_name}"
+            target_user_id = lead.lead_owner or lead.created_by
+
+            db.delete(lead)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=lead,
+                action="DELETE",
+                request=request,
+                old_data=deleted_data,
+                target_user_id=target_user_id,
+                custom_message=f"bulk delete lead '{lead_name}' via admin panel"
+            )
+            deleted_count += 1
 
-    db.commit()
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} lead(s)."}
\ No newline at end of file
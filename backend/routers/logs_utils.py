@@ -5,11 +5,16 @@ from fastapi import Request
 from models.auditlog import Auditlog
 from models.auth import User
 from .auth_utils import get_current_user
+from .ws_notification import broadcast_notification
+import services.notification_counters  # noqa: F401  (registers the unread-counter flush hook)
 from fastapi import Depends
 from datetime import datetime, date
 from decimal import Decimal
+from contextlib import contextmanager
 import json
 
+AUDIT_BUFFER_KEY = "audit_log_buffer"
+
 def serialize_instance(instance):
     """Convert SQLAlchemy model instance into a dictionary safely."""
     import enum
@@ -59,7 +64,88 @@ def create_audit_log(
         ip_address=request.client.host if request else None,        
         success=True # Ensure this matches your model defaults
     )
+    buffer = db.info.get(AUDIT_BUFFER_KEY)
+    if buffer is not None:
+        # Inside buffered_audit_logs(): written with the business transaction
+        buffer.add(log)
+        return log
+
     db.add(log)
     db.commit()
     db.refresh(log) # Refresh to get the ID for the WebSocket
-    return log
\ No newline at end of file
+    return log
+
+
+class AuditLogBuffer:
+    """Collects the audit logs of one request so they are written in a single commit.
+
+    Logs are held back from the session (so per-row flushes in the endpoint do not insert
+    them one by one); commit() adds them all, flushes them together (one batched
+    INSERT ... RETURNING), commits the business transaction once, and only then queues the
+    websocket notifications registered with notify(), using the generated log ids.
+    """
+
+    def __init__(self, db: Session, background_tasks=None):
+        self.db = db
+        self.background_tasks = background_tasks
+        self.logs = []
+        self._notifications = []  # (log, target_user_id, notif_data)
+
+    def add(self, log: Auditlog):
+        self.logs.append(log)
+
+    def notify(self, log: Auditlog, target_user_id: int, notif_data: dict):
+        """Broadcast notif_data to target_user_id once `log` has been committed."""
+        if target_user_id and log is not None:
+            self._notifications.append((log, target_user_id, notif_data))
+
+    def release(self):
+        """Hand the pending logs to the session; the next commit writes them."""
+        self.db.add_all(self.logs)
+
+    def commit(self):
+        self.release()
+        self.db.flush()
+        # Read the ids now: commit() expires them and reloading would cost a query per log.
+        ids = {id(log): log.id for log in self.logs}
+        self.db.commit()
+
+        notifications, self._notifications = self._notifications, []
+        self.logs = []
+        if self.background_tasks is None:
+            return
+
+        for log, target_user_id, notif_data in notifications:
+            payload = dict(notif_data)
+            payload["id"] = ids.get(id(log))  # so /logs/mark-read/{id} works
+            payload["read"] = False
+            self.background_tasks.add_task(broadcast_notification, payload, target_user_id=target_user_id)
+
+
+@contextmanager
+def buffered_audit_logs(db: Session, background_tasks=None):
+    """Buffer create_audit_log() calls made with `db` until the returned buffer commits.
+
+    Usage in bulk endpoints:
+
+        with buffered_audit_logs(db, background_tasks) as audit_logs:
+            for row in rows:
+                ...
+                create_audit_log(db=db, ...)
+            audit_logs.commit()
+
+    Logs still pending when the block ends normally are added to the session for the
+    caller's own commit; on an exception they are discarded with the transaction.
+    """
+    if db.info.get(AUDIT_BUFFER_KEY) is not None:
+        # Nested use: the outer buffer owns the commit.
+        yield db.info[AUDIT_BUFFER_KEY]
+        return
+
+    buffer = AuditLogBuffer(db, background_tasks)
+    db.info[AUDIT_BUFFER_KEY] = buffer
+    try:
+        yield buffer
+        buffer.release()
+    finally:
+        db.info.pop(AUDIT_BUFFER_KEY, None)
\ No newline at end of file
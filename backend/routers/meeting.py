@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from typing import List
+from typing import List, Union
 from datetime import datetime, timedelta, timezone
 import json
 
-from database import get_db
+from database import get_db, get_async_db
 from models.meeting import Meeting, MeetingStatus
 from models.auth import User
 from models.account import Account
@@ -13,8 +14,11 @@ from models.lead import Lead
 from models.deal import Deal
 from models.quote import Quote
 from schemas.meeting import MeetingCreate, MeetingUpdate, MeetingResponse, MeetingBulkDelete
-from .auth_utils import get_current_user
-from .logs_utils import serialize_instance, create_audit_log
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from models.territory import Territory
 from services.plan_access import get_current_plan
 
@@ -24,6 +28,21 @@ router = APIRouter(
 )
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
+
+MEETING_LIST_SPEC = ListSpec(
+    model=Meeting,
+    sort_fields={
+        "subject": Meeting.subject,
+        "status": Meeting.status,
+        "start_time": Meeting.start_time,
+        "created_at": Meeting.created_at,
+        "updated_at": Meeting.updated_at,
+    },
+    status_column=Meeting.status,
+    owner_column=Meeting.assigned_to,
+    date_column=Meeting.start_time,
+    text_columns=(Meeting.subject, Meeting.location),
+)
 FREE_MEETINGS_MONTHLY_LIMIT = 50
 
 
@@ -40,9 +59,8 @@ def _enforce_free_monthly_meetings_limit(db: Session, current_user: User):
 
     meetings_count = (
         db.query(Meeting.id)
-        .join(User, Meeting.created_by == User.id)
         .filter(
-            User.related_to_company == current_user.related_to_company,
+            Meeting.company_id == current_user.related_to_company,
             Meeting.created_at >= month_start,
             Meeting.created_at < next_month_start,
         )
@@ -56,7 +74,7 @@ def _enforce_free_monthly_meetings_limit(db: Session, current_user: User):
         )
 
 @router.post("/create", response_model=MeetingResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(
+def create_task(
     payload: MeetingCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -141,66 +159,20 @@ async def create_task(
 
     return new_meeting
 
-@router.get("/admin/fetch-all", response_model=List[MeetingResponse])
-def admin_get_meetings(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[List[MeetingResponse], Page[MeetingResponse]])
+async def admin_get_meetings(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     """Get all meetings for admin users"""
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        # Get all users from the same company
-        company_user_ids = (
-            db.query(User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .subquery()
-        )
-        # Get all meetings assigned to or created by company users
-        meetings = (
-            db.query(Meeting)
-            .filter(Meeting.assigned_to.in_(company_user_ids))
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        # GROUP MANAGER can see all company meetings (except those assigned to CEO/ADMIN)
-        company_user_ids = (
-            db.query(User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "ADMIN"]))
-            .subquery()
-        )
-        meetings = (
-            db.query(Meeting)
-            .filter(Meeting.assigned_to.in_(company_user_ids))
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+    def build_query(session: Session):
+        query = scoped_query(session, current_user, Meeting)
+        if current_user.role.upper() not in ["CEO", "ADMIN", "GROUP MANAGER", "MANAGER"]:
+            query = query.filter(Meeting.status != MeetingStatus.INACTIVE)
+        return query
 
-        meetings = (
-            db.query(Meeting)
-            .join(User, Meeting.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Meeting.assigned_to == current_user.id) | # Leads owned by manager
-                (Meeting.created_by == current_user.id)
-            ).all()
-        )
-    else:
-        meetings = (
-            db.query(Meeting)
-            .filter(
-                ((Meeting.assigned_to == current_user.id) | 
-                (Meeting.created_by == current_user.id)) &
-                (Meeting.status != MeetingStatus.INACTIVE)
-            ).all()
-        )
-
-    return meetings
+    return await paginate_query_async(db, build_query, MEETING_LIST_SPEC, params, MeetingResponse)
 
 @router.get("/manager/leads/getLeads", response_model=list[MeetingResponse])
 def admin_get_accounts(
@@ -282,27 +254,28 @@ def admin_bulk_delete_meetings(
     if not meetings_to_delete:
         raise HTTPException(status_code=404, detail="No matching meetings found for deletion.")
 
-    deleted_count = 0
-    for meeting in meetings_to_delete:
-        deleted_data = serialize_instance(meeting)
-        meeting_name = meeting.subject
-        target_user_id = meeting.assigned_to or meeting.created_by
-
-        db.delete(meeting)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=meeting,
-            action="DELETE",
-            request=request,
-            old_data=deleted_data,
-            target_user_id=target_user_id,
-            custom_message=f"hard delete meeting '{meeting_name}' via admin panel"
-        )
-        deleted_count += 1
-
-    db.commit()
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+        for meeting in meetings_to_delete:
+            deleted_data = serialize_instance(meeting)
+            meeting_name = meeting.subject
+            target_user_id = meeting.assigned_to or meeting.created_by
+
+            db.delete(meeting)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=meeting,
+                action="DELETE",
+                request=request,
+                old_data=deleted_data,
+                target_user_id=target_user_id,
+                custom_message=f"hard delete meeting '{meeting_name}' via admin panel"
+            )
+            deleted_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} meeting(s)."}
 
@@ -331,29 +304,30 @@ def bulk_archive_meetings(
     if not meetings_to_archive:
         raise HTTPException(status_code=404, detail="No matching meetings found for archiving.")
 
-    archived_count = 0
-    for meeting in meetings_to_archive:
-        old_data = serialize_instance(meeting)
-        meeting_name = meeting.subject
-        
-        # Mark as INACTIVE instead of hard delete
-        meeting.status = MeetingStatus.INACTIVE
-        db.flush()
-        new_data = serialize_instance(meeting)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=meeting,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            new_data=new_data,
-            custom_message=f"archive meeting '{meeting_name}'"
-        )
-        archived_count += 1
-
-    db.commit()
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        for meeting in meetings_to_archive:
+            old_data = serialize_instance(meeting)
+            meeting_name = meeting.subject
+
+            # Mark as INACTIVE instead of hard delete
+            meeting.status = MeetingStatus.INACTIVE
+            db.flush()
+            new_data = serialize_instance(meeting)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=meeting,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                new_data=new_data,
+                custom_message=f"archive meeting '{meeting_name}'"
+            )
+            archived_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {archived_count} meeting(s)."}
 
@@ -381,30 +355,31 @@ def sales_bulk_delete_meetings(
     if not meetings_to_archive:
         raise HTTPException(status_code=404, detail="No matching meetings found for archiving. You can only archive your own meetings.")
 
-    archived_count = 0
-    for meeting in meetings_to_archive:
-        old_data = serialize_instance(meeting)
-        meeting_name = meeting.subject
-
-        # Set status to INACTIVE instead of deleting
-        meeting.status = MeetingStatus.INACTIVE
-        db.flush()  # Flush changes but don't commit yet
-        new_data = serialize_instance(meeting)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=meeting,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            new_data=new_data,
-            target_user_id=current_user.id,
-            custom_message=f"archived meeting '{meeting_name}'"
-        )
-        archived_count += 1
-
-    db.commit()
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        for meeting in meetings_to_archive:
+            old_data = serialize_instance(meeting)
+            meeting_name = meeting.subject
+
+            # Set status to INACTIVE instead of deleting
+            meeting.status = MeetingStatus.INACTIVE
+            db.flush()  # Flush changes but don't commit yet
+            new_data = serialize_instance(meeting)
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=meeting,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                new_data=new_data,
+                target_user_id=current_user.id,
+                custom_message=f"archived meeting '{meeting_name}'"
+            )
+            archived_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {archived_count} meeting(s)."}
 
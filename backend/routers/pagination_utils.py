@@ -0,0 +1,287 @@
+# backend/routers/pagination_utils.py
+"""Server-side filtering, sorting and keyset (cursor) pagination for fetch-all endpoints.
+
+Each endpoint builds its role-scoped query as before and hands it to paginate_query()
+together with a ListSpec describing which columns back the sort / filter parameters.
+
+Pagination is opt-in: when neither `limit` nor `cursor` is passed the endpoint keeps
+returning a plain list (filters and sorting still apply), otherwise it returns a Page
+envelope whose `next_cursor` is passed back to fetch the following page.
+
+The frontend list pages do not send limit / cursor yet: they still load the whole list
+and page, filter and count it in the browser (PaginationControls shows "X of <total>",
+and bulk selection and lookup modals use the full list). Moving them over needs a
+total count or a "load more" UI per page.
+
+Async endpoints (on get_async_db) use paginate_query_async(), which builds, runs and
+serializes the same query inside AsyncSession.run_sync.
+"""
+
+import base64
+import enum
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import Enum as SAEnum, and_, nulls_last, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query as ORMQuery, Session
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+@dataclass
+class ListParams:
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    sort_by: Optional[str] = None
+    sort_dir: str = "desc"
+    status: Optional[str] = None
+    stage: Optional[str] = None
+    owner: Optional[int] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    q: Optional[str] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+
+def list_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_LIMIT, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    sort_by: Optional[str] = Query(None, description="Sort key (defaults to id)"),
+    sort_dir: str = Query("desc", pattern="^(asc|desc)$"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    stage: Optional[str] = Query(None),
+    owner: Optional[int] = Query(None, description="Assigned user / lead owner id"),
+    date_from: Optional[date] = Query(None, description="Inclusive start date"),
+    date_to: Optional[date] = Query(None, description="Inclusive end date"),
+    q: Optional[str] = Query(None, max_length=200, description="Case-insensitive text search"),
+) -> ListParams:
+    return ListParams(
+        limit=limit,
+        cursor=cursor,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        status=status_filter,
+        stage=stage,
+        owner=owner,
+        date_from=date_from,
+        date_to=date_to,
+        q=(q or "").strip() or None,
+    )
+
+
+@dataclass
+class ListSpec:
+    """Columns an endpoint exposes to the list parameters."""
+    model: type
+    sort_fields: Dict[str, object] = field(default_factory=dict)
+    status_column: Optional[object] = None
+    stage_column: Optional[object] = None
+    owner_column: Optional[object] = None
+    date_column: Optional[object] = None
+    text_columns: Sequence[object] = ()
+
+
+def _bad_request(detail: str):
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+# =====================================================
+# Cursor encoding
+# =====================================================
+def _encode_value(value):
+    if value is None:
+        return {"t": "none"}
+    if isinstance(value, datetime):
+        return {"t": "datetime", "v": value.isoformat()}
+    if isinstance(value, date):
+        return {"t": "date", "v": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"t": "decimal", "v": str(value)}
+    if isinstance(value, enum.Enum):
+        return {"t": "enum", "v": value.name}
+    return {"t": "raw", "v": value}
+
+
+def _decode_value(payload, column):
+    kind = payload.get("t")
+    raw = payload.get("v")
+    if kind == "none":
+        return None
+    if kind == "datetime":
+        return datetime.fromisoformat(raw)
+    if kind == "date":
+        return date.fromisoformat(raw)
+    if kind == "decimal":
+        return Decimal(raw)
+    if kind == "enum":
+        return column.type.enum_class[raw]
+    if kind == "raw":
+        return raw
+    raise ValueError(f"unknown cursor value type {kind!r}")
+
+
+def encode_cursor(sort_key: str, value, row_id: int) -> str:
+    payload = {"s": sort_key, "k": _encode_value(value), "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, column):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if payload.get("s") != sort_key:
+            _bad_request("Cursor does not match the requested sort order")
+        return _decode_value(payload["k"], column), int(payload["id"])
+    except HTTPException:
+        raise
+    except Exception:
+        _bad_request("Invalid cursor")
+
+
+# =====================================================
+# Filters
+# =====================================================
+def _match_value(column, value: str):
+    """Map a query-string value onto a column, resolving Enum columns by value or name."""
+    enum_class = getattr(column.type, "enum_class", None) if isinstance(column.type, SAEnum) else None
+    if enum_class is None:
+        return value
+
+    wanted = value.strip().lower()
+    for member in enum_class:
+        if wanted in (str(member.value).lower(), member.name.lower()):
+            return member
+    _bad_request(f"Unknown value {value!r}")
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_list_filters(query: ORMQuery, spec: ListSpec, params: ListParams) -> ORMQuery:
+    if params.status:
+        if spec.status_column is None:
+            _bad_request("status filter is not supported here")
+        values = [v for v in params.status.split(",") if v.strip()]
+        query = query.filter(spec.status_column.in_([_match_value(spec.status_column, v) for v in values]))
+
+    if params.stage:
+        if spec.stage_column is None:
+            _bad_request("stage filter is not supported here")
+        values = [v.strip().upper() for v in params.stage.split(",") if v.strip()]
+        query = query.filter(spec.stage_column.in_(values))
+
+    if params.owner is not None:
+        if spec.owner_column is None:
+            _bad_request("owner filter is not supported here")
+        query = query.filter(spec.owner_column == params.owner)
+
+    if params.date_from or params.date_to:
+        if spec.date_column is None:
+            _bad_request("date filter is not supported here")
+        if params.date_from:
+            query = query.filter(spec.date_column >= datetime.combine(params.date_from, time.min))
+        if params.date_to:
+            query = query.filter(spec.date_column < datetime.combine(params.date_to + timedelta(days=1), time.min))
+
+    if params.q and spec.text_columns:
+        pattern = f"%{_escape_like(params.q)}%"
+        query = query.filter(or_(*[col.ilike(pattern, escape="\\") for col in spec.text_columns]))
+
+    return query
+
+
+# =====================================================
+# Sorting + keyset pagination
+# =====================================================
+def _keyset_condition(column, id_column, descending: bool, last_value, last_id):
+    """Rows strictly after (last_value, last_id) for ORDER BY column NULLS LAST, id."""
+    id_after = id_column < last_id if descending else id_column > last_id
+
+    if column is id_column:
+        return id_after
+
+    if last_value is None:
+        # Already inside the trailing NULL block.
+        return and_(column.is_(None), id_after)
+
+    value_after = column < last_value if descending else column > last_value
+    return or_(
+        value_after,
+        and_(column == last_value, id_after),
+        column.is_(None),
+    )
+
+
+def paginate_query(query: ORMQuery, spec: ListSpec, params: ListParams):
+    """Apply filters and ordering; return a list, or a Page dict when limit/cursor is given."""
+    query = apply_list_filters(query, spec, params)
+
+    id_column = spec.model.id
+    sort_key = params.sort_by or "id"
+    if sort_key == "id":
+        column = id_column
+    elif sort_key in spec.sort_fields:
+        column = spec.sort_fields[sort_key]
+    else:
+        allowed = ", ".join(["id", *sorted(spec.sort_fields)])
+        _bad_request(f"Unsupported sort_by {sort_key!r}; expected one of: {allowed}")
+
+    descending = params.sort_dir == "desc"
+    id_order = id_column.desc() if descending else id_column.asc()
+    if column is id_column:
+        query = query.order_by(id_order)
+    else:
+        query = query.order_by(nulls_last(column.desc() if descending else column.asc()), id_order)
+
+    if not params.paginated:
+        return query.all()
+
+    limit = params.limit or DEFAULT_PAGE_LIMIT
+    if params.cursor:
+        last_value, last_id = decode_cursor(params.cursor, sort_key, column)
+        query = query.filter(_keyset_condition(column, id_column, descending, last_value, last_id))
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        last_value = last.id if column is id_column else getattr(last, column.key)
+        next_cursor = encode_cursor(sort_key, last_value, last.id)
+
+    return {"items": rows, "next_cursor": next_cursor, "limit": limit}
+
+
+async def paginate_query_async(
+    db: AsyncSession,
+    build_query: Callable[[Session], ORMQuery],
+    spec: ListSpec,
+    params: ListParams,
+    schema,
+):
+    """paginate_query() for async endpoints.
+
+    build_query(session) receives the sync Session behind `db`. Rows are converted to
+    `schema` inside run_sync as well, so relationships the response reads may still
+    lazy-load there (an async session cannot once the handler has returned).
+    """
+    def run(session: Session):
+        result = paginate_query(build_query(session), spec, params)
+        if isinstance(result, dict):
+            return {**result, "items": [schema.model_validate(row, from_attributes=True) for row in result["items"]]}
+        return [schema.model_validate(row, from_attributes=True) for row in result]
+
+    return await db.run_sync(run)
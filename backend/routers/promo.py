@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from types import SimpleNamespace
 
-from database import SessionLocal
+from database import get_db
 from models.auth import User
 from models.promo import PromoCode, PromoRedemption
 from schemas.promo import PromoRedeemRequest
@@ -21,14 +21,6 @@ from .auth_utils import get_current_user
 router = APIRouter(prefix="/promo", tags=["Promo"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 @router.get("/signup/available")
 def list_signup_promos(db: Session = Depends(get_db)):
     signup_trial_subscription = SimpleNamespace(is_trial=True, status="trial")
@@ -1,25 +1,28 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select, text
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Union
 from decimal import Decimal
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.quote import (
     QuoteCreate, QuoteResponse, QuoteUpdate, QuoteBulkDelete,
     QuoteItemCreate, QuoteItemUpdate, QuoteItemResponse
 )
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from services.role_scope import scoped_query
+from schemas.pagination import Page
 
 from models.auth import User
 from models.quote import Quote, QuoteStatus, QuoteItem
 from models.contact import Contact
 from models.account import Account
 from models.deal import Deal
-from models.territory import Territory
 from models.company import Company
 
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from services.plan_access import enforce_free_restriction
 
 
@@ -27,6 +30,22 @@ router = APIRouter(prefix="/quotes", tags=["Quotes"])
 
 ALLOWED_ADMIN_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
 
+QUOTE_LIST_SPEC = ListSpec(
+    model=Quote,
+    sort_fields={
+        "quote_id": Quote.quote_id,
+        "status": Quote.status,
+        "total_amount": Quote.total_amount,
+        "presented_date": Quote.presented_date,
+        "created_at": Quote.created_at,
+        "updated_at": Quote.updated_at,
+    },
+    status_column=Quote.status,
+    owner_column=Quote.assigned_to,
+    date_column=Quote.created_at,
+    text_columns=(Quote.quote_id, Quote.notes),
+)
+
 
 def _enforce_free_quotes_view_only(db: Session, current_user: User):
     enforce_free_restriction(
@@ -57,10 +76,11 @@ def deal_label(deal: Deal | None) -> str:
     return getattr(deal, "deal_name", None) or getattr(deal, "name", None) or f"Deal #{deal.id}"
 
 
-@router.get("/admin/fetch-all", response_model=List[QuoteResponse])
-def admin_get_quotes(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[List[QuoteResponse], Page[QuoteResponse]])
+async def admin_get_quotes(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     # Common joinedload options for all quote queries
     common_options = [
@@ -72,57 +92,13 @@ def admin_get_quotes(
         joinedload(Quote.creator),
     ]
     
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        deals = (
-            db.query(Quote)
-            .options(*common_options)
-            .join(User, Quote.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        deals = (
-            db.query(Quote)
-            .options(*common_options)
-            .join(User, Quote.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .filter(Quote.status != "Inactive")  # Exclude archived quotes
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
-
-        deals = (
-            db.query(Quote)
-            .options(*common_options)
-            .join(User, Quote.assigned_to == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Quote.assigned_to == current_user.id) |
-                (Quote.created_by == current_user.id)
-            )
-            .filter(Quote.status != "Inactive")  # Exclude archived quotes
-            .all()
-        )
-    else:
-        deals = (
-            db.query(Quote)
-            .options(*common_options)
-            .filter(
-                (Quote.assigned_to == current_user.id) | 
-                (Quote.created_by == current_user.id)
-            )
-            .filter(Quote.status != "Inactive")  # Exclude archived quotes
-            .all()
-        )
+    def build_query(session: Session):
+        query = scoped_query(session, current_user, Quote).options(*common_options)
+        if current_user.role.upper() not in ["CEO", "ADMIN"]:
+            query = query.filter(Quote.status != "Inactive")  # Exclude archived quotes
+        return query
 
-    return deals
+    return await paginate_query_async(db, build_query, QUOTE_LIST_SPEC, params, QuoteResponse)
 
 
 @router.post("/admin", response_model=QuoteResponse, status_code=status.HTTP_201_CREATED)
@@ -586,47 +562,48 @@ def admin_bulk_delete_quotes(
     if not quotes_to_delete:
         raise HTTPException(status_code=404, detail="No matching quotes found for deletion.")
 
-    deleted_count = 0
-    
-    # Manager/Territory Manager/Sales archives (sets to Inactive), Admin/CEO hard deletes
-    if (current_user.role or "").upper() in ["MANAGER", "GROUP MANAGER", "SALES"]:
-        for quote in quotes_to_delete:
-            old_status = quote.status
-            quote.status = "Inactive"
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=quote,
-                action="UPDATE",
-                request=request,
-                old_data={"status": old_status},
-                new_data={"status": "Inactive"},
-                custom_message=f"bulk archive quote '#{quote.id}' (set to Inactive)"
-            )
-            deleted_count += 1
-    else:
-        # Hard delete for Admin/CEO
-        for quote in quotes_to_delete:
-            deleted_data = serialize_instance(quote)
-            quote_name = f"quote #{quote.id}"
-            target_user_id = quote.assigned_to or quote.created_by
-
-            db.delete(quote)
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=quote,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete quote '#{quote.id}' via admin panel"
-            )
-            deleted_count += 1
-
-    db.commit()
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+
+        # Manager/Territory Manager/Sales archives (sets to Inactive), Admin/CEO hard deletes
+        if (current_user.role or "").upper() in ["MANAGER", "GROUP MANAGER", "SALES"]:
+            for quote in quotes_to_delete:
+                old_status = quote.status
+                quote.status = "Inactive"
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=quote,
+                    action="UPDATE",
+                    request=request,
+                    old_data={"status": old_status},
+                    new_data={"status": "Inactive"},
+                    custom_message=f"bulk archive quote '#{quote.id}' (set to Inactive)"
+                )
+                deleted_count += 1
+        else:
+            # Hard delete for Admin/CEO
+            for quote in quotes_to_delete:
+                deleted_data = serialize_instance(quote)
+                quote_name = f"quote #{quote.id}"
+                target_user_id = quote.assigned_to or quote.created_by
+
+                db.delete(quote)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=quote,
+                    action="DELETE",
+                    request=request,
+                    old_data=deleted_data,
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk delete quote '#{quote.id}' via admin panel"
+                )
+                deleted_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully archived {deleted_count} quote(s)." if (current_user.role or "").upper() in ["MANAGER", "GROUP MANAGER"] else f"Successfully deleted {deleted_count} quote(s)."}
 
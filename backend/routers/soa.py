@@ -2,20 +2,23 @@ from __future__ import annotations
 
 from datetime import date
 from decimal import Decimal
-from typing import List
+from typing import List, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Query, status
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from database import get_db
+from database import get_db, get_async_db
 from models.account import Account
 from models.auth import User
 from models.company import Company
 from models.quote import Quote
 from models.soa import SoaItem, SoaStatus, StatementOfAccount
 from schemas.soa import SoaCreate, SoaResponse, SoaUpdate
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
+from .pagination_utils import ListParams, ListSpec, list_params, paginate_query_async
+from schemas.pagination import Page
 from .logs_utils import create_audit_log, serialize_instance
 
 
@@ -23,6 +26,27 @@ router = APIRouter(prefix="/soas", tags=["Statements of Account"])
 
 ALLOWED_ROLES = {"CEO", "ADMIN", "GROUP MANAGER", "MANAGER", "SALES"}
 
+SOA_LIST_SPEC = ListSpec(
+    model=StatementOfAccount,
+    sort_fields={
+        "soa_id": StatementOfAccount.soa_id,
+        "status": StatementOfAccount.status,
+        "total_amount": StatementOfAccount.total_amount,
+        "soa_date": StatementOfAccount.soa_date,
+        "due_date": StatementOfAccount.due_date,
+        "created_at": StatementOfAccount.created_at,
+        "updated_at": StatementOfAccount.updated_at,
+    },
+    status_column=StatementOfAccount.status,
+    owner_column=StatementOfAccount.assigned_to,
+    date_column=StatementOfAccount.created_at,
+    text_columns=(
+        StatementOfAccount.soa_id,
+        StatementOfAccount.purchase_order_number,
+        StatementOfAccount.quote_number,
+    ),
+)
+
 
 def normalize_status(status_value: str | None) -> str:
     if not status_value:
@@ -93,10 +117,11 @@ def get_company_quote(db: Session, quote_db_id: int, company_id: int | None) ->
     )
 
 
-@router.get("/admin/fetch-all", response_model=List[SoaResponse])
-def admin_get_soas(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+@router.get("/admin/fetch-all", response_model=Union[List[SoaResponse], Page[SoaResponse]])
+async def admin_get_soas(
+    params: ListParams = Depends(list_params),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
     options = [
         joinedload(StatementOfAccount.items),
@@ -108,25 +133,18 @@ def admin_get_soas(
 
     role = (current_user.role or "").upper()
 
-    if role in {"CEO", "ADMIN"}:
-        query = (
-            db.query(StatementOfAccount)
-            .options(*options)
-            .join(User, StatementOfAccount.created_by == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-        )
-        return query.all()
+    def build_query(session: Session):
+        query = session.query(StatementOfAccount).options(*options)
+        if role in {"CEO", "ADMIN"}:
+            return query.filter(StatementOfAccount.company_id == current_user.related_to_company)
 
-    # Non-admin roles: only own created/assigned
-    return (
-        db.query(StatementOfAccount)
-        .options(*options)
-        .filter(
+        # Non-admin roles: only own created/assigned
+        return query.filter(
             (StatementOfAccount.created_by == current_user.id)
             | (StatementOfAccount.assigned_to == current_user.id)
         )
-        .all()
-    )
+
+    return await paginate_query_async(db, build_query, SOA_LIST_SPEC, params, SoaResponse)
 
 
 @router.get("/from-acc/{account_id}", response_model=List[SoaResponse])
@@ -148,9 +166,7 @@ def get_soas_for_account(
     query = db.query(StatementOfAccount).options(*options).filter(StatementOfAccount.account_id == account_id)
 
     if role in {"CEO", "ADMIN"}:
-        query = query.join(User, StatementOfAccount.created_by == User.id).filter(
-            User.related_to_company == current_user.related_to_company
-        )
+        query = query.filter(StatementOfAccount.company_id == current_user.related_to_company)
     else:
         query = query.filter(
             (StatementOfAccount.created_by == current_user.id)
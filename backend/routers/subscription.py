@@ -1,24 +1,17 @@
 #backend/routers/subscription.py
 from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from database import SessionLocal
+from database import get_db
 from models.subscription import Subscription, PlanName, StatusList
 from models.company import Company
 from schemas.subscription import SubscriptionCreate, SubscriptionResponse
 from .auth_utils import get_current_user
 from models.auth import User
 from datetime import timedelta
-from services.subscription_lifecycle import apply_trial_lifecycle, clear_promo_discount_fields, utc_now
+from services.subscription_lifecycle import clear_promo_discount_fields, get_plan_status, invalidate_plan_status, utc_now
 
 router = APIRouter(prefix="/subscription", tags=["Subscription"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/subscribe", response_model=SubscriptionResponse)
 def subscribe(user: SubscriptionCreate, response: Response, db: Session = Depends(get_db)):
     company = db.query(Company).filter(Company.id == user.company_id).first()
@@ -89,6 +82,7 @@ def subscribe(user: SubscriptionCreate, response: Response, db: Session = Depend
     company.is_subscription_active = True
 
     db.commit()
+    invalidate_plan_status(user.company_id)
     db.refresh(subscription)
     return subscription
 
@@ -98,7 +92,7 @@ def current_subscription_status(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    return apply_trial_lifecycle(db, current_user.related_to_company)
+    return get_plan_status(db, current_user.related_to_company)
 
 
 @router.post("/cancel")
@@ -152,6 +146,7 @@ def cancel_subscription(
     db.add(free_subscription)
 
     db.commit()
+    invalidate_plan_status(company_id)
     db.refresh(free_subscription)
 
     return {
@@ -1,25 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, or_, cast, Date
+from sqlalchemy import func, and_, or_
 from typing import List, Optional
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import date, timedelta
 import calendar
 
-from database import get_db
+from database import get_db, get_async_db
 from schemas.target import (
     TargetCreate, TargetUpdate, TargetResponse, UserBase, TargetBulkDelete,
     LeaderboardEntry, LeaderboardResponse, PeriodComparison, 
     HistoricalComparisonResponse, TeamPerformanceSummary, PeriodType,
     AnnualTargetCreate, AnnualTargetCreateResponse, GeneratedTargetInfo
 )
-from .auth_utils import get_current_user
+from .auth_utils import get_current_user, get_current_user_async
 from models.auth import User
 from models.target import Target, TargetStatus
 from models.territory import Territory
-from models.deal import Deal, DealStage
+from models.revenue import UserDailyRevenue
 from models.company import Company
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from services.plan_access import get_current_plan
 
 
@@ -128,20 +129,18 @@ def _sum_closed_won_deals_for_period(
 ) -> Decimal:
     """Sum of CLOSED_WON deal amounts assigned to user within [start_date, end_date] (date-inclusive).
 
-    Deal.close_date is a datetime; we compare using the date portion so deals on the end date
-    (at any time) are included.
+    Reads the user_daily_revenue rollup, which buckets deals by the date portion of
+    Deal.close_date, so deals on the end date (at any time) are included.
     """
     if not (db and user_id and start_date and end_date):
         return Decimal("0")
 
     achieved_query = (
-        db.query(func.coalesce(func.sum(Deal.amount), 0))
+        db.query(func.coalesce(func.sum(UserDailyRevenue.closed_won_amount), 0))
         .filter(
-            Deal.assigned_to == user_id,
-            Deal.stage == DealStage.CLOSED_WON.value,
-            Deal.close_date.isnot(None),
-            cast(Deal.close_date, Date) >= start_date,
-            cast(Deal.close_date, Date) <= end_date,
+            UserDailyRevenue.user_id == user_id,
+            UserDailyRevenue.day >= start_date,
+            UserDailyRevenue.day <= end_date,
         )
         .scalar()
     )
@@ -149,15 +148,49 @@ def _sum_closed_won_deals_for_period(
     return Decimal(str(achieved_query or 0))
 
 
-def target_to_response(target: Target, db: Session = None) -> dict:
+def _sum_closed_won_deals_for_targets(db: Session, targets: List[Target]) -> dict:
+    """Map target.id -> sum of CLOSED_WON deal amounts for every target in one grouped query.
+
+    Same rules as _sum_closed_won_deals_for_period (rollup rows for target.user_id with
+    day within [start_date, end_date]); targets without matching deals map to 0.
+    """
+    target_ids = [t.id for t in (targets or []) if t is not None and t.id is not None]
+    achieved = {target_id: Decimal("0") for target_id in target_ids}
+    if not (db and target_ids):
+        return achieved
+
+    rows = (
+        db.query(Target.id, func.coalesce(func.sum(UserDailyRevenue.closed_won_amount), 0))
+        .join(
+            UserDailyRevenue,
+            and_(
+                UserDailyRevenue.user_id == Target.user_id,
+                UserDailyRevenue.day >= Target.start_date,
+                UserDailyRevenue.day <= Target.end_date,
+            ),
+        )
+        .filter(Target.id.in_(target_ids))
+        .group_by(Target.id)
+        .all()
+    )
+    for target_id, total in rows:
+        achieved[target_id] = Decimal(str(total or 0))
+
+    return achieved
+
+
+def target_to_response(target: Target, db: Session = None, achieved_amount: Optional[Decimal] = None) -> dict:
     """
     Convert Target model to response dict.
     Includes achieved_amount = sum of all CLOSED_WON deals assigned to the user
-    within the target's date range.
+    within the target's date range. Pass a precomputed achieved_amount (see
+    _sum_closed_won_deals_for_targets) to skip the per-target query.
     """
-    achieved_amount = float(
-        _sum_closed_won_deals_for_period(db, target.user_id, target.start_date, target.end_date)
-    )
+    if achieved_amount is None:
+        achieved_amount = _sum_closed_won_deals_for_period(
+            db, target.user_id, target.start_date, target.end_date
+        )
+    achieved_amount = float(achieved_amount)
     
     return {
         "id": target.id,
@@ -322,10 +355,15 @@ def get_period_label(period_type: str, year: int, period_number: int = 1, fiscal
 # ADMIN: Fetch All Targets
 # =====================================================
 @router.get("/admin/fetch-all", response_model=List[TargetResponse])
-def admin_get_targets(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def admin_get_targets(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
 ):
+    # Responses are plain dicts built in run_sync (target.user is lazy-loaded there)
+    return await db.run_sync(_list_targets, current_user)
+
+
+def _list_targets(db: Session, current_user: User) -> list:
     if current_user.role.upper() in ["CEO", "ADMIN"]:
         targets = (
             db.query(Target)
@@ -374,7 +412,8 @@ def admin_get_targets(
             .all()
         )
 
-    return [target_to_response(t, db) for t in targets]
+    achieved_by_target = _sum_closed_won_deals_for_targets(db, targets)
+    return [target_to_response(t, db, achieved_by_target.get(t.id)) for t in targets]
 
 
 # =====================================================
@@ -734,45 +773,46 @@ def admin_bulk_delete_targets(
             if target.created_by != current_user.id:
                 raise HTTPException(status_code=403, detail="You can only archive targets you created")
 
-    deleted_count = 0
-    for target in targets_to_delete:
-        target_name = f"target for user {target.user_id}"
-        target_user_id = target.user_id
-        
-        if current_user.role.upper() == "GROUP MANAGER":
-            # Soft delete (mark as INACTIVE)
-            old_status = target.status
-            target.status = TargetStatus.INACTIVE.value
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=target,
-                action="UPDATE",
-                request=request,
-                old_data={"status": old_status},
-                new_data={"status": target.status},
-                target_user_id=target_user_id,
-                custom_message=f"bulk archive target for user {target.user_id} via group manager panel"
-            )
-        else:
-            # ADMIN/CEO perform hard delete
-            deleted_data = serialize_instance(target)
-            db.delete(target)
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=target,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete target for user {target.user_id} via admin panel"
-            )
-        deleted_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+        for target in targets_to_delete:
+            target_name = f"target for user {target.user_id}"
+            target_user_id = target.user_id
+
+            if current_user.role.upper() == "GROUP MANAGER":
+                # Soft delete (mark as INACTIVE)
+                old_status = target.status
+                target.status = TargetStatus.INACTIVE.value
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=target,
+                    action="UPDATE",
+                    request=request,
+                    old_data={"status": old_status},
+                    new_data={"status": target.status},
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk archive target for user {target.user_id} via group manager panel"
+                )
+            else:
+                # ADMIN/CEO perform hard delete
+                deleted_data = serialize_instance(target)
+                db.delete(target)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=target,
+                    action="DELETE",
+                    request=request,
+                    old_data=deleted_data,
+                    target_user_id=target_user_id,
+                    custom_message=f"bulk delete target for user {target.user_id} via admin panel"
+                )
+            deleted_count += 1
 
-    db.commit()
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} target(s)."}
 
@@ -848,6 +888,7 @@ def get_leaderboard(
         )
 
     targets = query.all()
+    achieved_by_target = _sum_closed_won_deals_for_targets(db, targets)
 
     # Group by user and calculate totals
     user_data = {}
@@ -867,9 +908,7 @@ def get_leaderboard(
         user_data[user_id]["target_count"] += 1
         
         # Calculate achieved amount for this target
-        user_data[user_id]["achieved_amount"] += _sum_closed_won_deals_for_period(
-            db, user_id, target.start_date, target.end_date
-        )
+        user_data[user_id]["achieved_amount"] += achieved_by_target.get(target.id, Decimal(0))
 
     # Calculate percentages and sort
     entries = []
@@ -969,11 +1008,12 @@ def get_user_history(
             targets_query = targets_query.filter(Target.period_type == normalized_period_type)
 
     targets = targets_query.order_by(Target.start_date.desc()).all()
+    achieved_by_target = _sum_closed_won_deals_for_targets(db, targets)
 
     periods = []
     for target in targets:
         # Calculate achieved amount
-        achieved_amount = _sum_closed_won_deals_for_period(db, user_id, target.start_date, target.end_date)
+        achieved_amount = achieved_by_target.get(target.id, Decimal(0))
         target_amount = Decimal(str(target.target_amount))
         percentage = float((achieved_amount / target_amount * 100)) if target_amount > 0 else 0
 
@@ -8,16 +8,16 @@ from models.task import Task, PriorityCategory, StatusCategory
 from models.auth import User
 from schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskFetch, TaskBulkDelete
 from .auth_utils import get_current_user
-from routers.ws_notification import broadcast_notification  # WebSocket broadcaster
+from routers.ws_notification import broadcast_notification_threadsafe  # WebSocket broadcaster
 from models.account import Account
 from models.contact import Contact
 from models.lead import Lead
 from models.quote import Quote
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from models.deal import Deal
-from models.territory import Territory
 import traceback
 from services.plan_access import get_current_plan
+from services.role_scope import scoped_query
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
@@ -38,9 +38,8 @@ def _enforce_free_monthly_tasks_limit(db: Session, current_user: User):
 
     tasks_count = (
         db.query(Task.id)
-        .join(User, Task.created_by == User.id)
         .filter(
-            User.related_to_company == current_user.related_to_company,
+            Task.company_id == current_user.related_to_company,
             Task.created_at >= month_start,
             Task.created_at < next_month_start,
         )
@@ -94,7 +93,7 @@ def task_to_response(task: Task) -> dict:
 # CREATE TASK + SEND NOTIFICATION
 # -----------------------------------------
 @router.post("/create", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(
+def create_task(
     payload: TaskCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -222,7 +221,7 @@ async def create_task(
         )
         
         # Send real-time WebSocket notification
-        await broadcast_notification(notification_data, new_task.assigned_to)
+        broadcast_notification_threadsafe(notification_data, new_task.assigned_to)
 
     create_audit_log(
         db=db,
@@ -244,101 +243,31 @@ async def create_task(
 def get_all_tasks(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Get all tasks based on user role"""
     try:
-        if current_user.role.upper() in ["CEO", "ADMIN"]:
-            # Admins see all tasks in their company
-            company_users = (
-                db.query(User.id)
-                .where(User.related_to_company == current_user.related_to_company)
-                .subquery()
+        role = current_user.role.upper()
+        # Admins / group managers also see tasks created by anyone in their scope
+        query = (
+            scoped_query(
+                db, current_user, Task,
+                match_creator_in_scope=role in ["CEO", "ADMIN", "GROUP MANAGER"],
             )
-            tasks = (
-                db.query(Task)
-                .options(
-                    selectinload(Task.task_creator),
-                    selectinload(Task.task_assign_to),
-                    selectinload(Task.account),
-                    selectinload(Task.contact),
-                    selectinload(Task.lead),
-                    selectinload(Task.deal),
-                    selectinload(Task.quote)
-                )
-                .filter(
-                    (Task.assigned_to.in_(company_users)) | (Task.created_by.in_(company_users))
-                )
-                .all()
-            )
-        elif current_user.role.upper() == "GROUP MANAGER":
-            # Group managers see tasks for their company's non-admin users
-            # But do NOT see archived (INACTIVE) tasks
-            company_users = (
-                db.query(User.id)
-                .where(User.related_to_company == current_user.related_to_company)
-                .where(~User.role.in_(["CEO", "ADMIN"]))
-                .subquery()
-            )
-            tasks = (
-                db.query(Task)
-                .options(
-                    selectinload(Task.task_creator),
-                    selectinload(Task.task_assign_to),
-                    selectinload(Task.account),
-                    selectinload(Task.contact),
-                    selectinload(Task.lead),
-                    selectinload(Task.deal),
-                    selectinload(Task.quote)
-                )
-                .filter(
-                    (Task.assigned_to.in_(company_users)) | (Task.created_by.in_(company_users))
-                )
-                .filter(Task.status != StatusCategory.INACTIVE)
-                .all()
-            )
-        elif current_user.role.upper() == "MANAGER":
-            # Managers see tasks assigned to their territory users + their own tasks
-            # But do NOT see archived (INACTIVE) tasks
-            subquery_user_ids = (
-                db.query(Territory.user_id)
-                .filter(Territory.manager_id == current_user.id)
-                .scalar_subquery()
+            .options(
+                selectinload(Task.task_creator),
+                selectinload(Task.task_assign_to),
+                selectinload(Task.account),
+                selectinload(Task.contact),
+                selectinload(Task.lead),
+                selectinload(Task.deal),
+                selectinload(Task.quote)
             )
+        )
 
-            tasks = (
-                db.query(Task)
-                .options(
-                    selectinload(Task.task_creator),
-                    selectinload(Task.task_assign_to),
-                    selectinload(Task.account),
-                    selectinload(Task.contact),
-                    selectinload(Task.lead),
-                    selectinload(Task.deal),
-                    selectinload(Task.quote)
-                )
-                .filter(
-                    (Task.assigned_to.in_(subquery_user_ids)) | 
-                    (Task.assigned_to == current_user.id) |
-                    (Task.created_by == current_user.id)
-                )
-                .filter(Task.status != StatusCategory.INACTIVE)
-                .all()
-            )
+        if role in ["CEO", "ADMIN"]:
+            tasks = query.all()
+        elif role in ["GROUP MANAGER", "MANAGER"]:
+            # Group managers and managers do NOT see archived (INACTIVE) tasks
+            tasks = query.filter(Task.status != StatusCategory.INACTIVE).all()
         else:
-            # SALES users - see only their own tasks (created or assigned)
-            tasks = (
-                db.query(Task)
-                .options(
-                    selectinload(Task.task_creator),
-                    selectinload(Task.task_assign_to),
-                    selectinload(Task.account),
-                    selectinload(Task.contact),
-                    selectinload(Task.lead),
-                    selectinload(Task.deal),
-                    selectinload(Task.quote)
-                )
-                .filter(
-                    (Task.assigned_to == current_user.id) | (Task.created_by == current_user.id)
-                )
-                .all()
-            )
+            tasks = query.all()
             # Filter out INACTIVE tasks in Python to avoid SQLAlchemy enum binding issues
             tasks = [t for t in tasks if (t.status.value if hasattr(t.status, 'value') else t.status) != "INACTIVE"]
 
@@ -436,7 +365,7 @@ def get_all_tasks(db: Session = Depends(get_db), current_user: User = Depends(ge
 # UPDATE TASK
 # -----------------------------------------
 @router.put("/{task_id}", response_model=TaskResponse)
-async def update_task(
+def update_task(
     task_id: int,
     payload: TaskUpdate,
     db: Session = Depends(get_db),
@@ -493,7 +422,7 @@ async def update_task(
         )
         
         # Send real-time WebSocket notification
-        await broadcast_notification(notification_data, task.created_by)
+        broadcast_notification_threadsafe(notification_data, task.created_by)
     
     return task
 
@@ -595,28 +524,29 @@ def bulk_archive_tasks(
         if not tasks_to_archive:
             raise HTTPException(status_code=404, detail="No matching tasks found for archiving. You can only archive tasks you created.")
 
-        archived_count = 0
-        for task in tasks_to_archive:
-            old_data = serialize_instance(task)
-            
-            # Mark as INACTIVE using raw string value
-            task.status = "INACTIVE"
-            db.flush()  # Flush changes but don't commit yet
-            new_data = serialize_instance(task)
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=task,
-                action="UPDATE",
-                request=request,
-                old_data=old_data,
-                new_data=new_data,
-                custom_message=f"archive task '{task.title}'"
-            )
-            archived_count += 1
+        with buffered_audit_logs(db) as audit_logs:
+            archived_count = 0
+            for task in tasks_to_archive:
+                old_data = serialize_instance(task)
+
+                # Mark as INACTIVE using raw string value
+                task.status = "INACTIVE"
+                db.flush()  # Flush changes but don't commit yet
+                new_data = serialize_instance(task)
+
+                create_audit_log(
+                    db=db,
+                    current_user=current_user,
+                    instance=task,
+                    action="UPDATE",
+                    request=request,
+                    old_data=old_data,
+                    new_data=new_data,
+                    custom_message=f"archive task '{task.title}'"
+                )
+                archived_count += 1
 
-        db.commit()
+            audit_logs.commit()
 
         return {"detail": f"Successfully archived {archived_count} task(s)."}
     except HTTPException:
@@ -709,26 +639,27 @@ def admin_bulk_delete_tasks(
     if not tasks_to_delete:
         raise HTTPException(status_code=404, detail="No matching tasks found for deletion.")
 
-    deleted_count = 0
-    for task in tasks_to_delete:
-        deleted_data = serialize_instance(task)
-        task_name = task.title
-        target_user_id = task.assigned_to or task.created_by
+    with buffered_audit_logs(db) as audit_logs:
+        deleted_count = 0
+        for task in tasks_to_delete:
+            deleted_data = serialize_instance(task)
+            task_name = task.title
+            target_user_id = task.assigned_to or task.created_by
 
-        db.delete(task)
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=task,
-            action="DELETE",
-            request=request,
-            old_data=deleted_data,
-            target_user_id=target_user_id,
-            custom_message=f"bulk delete task '{task_name}' via admin panel"
-        )
-        deleted_count += 1
+            db.delete(task)
 
-    db.commit()
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=task,
+                action="DELETE",
+                request=request,
+                old_data=deleted_data,
+                target_user_id=target_user_id,
+                custom_message=f"bulk delete task '{task_name}' via admin panel"
+            )
+            deleted_count += 1
+
+        audit_logs.commit()
 
     return {"detail": f"Successfully deleted {deleted_count} task(s)."}
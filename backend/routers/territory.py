@@ -6,10 +6,11 @@ from schemas.territory import TerritoryCreate, TerritoryResponse, TerritoryBulkD
 from .auth_utils import get_current_user, hash_password,get_default_avatar
 from models.auth import User
 from models.territory import Territory
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from routers.ws_notification import broadcast_notification
 import asyncio 
 from services.plan_access import enforce_starter_restriction
+from services.role_scope import scoped_query
 
 router = APIRouter(
     prefix="/territories",
@@ -28,47 +29,13 @@ def get_territories(
     if not current_user.related_to_company:
         return []
 
-    if current_user.role.upper() in ["CEO", "ADMIN"]:
-        territory = (
-            db.query(Territory)
-            .join(User, Territory.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .all()
-        )
-    elif current_user.role.upper() == "GROUP MANAGER":
-        territory = (
-            db.query(Territory)
-            .join(User, Territory.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(~User.role.in_(["CEO", "Admin"]))
-            .filter((Territory.status != "Inactive") | (Territory.status == None))  # Exclude archived territories for GROUP MANAGER
-            .all()
-        )
-    elif current_user.role.upper() == "MANAGER":
-        subquery_user_ids = (
-            db.query(Territory.user_id)
-            .filter(Territory.manager_id == current_user.id)
-            .scalar_subquery()
-        )
+    # Territories are scoped by member (user_id); managers and sales also see the
+    # territories they manage.
+    query = scoped_query(db, current_user, Territory, owner_attr="user_id", creator_attr="manager_id")
+    if current_user.role.upper() == "GROUP MANAGER":
+        query = query.filter((Territory.status != "Inactive") | (Territory.status == None))  # Exclude archived territories for GROUP MANAGER
 
-        territory = (
-            db.query(Territory)
-            .join(User, Territory.user_id == User.id)
-            .filter(User.related_to_company == current_user.related_to_company)
-            .filter(
-                (User.id.in_(subquery_user_ids)) | 
-                (Territory.user_id == current_user.id) |
-                (Territory.manager_id == current_user.id)
-            ).all()
-        )
-    else:
-        territory = (
-            db.query(Territory)
-            .filter(
-                (Territory.user_id == current_user.id) | 
-                (Territory.manager_id == current_user.id)
-            ).all()
-        )
+    territory = query.all()
 
     return territory
 
@@ -76,7 +43,7 @@ def get_territories(
 
 # # ✅ CREATE new territory
 @router.post("/assign", status_code=status.HTTP_201_CREATED)
-async def assign_territory(
+def assign_territory(
     data: TerritoryCreate, # Ensure your Pydantic model accepts user_ids: List[int]
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -157,7 +124,7 @@ async def assign_territory(
 
 
 @router.put("/{territory_id}")
-async def update_territory(
+def update_territory(
     territory_id: int,
     data: TerritoryCreate,
     db: Session = Depends(get_db),
@@ -283,49 +250,50 @@ def admin_bulk_delete_territories(
     if not territories_to_delete:
         raise HTTPException(status_code=404, detail="No matching territories found for deletion.")
 
-    archived_count = 0
-    deleted_count = 0
-    
-    for territory in territories_to_delete:
-        deleted_data = serialize_instance(territory)
-        territory_name = territory.name
-        target_user_id = territory.user_id
-
-        # GROUP MANAGER: Soft delete (archive)
-        if current_user.role.upper() == "GROUP MANAGER":
-            # Only allow GROUP MANAGER to archive territories they created
-            if territory.created_by == current_user.id:
-                territory.status = "Inactive"
-                archived_count += 1
-                
-                # Create audit log AFTER status is updated
+    with buffered_audit_logs(db) as audit_logs:
+        archived_count = 0
+        deleted_count = 0
+
+        for territory in territories_to_delete:
+            deleted_data = serialize_instance(territory)
+            territory_name = territory.name
+            target_user_id = territory.user_id
+
+            # GROUP MANAGER: Soft delete (archive)
+            if current_user.role.upper() == "GROUP MANAGER":
+                # Only allow GROUP MANAGER to archive territories they created
+                if territory.created_by == current_user.id:
+                    territory.status = "Inactive"
+                    archived_count += 1
+
+                    # Create audit log AFTER status is updated
+                    create_audit_log(
+                        db=db,
+                        current_user=current_user,
+                        instance=territory,
+                        action="ARCHIVE",
+                        request=request,
+                        old_data=deleted_data,
+                        target_user_id=target_user_id,
+                        custom_message=f"archive territory '{territory_name}' (soft delete)"
+                    )
+            else:
+                # ADMIN/CEO: Hard delete
+                db.delete(territory)
+                deleted_count += 1
+
                 create_audit_log(
                     db=db,
                     current_user=current_user,
                     instance=territory,
-                    action="ARCHIVE",
+                    action="DELETE",
                     request=request,
                     old_data=deleted_data,
                     target_user_id=target_user_id,
-                    custom_message=f"archive territory '{territory_name}' (soft delete)"
+                    custom_message=f"bulk delete territory '{territory_name}' via admin panel"
                 )
-        else:
-            # ADMIN/CEO: Hard delete
-            db.delete(territory)
-            deleted_count += 1
-            
-            create_audit_log(
-                db=db,
-                current_user=current_user,
-                instance=territory,
-                action="DELETE",
-                request=request,
-                old_data=deleted_data,
-                target_user_id=target_user_id,
-                custom_message=f"bulk delete territory '{territory_name}' via admin panel"
-            )
 
-    db.commit()
+        audit_logs.commit()
 
     if current_user.role.upper() == "GROUP MANAGER":
         return {"detail": f"Successfully archived {archived_count} territory(ies)."}
@@ -391,7 +359,7 @@ def delete_territory(
 
 
 # @router.put("/{territory_id}", response_model=TerritoryResponse)
-# async def update_territory(
+# def update_territory(
 #     territory_id: int,
 #     data: TerritoryUpdate,
 #     db: Session = Depends(get_db),
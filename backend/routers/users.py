@@ -5,7 +5,7 @@ from database import get_db
 from schemas.auth import UserCreate, UserUpdate, UserResponse, UserMeUpdate, UserBulkDelete
 from .auth_utils import get_current_user, hash_password, get_default_avatar, DEFAULT_AVATAR_BASE
 from models.auth import User
-from .logs_utils import serialize_instance, create_audit_log
+from .logs_utils import serialize_instance, create_audit_log, buffered_audit_logs
 from .aws_ses_utils import send_welcome_email, send_password_reset_email
 from models.auth import UserRole
 from sqlalchemy import or_
@@ -235,14 +235,14 @@ def create_user(
         custom_message=f"new user '{new_user.first_name} {new_user.last_name}' with role '{new_user.role}'"
     )
 
-    send_welcome_email(new_user.email, new_user.first_name, user_data.password, new_user.role)
+    send_welcome_email(db, new_user.email, new_user.first_name, user_data.password, new_user.role)
 
     return new_user
 
 
 # ✅ CREATE USER WITH FILE UPLOAD (for FormData requests)
 @router.post("/createuser-form", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def create_user_with_form(
+def create_user_with_form(
     first_name: str = Form(...),
     last_name: str = Form(...),
     email: str = Form(...),
@@ -269,7 +269,7 @@ async def create_user_with_form(
         raise HTTPException(status_code=400, detail="Password must be at least 8 characters long")
 
     # Hash password
-    hashed_pw = hash_password(password)        
+    hashed_pw = hash_password(password)
 
     # Assign relationships
     company_id_int = int(company_id) if company_id and company_id.strip() else None
@@ -283,7 +283,7 @@ async def create_user_with_form(
     profile_pic_url = None
     if profile_picture and profile_picture.filename:
         try:
-            file_content = await profile_picture.read()
+            file_content = profile_picture.file.read()
             base64_content = base64.b64encode(file_content).decode("utf-8")
             profile_pic_url = f"data:{profile_picture.content_type};base64,{base64_content}"
         except Exception:
@@ -319,7 +319,7 @@ async def create_user_with_form(
         custom_message=f"new user '{new_user.first_name} {new_user.last_name}' with role '{new_user.role}'"
     )
 
-    send_welcome_email(new_user.email, new_user.first_name, password, new_user.role)
+    send_welcome_email(db, new_user.email, new_user.first_name, password, new_user.role)
 
     return new_user
 
@@ -428,7 +428,7 @@ def update_user(
 
 # ✅ UPDATE USER WITH FILE UPLOAD (for FormData requests)
 @router.put("/updateuser-form/{user_id}", response_model=UserResponse)
-async def update_user_with_form(
+def update_user_with_form(
     user_id: int,
     first_name: str = Form(default=""),
     last_name: str = Form(default=""),
@@ -490,7 +490,7 @@ async def update_user_with_form(
     # Handle profile picture upload
     elif profile_picture and profile_picture.filename:
         try:
-            file_content = await profile_picture.read()
+            file_content = profile_picture.file.read()
             base64_content = base64.b64encode(file_content).decode("utf-8")
             user.profile_picture = f"data:{profile_picture.content_type};base64,{base64_content}"
         except Exception:
@@ -720,28 +720,29 @@ def admin_bulk_delete_users(
     if not users_to_deactivate:
         raise HTTPException(status_code=404, detail="No matching users found for deactivation.")
 
-    deactivated_count = 0
-    for user in users_to_deactivate:
-        old_data = serialize_instance(user)
-        user_name = f"{user.first_name} {user.last_name}"
-        target_user_id = user.id
-
-        # Set user as inactive instead of deleting
-        user.is_active = False
-        
-        create_audit_log(
-            db=db,
-            current_user=current_user,
-            instance=user,
-            action="UPDATE",
-            request=request,
-            old_data=old_data,
-            target_user_id=target_user_id,
-            custom_message=f"bulk deactivate user '{user_name}' via admin panel"
-        )
-        deactivated_count += 1
+    with buffered_audit_logs(db) as audit_logs:
+        deactivated_count = 0
+        for user in users_to_deactivate:
+            old_data = serialize_instance(user)
+            user_name = f"{user.first_name} {user.last_name}"
+            target_user_id = user.id
+
+            # Set user as inactive instead of deleting
+            user.is_active = False
+
+            create_audit_log(
+                db=db,
+                current_user=current_user,
+                instance=user,
+                action="UPDATE",
+                request=request,
+                old_data=old_data,
+                target_user_id=target_user_id,
+                custom_message=f"bulk deactivate user '{user_name}' via admin panel"
+            )
+            deactivated_count += 1
 
-    db.commit()
+        audit_logs.commit()
 
     return {"detail": f"Successfully deactivated {deactivated_count} user(s)."}
 
@@ -834,6 +835,7 @@ def reset_user_password(
     # Send password reset email with the new password
     try:
         send_password_reset_email(
+            db,
             to_email=user.email,
             first_name=user.first_name,
             last_name=user.last_name,
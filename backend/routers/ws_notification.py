@@ -1,47 +1,222 @@
 # routers/ws_notification.py
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
+import asyncio
 import json
-from typing import List, Dict
+import os
+import time
+from typing import Dict, List, Set
+
+from services.notification_backplane import backplane, backplane_metrics
 
 router = APIRouter()
 
-# Store connected clients with user_id
-connected_clients: List[Dict] = []  # [{"user_id": int, "ws": WebSocket}]
+# Per-connection send queue: notifications are queued and written by the connection's
+# own writer task, so a slow client never blocks the request that raised the notification.
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+WS_OVERFLOW_POLICY = os.getenv("WS_OVERFLOW_POLICY", "disconnect").strip().lower()  # disconnect | drop_oldest
+WS_COALESCE_WINDOW_MS = float(os.getenv("WS_COALESCE_WINDOW_MS", "20"))  # wait this long to gather a burst
+WS_COALESCE_MAX = int(os.getenv("WS_COALESCE_MAX", "100"))  # max notifications per batched frame
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+WS_HEARTBEAT_SECONDS = float(os.getenv("WS_HEARTBEAT_SECONDS", "25"))
+
+# Protocol versions (?v=):
+#   1 - one JSON notification per frame (legacy clients)
+#   2 - bursts arrive as {"type": "batch", "items": [...]}, plus {"type": "ping"} heartbeats
+PROTOCOL_BATCHED = 2
+
+# Close code for clients that cannot keep up (RFC 6455 "try again later")
+CLOSE_TRY_AGAIN_LATER = 1013
+
+# The worker's event loop, captured at startup for broadcast_notification_threadsafe()
+_event_loop = None
+
+
+class NotificationConnection:
+    """One websocket plus its bounded send queue, writer task and heartbeat."""
+
+    def __init__(self, websocket: WebSocket, user_id: int, protocol: int = 1):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.batched = protocol >= PROTOCOL_BATCHED
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.closed = asyncio.Event()
+        self.overflowed = False
+
+    def enqueue(self, data: dict) -> bool:
+        """Queue a notification without waiting; applies the overflow policy when full."""
+        if self.closed.is_set():
+            return False
+        try:
+            self.queue.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            backplane_metrics.incr("send_queue_overflows")
+
+        if WS_OVERFLOW_POLICY == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(data)
+            backplane_metrics.incr("send_dropped")
+            return True
+
+        # Slow consumer: disconnect; the client reconnects and reloads its notifications.
+        print(f"🐢 User {self.user_id} send queue full ({WS_SEND_QUEUE_SIZE}); disconnecting")
+        backplane_metrics.incr("slow_disconnects")
+        self.overflowed = True
+        self.closed.set()
+        return False
+
+    async def _collect(self) -> List[dict]:
+        items = [await self.queue.get()]
+        if WS_COALESCE_WINDOW_MS > 0 and self.batched:
+            await asyncio.sleep(WS_COALESCE_WINDOW_MS / 1000)
+        while len(items) < WS_COALESCE_MAX:
+            try:
+                items.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return items
+
+    async def _send(self, frame: dict):
+        await asyncio.wait_for(self.websocket.send_text(json.dumps(frame)), timeout=WS_SEND_TIMEOUT_SECONDS)
+        backplane_metrics.incr("frames_sent")
+
+    async def _writer(self):
+        while True:
+            items = await self._collect()
+            if self.batched and len(items) > 1:
+                await self._send({"type": "batch", "items": items})
+                backplane_metrics.incr("batched_frames")
+                backplane_metrics.incr("coalesced_messages", len(items))
+            else:
+                for item in items:
+                    await self._send(item)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(WS_HEARTBEAT_SECONDS)
+            if self.batched:
+                self.enqueue({"type": "ping", "ts": time.time()})
+                backplane_metrics.incr("heartbeats_sent")
+
+    async def _reader(self):
+        # Client frames carry no data; reading only detects the peer closing the socket.
+        while True:
+            await self.websocket.receive_text()
+
+    async def run(self):
+        """Serve the connection until the client leaves, a send fails, or it overflows."""
+        tasks = [
+            asyncio.create_task(self._writer()),
+            asyncio.create_task(self._heartbeat()),
+            asyncio.create_task(self._reader()),
+            asyncio.create_task(self.closed.wait()),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.closed.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        failed = any(
+            not task.cancelled() and task.exception() is not None
+            and not isinstance(task.exception(), WebSocketDisconnect)
+            for task in done
+        )
+        if failed:
+            backplane_metrics.incr("delivery_failures")
+        if failed or self.overflowed:
+            try:
+                await self.websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+            except Exception:
+                pass
+
+
+# Connected clients of this worker, indexed by user_id (a user may have several tabs open)
+connected_clients: Dict[int, Set[NotificationConnection]] = {}
+
+
+def _register(connection: NotificationConnection):
+    connected_clients.setdefault(connection.user_id, set()).add(connection)
+
+
+def _unregister(connection: NotificationConnection):
+    connections = connected_clients.get(connection.user_id)
+    if not connections:
+        return
+    connections.discard(connection)
+    if not connections:
+        connected_clients.pop(connection.user_id, None)
+
+
+def connection_stats() -> dict:
+    connections = [c for group in connected_clients.values() for c in group]
+    return {
+        "connected_users": len(connected_clients),
+        "connected_sockets": len(connections),
+        "queued_messages": sum(c.queue.qsize() for c in connections),
+    }
+
 
 @router.websocket("/ws/notifications")
-async def websocket_endpoint(websocket: WebSocket, user_id: int = Query(...)):
+async def websocket_endpoint(websocket: WebSocket, user_id: int = Query(...), v: int = Query(1)):
     """
     WebSocket connection for notifications.
-    `user_id` is passed as a query parameter so we know who receives notifications.
+    `user_id` is passed as a query parameter so we know who receives notifications;
+    `v=2` opts into batched frames and server heartbeats.
     """
     await websocket.accept()
-    connected_clients.append({"user_id": user_id, "ws": websocket})
-    print(f"🔌 User {user_id} connected! Total clients: {len(connected_clients)}")
+    connection = NotificationConnection(websocket, user_id, protocol=v)
+    _register(connection)
+    print(f"🔌 User {user_id} connected! Total sockets: {connection_stats()['connected_sockets']}")
 
     try:
-        while True:
-            # Keep connection alive
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        # Remove disconnected client
-        connected_clients[:] = [c for c in connected_clients if c["ws"] != websocket]
-        print(f"❌ User {user_id} disconnected. Remaining: {len(connected_clients)}")
+        await connection.run()
+    finally:
+        _unregister(connection)
+        print(f"❌ User {user_id} disconnected. Remaining sockets: {connection_stats()['connected_sockets']}")
+
+
+async def deliver_local(target_user_id: int, data: dict) -> int:
+    """Queue `data` on this worker's connections of target_user_id; returns how many accepted it."""
+    connections = connected_clients.get(target_user_id)
+    if not connections:
+        backplane_metrics.incr("no_local_recipient")
+        return 0
+    return sum(1 for connection in list(connections) if connection.enqueue(data))
+
 
 async def broadcast_notification(data: dict, target_user_id: int):
     """
-    Send a notification only to the user with target_user_id.
+    Send a notification only to the user with target_user_id, on whichever worker they
+    are connected: local sockets first, then the backplane fans out to the other workers.
     """
     print(f"📢 Broadcasting to user {target_user_id}: {data}")
-    disconnected = []
+    delivered = await deliver_local(target_user_id, data)
+    if delivered:
+        backplane_metrics.incr("local_deliveries", delivered)
+    await backplane.publish(target_user_id, data)
+
+
+def broadcast_notification_threadsafe(data: dict, target_user_id: int) -> bool:
+    """
+    broadcast_notification() for code running off the event loop (scheduler jobs, backup
+    worker threads). Returns False when no loop is running, e.g. in CLI scripts; the
+    audit log row is still replayed by /logs/notifications?since= on reconnect.
+    """
+    loop = _event_loop
+    if loop is None or loop.is_closed():
+        return False
+    asyncio.run_coroutine_threadsafe(broadcast_notification(data, target_user_id=target_user_id), loop)
+    return True
+
+
+async def start_notification_backplane():
+    global _event_loop
+    _event_loop = asyncio.get_running_loop()
+    await backplane.start(deliver_local)
 
-    for client in connected_clients:
-        if client["user_id"] != target_user_id:
-            continue
-        try:
-            await client["ws"].send_text(json.dumps(data))
-        except Exception:
-            disconnected.append(client)
 
-    # Remove disconnected clients
-    for client in disconnected:
-        connected_clients.remove(client)
+async def stop_notification_backplane():
+    await backplane.stop()
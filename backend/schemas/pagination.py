@@ -0,0 +1,12 @@
+# backend/schemas/pagination.py
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Keyset-paginated list envelope returned by the fetch-all endpoints."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
@@ -0,0 +1,504 @@
+"""Tenant CSV backup export, streamed as a zip archive.
+
+The archive holds one `<table>.csv` per mapped table (or `<table>.ERROR.txt` when a
+table fails), scoped to the company, in registry order.
+
+Tables are exported concurrently by a bounded pool of BACKUP_EXPORT_WORKERS threads,
+each on its own connection, into spooled temp files (memory up to
+EXPORT_SPOOL_BYTES, then disk). The caller's thread writes finished tables into the
+zip in order and hands the compressed bytes out every ~EXPORT_CHUNK_BYTES, so
+memory stays flat regardless of tenant size (see benchmarks/backup_rss.py).
+
+How a table is read:
+
+- PostgreSQL: `COPY (SELECT ...) TO STDOUT WITH CSV`, with every column rendered in
+  SQL the way serialize_csv_value() would print it (booleans, timestamps, enums,
+  floats), then re-framed by the csv module so the bytes match the Python writer.
+  Tables with columns SQL cannot render identically (JSON) use the cursor path.
+- Everything else: a streaming Core cursor read in EXPORT_BATCH_ROWS batches.
+
+User-linked tables are scoped with a subquery on users.related_to_company rather
+than an IN-list of the company's user ids.
+
+Differential backups (`since` set) only read rows whose created_at / updated_at /
+timestamp is newer than `since`; tables without such columns are exported in full.
+Rows deleted since then are listed in `_deletions.csv`, taken from the DELETE
+entries of audit_logs. Every archive ends with `manifest.json` describing the run
+and its place in the restore chain (full backup first, then each differential).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+import tempfile
+import traceback
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+from sqlalchemy import (
+    BigInteger, Boolean, Date, DateTime, Enum, Float, Integer, Numeric, String, case, cast, func, or_, select,
+)
+from sqlalchemy.orm import Session
+
+from database import Base
+
+EXPORT_BATCH_ROWS = int(os.getenv("BACKUP_EXPORT_BATCH_ROWS", "1000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("BACKUP_EXPORT_CHUNK_BYTES", str(64 * 1024)))
+EXPORT_SPOOL_BYTES = int(os.getenv("BACKUP_EXPORT_SPOOL_BYTES", str(4 * 1024 * 1024)))
+BACKUP_EXPORT_WORKERS = max(1, int(os.getenv("BACKUP_EXPORT_WORKERS", "4")))
+# Differential runs re-read this much before the previous snapshot (app / DB clock skew)
+BACKUP_DIFF_OVERLAP_SECONDS = int(os.getenv("BACKUP_DIFF_OVERLAP_SECONDS", "300"))
+BACKUP_EXPORT_COPY = os.getenv("BACKUP_EXPORT_COPY", "true").strip().lower() in ("1", "true", "yes", "on")
+
+MANIFEST_NAME = "manifest.json"
+DELETIONS_NAME = "_deletions.csv"
+MANIFEST_FORMAT_VERSION = 1
+
+# Backup / scheduler bookkeeping is not tenant data; kv_entries (OTPs) and
+# email_outbox (queued mail with OTPs / passwords) are operational state shared by every tenant
+EXCLUDED_TABLES = {"backup_runs", "job_runs", "kv_entries", "email_outbox"}
+
+# A row counts as changed when any of these is newer than the previous backup
+CHANGE_COLUMNS = ("created_at", "updated_at", "timestamp")
+
+
+def serialize_csv_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        # Keep consistent, machine-readable timestamps
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc).isoformat()
+        return value.isoformat()
+    return str(value) if not isinstance(value, (int, float, bool, str)) else value
+
+
+def exportable_models() -> list:
+    """(table_name, model) for every mapped table, in registry order."""
+    models = []
+    for mapper in Base.registry.mappers:
+        table_name = mapper.local_table.name
+        if not table_name or table_name.startswith("sqlite_") or table_name in EXCLUDED_TABLES:
+            continue
+        models.append((table_name, mapper.class_))
+    return models
+
+
+def _company_user_ids_select(company_id: int):
+    from models.auth import User
+
+    return select(User.id).where(User.related_to_company == company_id)
+
+
+def change_columns(model) -> list:
+    """Timestamp columns that tell whether a row changed (empty: table is always exported in full)."""
+    columns = model.__mapper__.columns
+    return [columns[key] for key in CHANGE_COLUMNS if key in columns]
+
+
+def scoped_select(model, company_id: int | None, company_user_ids: list[int], columns: list | None = None,
+                  since: datetime | None = None):
+    """SELECT of the model's columns (or `columns`) restricted to one company's rows."""
+    model_columns = list(model.__mapper__.columns)
+    stmt = select(*(columns if columns is not None else model_columns))
+
+    if since is not None and change_columns(model):
+        stmt = stmt.where(or_(*[col > since for col in change_columns(model)]))
+
+    # Prefer explicit company scoping.
+    col_keys = {c.key for c in model_columns}
+    if company_id is not None and "company_id" in col_keys:
+        stmt = stmt.where(getattr(model, "company_id") == company_id)
+    elif company_id is not None and "related_to_company" in col_keys:
+        stmt = stmt.where(getattr(model, "related_to_company") == company_id)
+    elif company_id is not None or company_user_ids:
+        # Heuristic: if a table references users, scope by the company's users.
+        user_fk_cols = []
+        for c in model_columns:
+            try:
+                if any(getattr(fk.column.table, "name", None) == "users" for fk in c.foreign_keys):
+                    user_fk_cols.append(c)
+            except Exception:
+                continue
+        if user_fk_cols:
+            # Semi-join on users instead of shipping every user id as a bind parameter
+            users = _company_user_ids_select(company_id) if company_id is not None else company_user_ids
+            stmt = stmt.where(or_(*[col.in_(users) for col in user_fk_cols]))
+
+    return stmt
+
+
+# =====================================================
+# Reading one table into a CSV spool
+# =====================================================
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES, mode="w+b")
+
+
+def _write_rows_via_cursor(connection, model, company_id, company_user_ids, since, out) -> int:
+    fieldnames = [c.key for c in model.__mapper__.columns]
+    stmt = scoped_select(model, company_id, company_user_ids, since=since)
+    result = connection.execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS).execute(stmt)
+
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(fieldnames)
+    rows = 0
+    for batch in result.partitions():
+        writer.writerows([serialize_csv_value(value) for value in row] for row in batch)
+        rows += len(batch)
+        out.write(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+    out.write(buffer.getvalue().encode("utf-8"))
+    return rows
+
+
+def _pg_isoformat(expr):
+    """datetime.isoformat() of a UTC value: microseconds only when non-zero, '+00:00' suffix."""
+    micros = func.to_char(expr, "US", type_=String)
+    return (
+        func.to_char(expr, 'YYYY-MM-DD"T"HH24:MI:SS', type_=String)
+        + case((micros != "000000", "." + micros), else_="")
+        + "+00:00"
+    )
+
+
+def _pg_float_text(expr):
+    """repr(float): integral values keep a trailing '.0'."""
+    return case(
+        ((expr == func.trunc(expr)) & (func.abs(expr) < 1e16), cast(cast(expr, BigInteger), String) + ".0"),
+        else_=cast(expr, String),
+    )
+
+
+def _pg_render(column, dialect):
+    """SQL expression printing `column` exactly like serialize_csv_value(), or None if it can't."""
+    col_type = column.type
+    if isinstance(col_type, Enum):
+        if not col_type.enum_class:
+            return cast(column, String)
+        to_python = col_type.result_processor(dialect, None)
+        labels = {db_value: str(serialize_csv_value(to_python(db_value))) for db_value in col_type.enums}
+        return case(labels, value=cast(column, String))
+    if isinstance(col_type, Boolean):
+        return case((column == True, "True"), (column == False, "False"))  # noqa: E712
+    if isinstance(col_type, DateTime):
+        return _pg_isoformat(func.timezone("UTC", column) if col_type.timezone else column)
+    if isinstance(col_type, Date):
+        return func.to_char(column, "YYYY-MM-DD", type_=String)
+    if isinstance(col_type, (Float, Numeric)) and (isinstance(col_type, Float) or not col_type.asdecimal):
+        return _pg_float_text(column)
+    if isinstance(col_type, (Integer, Numeric, String)):
+        return column
+    return None
+
+
+def _write_rows_via_copy(connection, model, company_id, company_user_ids, since, out) -> int | None:
+    """COPY the table out of PostgreSQL; returns None when a column type needs the cursor path."""
+    model_columns = list(model.__mapper__.columns)
+    rendered = [_pg_render(c, connection.dialect) for c in model_columns]
+    if any(expr is None for expr in rendered):
+        return None
+
+    stmt = scoped_select(model, company_id, company_user_ids, columns=rendered, since=since)
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+
+    with _spool() as raw:
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv)", raw)
+        finally:
+            cursor.close()
+        raw.seek(0)
+
+        # Re-frame COPY's output (LF rows, its own quoting) exactly as csv.writer would
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer)
+        writer.writerow([c.key for c in model_columns])
+        rows = 0
+        for row in reader:
+            writer.writerow(row)
+            rows += 1
+            if rows % EXPORT_BATCH_ROWS == 0:
+                out.write(buffer.getvalue().encode("utf-8"))
+                buffer.seek(0)
+                buffer.truncate()
+        out.write(buffer.getvalue().encode("utf-8"))
+    return rows
+
+
+def export_table_csv(engine, model, company_id: int | None, company_user_ids: list[int],
+                     since: datetime | None = None):
+    """Export one table on its own connection; returns (spool positioned at 0, row count)."""
+    out = _spool()
+    try:
+        with engine.connect() as connection:
+            rows = None
+            if BACKUP_EXPORT_COPY and connection.dialect.name == "postgresql":
+                rows = _write_rows_via_copy(connection, model, company_id, company_user_ids, since, out)
+            if rows is None:
+                rows = _write_rows_via_cursor(connection, model, company_id, company_user_ids, since, out)
+        out.seek(0)
+        return out, rows
+    except Exception:
+        out.close()
+        raise
+
+
+# =====================================================
+# Zip assembly
+# =====================================================
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable target for ZipFile that buffers output until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._buffered = 0
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._buffered += len(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    @property
+    def buffered(self) -> int:
+        return self._buffered
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self._buffered = 0
+        return data
+
+
+@dataclass
+class ExportStats:
+    tables_exported: int = 0
+    rows_exported: int = 0
+    bytes_written: int = 0
+    deletions: int = 0
+    failed_tables: list = field(default_factory=list)
+    tables: dict = field(default_factory=dict)  # table -> {"rows": n, "scope": "full" | "changed"}
+
+
+def write_deletions_csv(connection, company_id: int, since: datetime, out) -> int:
+    """Rows of the company deleted after `since`, from the DELETE entries of audit_logs."""
+    from models.auditlog import Auditlog
+
+    tables_by_class = {model.__name__: table_name for table_name, model in exportable_models()}
+    stmt = (
+        select(Auditlog.id, Auditlog.entity_type, Auditlog.entity_id, Auditlog.timestamp)
+        .where(
+            Auditlog.action == "DELETE",
+            Auditlog.timestamp > since,
+            Auditlog.user_id.in_(_company_user_ids_select(company_id)),
+        )
+        .order_by(Auditlog.id)
+    )
+
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(["table", "id", "deleted_at", "audit_log_id"])
+    rows = 0
+    for log_id, entity_type, entity_id, deleted_at in connection.execute(stmt):
+        table_name = tables_by_class.get(entity_type)
+        if not table_name or not entity_id:
+            continue
+        writer.writerow([table_name, entity_id, serialize_csv_value(deleted_at), log_id])
+        rows += 1
+    out.write(buffer.getvalue().encode("utf-8"))
+    return rows
+
+
+def build_manifest(manifest: dict, stats: ExportStats) -> dict:
+    """manifest.json: run metadata from the caller plus what was actually exported."""
+    return {
+        "format_version": MANIFEST_FORMAT_VERSION,
+        **manifest,
+        "tables": stats.tables,
+        "rows_exported": stats.rows_exported,
+        "deletions": stats.deletions,
+        "failed_tables": stats.failed_tables,
+    }
+
+
+def _drain(sink: _ChunkSink, stats: ExportStats) -> Iterator[bytes]:
+    if sink.buffered:
+        chunk = sink.drain()
+        stats.bytes_written += len(chunk)
+        yield chunk
+
+
+def _copy_into_zip(zf: zipfile.ZipFile, sink: _ChunkSink, name: str, spool, stats: ExportStats) -> Iterator[bytes]:
+    # force_zip64: entry sizes are unknown up front on a non-seekable stream
+    with zf.open(name, mode="w", force_zip64=True) as entry:
+        while True:
+            data = spool.read(EXPORT_CHUNK_BYTES)
+            if not data:
+                break
+            entry.write(data)
+            if sink.buffered >= EXPORT_CHUNK_BYTES:
+                yield from _drain(sink, stats)
+
+
+def _zip_tables(zf: zipfile.ZipFile, sink: _ChunkSink, pending: deque, submit_next, since,
+                stats: ExportStats) -> Iterator[bytes]:
+    """Write finished tables into the zip in order while the pool reads ahead."""
+    while pending:
+        table_name, model, future = pending.popleft()
+        submit_next()
+        try:
+            spool, rows = future.result()
+        except Exception as exc:
+            error_details = f"Exception: {exc}\n\nTraceback:\n{''.join(traceback.format_exception(exc))}"
+            zf.writestr(f"{table_name}.ERROR.txt", error_details)
+            stats.failed_tables.append(table_name)
+        else:
+            with spool:
+                yield from _copy_into_zip(zf, sink, f"{table_name}.csv", spool, stats)
+            stats.tables_exported += 1
+            stats.rows_exported += rows
+            scope = "changed" if since is not None and change_columns(model) else "full"
+            stats.tables[table_name] = {"rows": rows, "scope": scope}
+
+        yield from _drain(sink, stats)
+
+
+def stream_backup_zip(db: Session, company_id: int | None, company_user_ids: list[int],
+                      stats: ExportStats | None = None, workers: int | None = None,
+                      since: datetime | None = None, manifest: dict | None = None) -> Iterator[bytes]:
+    """
+    Yield the backup archive as compressed chunks; fills `stats` as it goes.
+    `since` makes it a differential backup; `manifest` (run metadata) adds manifest.json.
+    """
+    stats = stats if stats is not None else ExportStats()
+    workers = workers or BACKUP_EXPORT_WORKERS
+    engine = db.get_bind()
+    sink = _ChunkSink()
+    tables = iter(exportable_models())
+    pending = deque()
+
+    def submit_next():
+        nxt = next(tables, None)
+        if nxt is not None:
+            table_name, model = nxt
+            future = pool.submit(export_table_csv, engine, model, company_id, company_user_ids, since)
+            pending.append((table_name, model, future))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup-export") as pool:
+        # At most `workers` tables read ahead of the one being zipped
+        for _ in range(workers + 1):
+            submit_next()
+
+        try:
+            with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+                yield from _zip_tables(zf, sink, pending, submit_next, since, stats)
+
+                if since is not None and company_id is not None:
+                    with _spool() as spool, engine.connect() as connection:
+                        stats.deletions = write_deletions_csv(connection, company_id, since, spool)
+                        spool.seek(0)
+                        yield from _copy_into_zip(zf, sink, DELETIONS_NAME, spool, stats)
+
+                if manifest is not None:
+                    zf.writestr(MANIFEST_NAME, json.dumps(build_manifest(manifest, stats), indent=2, default=str))
+        finally:
+            # Client went away mid-download: drop queued tables and free finished spools
+            for _table_name, _model, future in pending:
+                if not future.cancel() and future.done() and future.exception() is None:
+                    future.result()[0].close()
+
+    # rest of the last table, the manifest and the central directory
+    yield from _drain(sink, stats)
+
+
+# =====================================================
+# Backup runs (full / differential chain)
+# =====================================================
+def start_backup_run(db: Session, company_id: int, user_id: int | None, mode: str = "full",
+                     status: str = "running", trigger: str = "manual"):
+    """
+    Record a running (or queued) backup. A differential run continues from the company's
+    last completed run; without one it falls back to a full backup.
+    """
+    from models.backup import BackupRun
+
+    previous = (
+        db.query(BackupRun)
+        .filter(BackupRun.company_id == company_id, BackupRun.status == "completed")
+        .order_by(BackupRun.snapshot_at.desc(), BackupRun.id.desc())
+        .first()
+    )
+
+    run = BackupRun(
+        company_id=company_id,
+        created_by=user_id,
+        mode="full",
+        snapshot_at=datetime.now(timezone.utc) - timedelta(seconds=BACKUP_DIFF_OVERLAP_SECONDS),
+        status=status,
+        trigger=trigger,
+    )
+    if mode == "differential" and previous is not None:
+        run.mode = "differential"
+        run.parent_id = previous.id
+        run.base_id = previous.base_id or previous.id
+        run.since = previous.snapshot_at
+
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def backup_chain(db: Session, run) -> list[int]:
+    """Run ids to restore in order: the full backup, then each differential up to `run`."""
+    from models.backup import BackupRun
+
+    chain = [run.id]
+    parent_id = run.parent_id
+    while parent_id is not None:
+        chain.append(parent_id)
+        parent = db.get(BackupRun, parent_id)
+        parent_id = parent.parent_id if parent is not None else None
+    return list(reversed(chain))
+
+
+def run_manifest(db: Session, run) -> dict:
+    return {
+        "backup_id": run.id,
+        "company_id": run.company_id,
+        "mode": run.mode,
+        "parent_backup_id": run.parent_id,
+        "base_backup_id": run.base_id or run.id,
+        "chain": backup_chain(db, run),
+        "since": serialize_csv_value(run.since),
+        "snapshot_at": serialize_csv_value(run.snapshot_at),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def finish_backup_run(db: Session, run, stats: ExportStats, status: str = "completed"):
+    run.status = status
+    run.tables_exported = stats.tables_exported
+    run.rows_exported = stats.rows_exported
+    run.deletions = stats.deletions
+    run.completed_at = datetime.now(timezone.utc)
+    db.commit()
@@ -0,0 +1,341 @@
+"""Background CSV backup jobs with on-disk artifacts.
+
+POST /admin/backup/jobs queues a backup_runs row (status "queued") and hands it to this
+worker's job pool; the request returns at once. The job writes the zip to
+MEDIA_ROOT/backups/<random token>/<file>.zip (through a .part file, renamed when
+complete), so it is served by the /media StaticFiles mount -- with range requests, so
+interrupted downloads can resume -- and the unguessable token is the download
+capability. When the job finishes the requester gets a notification (audit log + websocket).
+
+The scheduler (services/scheduler.py) also:
+- queues scheduled backups for companies whose Company.backup_reminder frequency is due
+- deletes artifacts past expires_at (BACKUP_ARTIFACT_TTL_HOURS)
+- re-submits queued jobs a restarted worker never picked up and fails jobs stuck running
+"""
+
+import os
+import shutil
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.auditlog import Auditlog
+from models.auth import User
+from models.backup import BackupRun
+from models.company import Company
+from models.subscription import PlanName, StatusList, Subscription
+from services.backup_export import (
+    BACKUP_DIFF_OVERLAP_SECONDS,
+    ExportStats,
+    backup_chain,
+    finish_backup_run,
+    run_manifest,
+    start_backup_run,
+    stream_backup_zip,
+)
+from services.backup_reminder import MANILA_TZ, backup_due_condition
+from services.subscription_lifecycle import latest_subscriptions
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "./media")
+BACKUP_ARTIFACT_DIR = "backups"  # under MEDIA_ROOT; served at /media/backups/...
+BACKUP_JOB_WORKERS = int(os.getenv("BACKUP_JOB_WORKERS", "1"))
+BACKUP_ARTIFACT_TTL_HOURS = float(os.getenv("BACKUP_ARTIFACT_TTL_HOURS", "72"))
+BACKUP_JOB_TIMEOUT_MINUTES = float(os.getenv("BACKUP_JOB_TIMEOUT_MINUTES", "120"))
+BACKUP_JOB_REQUEUE_MINUTES = float(os.getenv("BACKUP_JOB_REQUEUE_MINUTES", "5"))
+# Scheduled backups are differential; a new full backup starts once the chain is this long
+BACKUP_SCHEDULED_MAX_CHAIN = int(os.getenv("BACKUP_SCHEDULED_MAX_CHAIN", "7"))
+
+_executor = ThreadPoolExecutor(max_workers=BACKUP_JOB_WORKERS, thread_name_prefix="backup-job")
+
+
+def backup_filename(company_id: int, mode: str, when: datetime) -> str:
+    suffix = "-differential" if mode == "differential" else ""
+    return f"crm-backup-company-{company_id}-{when.strftime('%Y%m%d-%H%M%S')}{suffix}.zip"
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def artifact_url(run: BackupRun, now: datetime | None = None) -> str | None:
+    """Download link while the artifact exists and has not expired."""
+    now = now or datetime.now(timezone.utc)
+    if run.status != "completed" or not run.artifact_path:
+        return None
+    if run.expires_at is not None and _as_utc(run.expires_at) <= now:
+        return None
+    return f"/media/{run.artifact_path}"
+
+
+def serialize_backup_job(run: BackupRun) -> dict:
+    return {
+        "id": run.id,
+        "company_id": run.company_id,
+        "mode": run.mode,
+        "trigger": run.trigger,
+        "status": run.status,
+        "error": run.error,
+        "parent_id": run.parent_id,
+        "rows_exported": run.rows_exported,
+        "tables_exported": run.tables_exported,
+        "deletions": run.deletions,
+        "artifact_bytes": run.artifact_bytes,
+        "download_url": artifact_url(run),
+        "expires_at": run.expires_at.isoformat() if run.expires_at else None,
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+    }
+
+
+# =====================================================
+# Queue / run
+# =====================================================
+def enqueue_backup_job(db: Session, company_id: int, user_id: int | None, mode: str = "full",
+                       trigger: str = "manual") -> BackupRun:
+    run = start_backup_run(db, company_id, user_id, mode=mode, status="queued", trigger=trigger)
+    submit_backup_job(run.id)
+    return run
+
+
+def submit_backup_job(run_id: int):
+    _executor.submit(run_backup_job, run_id)
+
+
+def _artifact_dir(run: BackupRun) -> str | None:
+    if not run.artifact_path:
+        return None
+    path = os.path.normpath(os.path.join(MEDIA_ROOT, os.path.dirname(run.artifact_path)))
+    root = os.path.normpath(os.path.join(MEDIA_ROOT, BACKUP_ARTIFACT_DIR))
+    # Only ever remove a token directory inside MEDIA_ROOT/backups
+    return path if os.path.dirname(path) == root else None
+
+
+def _remove_artifact(run: BackupRun):
+    directory = _artifact_dir(run)
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+    run.artifact_path = None
+
+
+def _claim(db: Session, run_id: int) -> BackupRun | None:
+    """queued -> running; None when another worker (or a re-submit) got there first."""
+    now = datetime.now(timezone.utc)
+    claimed = (
+        db.query(BackupRun)
+        .filter(BackupRun.id == run_id, BackupRun.status == "queued")
+        .update(
+            {
+                "status": "running",
+                "started_at": now,
+                "snapshot_at": now - timedelta(seconds=BACKUP_DIFF_OVERLAP_SECONDS),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return db.get(BackupRun, run_id) if claimed else None
+
+
+def run_backup_job(run_id: int):
+    db: Session = SessionLocal()
+    try:
+        run = _claim(db, run_id)
+        if run is None:
+            return
+
+        company_user_ids = [row[0] for row in db.query(User.id).filter(User.related_to_company == run.company_id)]
+        filename = backup_filename(run.company_id, run.mode, run.started_at)
+        run.artifact_path = f"{BACKUP_ARTIFACT_DIR}/{secrets.token_urlsafe(24)}/{filename}"
+        db.commit()
+
+        final_path = os.path.join(MEDIA_ROOT, run.artifact_path)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+
+        stats = ExportStats()
+        try:
+            with open(final_path + ".part", "wb") as fh:
+                for chunk in stream_backup_zip(
+                    db, run.company_id, company_user_ids, stats,
+                    since=run.since, manifest=run_manifest(db, run),
+                ):
+                    fh.write(chunk)
+            os.replace(final_path + ".part", final_path)
+        except Exception as exc:
+            db.rollback()
+            _remove_artifact(run)
+            run.error = str(exc)[:500]
+            finish_backup_run(db, run, stats, status="failed")
+            print(f"[Backup Job Error] Backup {run.id} of company {run.company_id} failed: {exc}")
+            _notify(db, run, failed=True)
+            return
+
+        run.artifact_bytes = stats.bytes_written
+        run.expires_at = datetime.now(timezone.utc) + timedelta(hours=BACKUP_ARTIFACT_TTL_HOURS)
+        finish_backup_run(db, run, stats)
+        print(f"[Backup Job] Backup {run.id} of company {run.company_id} ready "
+              f"({stats.rows_exported} rows, {stats.bytes_written} bytes)")
+        _notify(db, run)
+    except Exception as e:
+        print(f"[Backup Job Error] {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _notify(db: Session, run: BackupRun, failed: bool = False):
+    """Audit-log notification (badge / replay) plus a websocket push to each recipient."""
+    from routers.ws_notification import broadcast_notification_threadsafe
+
+    if run.created_by:
+        recipients = [run.created_by]
+    else:
+        # Scheduled backups go to the company's admins, like the backup reminders
+        recipients = [
+            row[0]
+            for row in db.query(User.id).filter(
+                User.related_to_company == run.company_id,
+                User.is_active == True,
+                User.role.in_(["Admin", "CEO"]),
+            )
+        ]
+
+    if failed:
+        action, title = "BACKUP_FAILED", f"Backup #{run.id} failed"
+    else:
+        # A requested backup is logged as BACKUP, so it counts toward the Starter export limit
+        action = "BACKUP" if run.trigger == "manual" else "SCHEDULED_BACKUP"
+        title = f"Your {run.mode} backup is ready to download"
+
+    logs = []
+    for user_id in recipients:
+        log = Auditlog(
+            user_id=user_id,
+            name="System",
+            action=action,
+            description=f"{action} - {title} (tables: {run.tables_exported})",
+            entity_type="BackupRun",
+            entity_id=str(run.id),
+            new_data={
+                "format": "csv",
+                "company_id": run.company_id,
+                "mode": run.mode,
+                "backup_id": run.id,
+                "rows_exported": run.rows_exported,
+                "tables_exported": run.tables_exported,
+            },
+            success=not failed,
+            is_read=False,
+        )
+        db.add(log)
+        logs.append(log)
+    db.commit()
+
+    for log in logs:
+        broadcast_notification_threadsafe(
+            {
+                "id": log.id,
+                "read": False,
+                "type": "backup_failed" if failed else "backup_ready",
+                "title": title,
+                "backupId": run.id,
+                "downloadUrl": artifact_url(run),
+                "expiresAt": run.expires_at.isoformat() if run.expires_at else None,
+                "createdAt": datetime.now(timezone.utc).isoformat(),
+            },
+            target_user_id=log.user_id,
+        )
+
+
+# =====================================================
+# Scheduled maintenance
+# =====================================================
+def expire_backup_artifacts(db: Session, now: datetime | None = None) -> int:
+    """Delete artifacts past expires_at; the run rows stay (they anchor differential chains)."""
+    now = now or datetime.now(timezone.utc)
+    runs = (
+        db.query(BackupRun)
+        .filter(BackupRun.artifact_path.isnot(None), BackupRun.expires_at <= now)
+        .all()
+    )
+    for run in runs:
+        _remove_artifact(run)
+    db.commit()
+    return len(runs)
+
+
+def recover_backup_jobs(db: Session, now: datetime | None = None) -> int:
+    """Re-submit queued jobs nobody started; fail running jobs past BACKUP_JOB_TIMEOUT_MINUTES."""
+    now = now or datetime.now(timezone.utc)
+
+    stuck = (
+        db.query(BackupRun)
+        .filter(
+            BackupRun.status == "running",
+            BackupRun.started_at < now - timedelta(minutes=BACKUP_JOB_TIMEOUT_MINUTES),
+        )
+        .all()
+    )
+    for run in stuck:
+        _remove_artifact(run)
+        run.status = "failed"
+        run.error = "Timed out"
+        run.completed_at = now
+    db.commit()
+
+    waiting = [
+        row[0]
+        for row in db.query(BackupRun.id).filter(
+            BackupRun.status == "queued",
+            BackupRun.created_at < now - timedelta(minutes=BACKUP_JOB_REQUEUE_MINUTES),
+        )
+    ]
+    for run_id in waiting:
+        submit_backup_job(run_id)  # the claim makes a double submit harmless
+    return len(stuck) + len(waiting)
+
+
+def _scheduled_mode(db: Session, company_id: int) -> str:
+    previous = (
+        db.query(BackupRun)
+        .filter(BackupRun.company_id == company_id, BackupRun.status == "completed")
+        .order_by(BackupRun.snapshot_at.desc(), BackupRun.id.desc())
+        .first()
+    )
+    if previous is None or len(backup_chain(db, previous)) >= BACKUP_SCHEDULED_MAX_CHAIN:
+        return "full"
+    return "differential"
+
+
+def process_scheduled_backups(db: Session, now_ph: datetime | None = None) -> int:
+    """Queue a backup for every paid company whose backup_reminder frequency is due today."""
+    now = now_ph or datetime.now(MANILA_TZ)
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+
+    already_today = select(BackupRun.company_id).where(
+        BackupRun.trigger == "scheduled",
+        BackupRun.created_at >= day_start,
+    )
+    # Due, on a paid plan (newest subscription live and not Free), not yet queued today
+    company_ids = [
+        row[0]
+        for row in db.query(Subscription.company_id)
+        .join(Company, Company.id == Subscription.company_id)
+        .filter(
+            Subscription.id.in_(latest_subscriptions()),
+            Subscription.status.in_([StatusList.ACTIVE.value, StatusList.TRIAL.value]),
+            func.lower(Subscription.plan_name) != PlanName.FREE.value.lower(),
+            backup_due_condition(now),
+            Company.id.notin_(already_today),
+        )
+    ]
+
+    for company_id in company_ids:
+        enqueue_backup_job(db, company_id, None, mode=_scheduled_mode(db, company_id), trigger="scheduled")
+    return len(company_ids)
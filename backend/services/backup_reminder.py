@@ -3,17 +3,20 @@
 from datetime import datetime
 
 import pytz
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
 from models.auditlog import Auditlog
 from models.auth import User
 from models.company import Company
+from services.notification_counters import record_new_notifications
 
 MANILA_TZ = pytz.timezone("Asia/Manila")
 BACKUP_REMINDER_MESSAGE = "Please remember to back up your CRM data today."
 
 
-def _should_notify_today(frequency: str, now_ph: datetime) -> bool:
+def is_backup_due(frequency: str, now_ph: datetime) -> bool:
+    """Whether a Company.backup_reminder frequency falls on now_ph (reminders and scheduled backups)."""
     freq = (frequency or "Daily").strip().lower()
 
     if freq == "daily":
@@ -30,41 +33,52 @@ def _should_notify_today(frequency: str, now_ph: datetime) -> bool:
     return True
 
 
+KNOWN_FREQUENCIES = ("daily", "weekly", "monthly", "quarterly", "yearly")
+
+
+def backup_due_condition(now_ph: datetime):
+    """SQL form of is_backup_due() over Company.backup_reminder."""
+    # Frequencies not due today; anything else (including unknown values) is due
+    not_due = [freq for freq in KNOWN_FREQUENCIES if not is_backup_due(freq, now_ph)]
+    return func.lower(func.trim(func.coalesce(Company.backup_reminder, "Daily"))).notin_(not_due)
+
+
 def process_backup_reminders(db: Session, now_ph: datetime | None = None) -> int:
     """Create backup reminder notifications for active Admin/CEO users."""
     now = now_ph or datetime.now(MANILA_TZ)
-    created_notifications = 0
-
-    companies = db.query(Company).all()
-
-    for company in companies:
-        if not _should_notify_today(company.backup_reminder or "Daily", now):
-            continue
-
-        target_users = (
-            db.query(User)
-            .filter(
-                User.related_to_company == company.id,
-                User.is_active == True,
-                User.role.in_(["Admin", "CEO"]),
-            )
-            .all()
+
+    # One query for every recipient of every due company
+    recipients = (
+        db.query(User.id, Company.id)
+        .join(Company, Company.id == User.related_to_company)
+        .filter(
+            User.is_active == True,
+            User.role.in_(["Admin", "CEO"]),
+            backup_due_condition(now),
         )
+        .all()
+    )
 
-        for user in target_users:
-            db.add(
-                Auditlog(
-                    user_id=user.id,
-                    name="System",
-                    action="BACKUP_REMINDER",
-                    description=BACKUP_REMINDER_MESSAGE,
-                    entity_type="Company",
-                    entity_id=str(company.id),
-                    success=True,
-                    is_read=False,
-                )
-            )
-            created_notifications += 1
+    if not recipients:
+        return 0
 
+    # One bulk INSERT; the ORM flush hook does not see it, so bump the unread counters here
+    created = db.execute(
+        insert(Auditlog).returning(Auditlog.id, Auditlog.user_id),
+        [
+            {
+                "user_id": user_id,
+                "name": "System",
+                "action": "BACKUP_REMINDER",
+                "description": BACKUP_REMINDER_MESSAGE,
+                "entity_type": "Company",
+                "entity_id": str(company_id),
+                "success": True,
+                "is_read": False,
+            }
+            for user_id, company_id in recipients
+        ],
+    ).all()
+    record_new_notifications(db.connection(), created)
     db.commit()
-    return created_notifications
+    return len(created)
@@ -0,0 +1,503 @@
+"""Restore CSV backup archives (services/backup_export.py) into a tenant.
+
+Archives are restored as a chain: a full backup, optionally followed by the
+differential backups taken after it (manifest.json `parent_backup_id` must match the
+previous archive). Tables are loaded in foreign-key dependency order, streamed from
+the zip in RESTORE_BATCH_ROWS batches and written with multi-row INSERTs.
+
+Every row gets a new primary key in the target database (ids are allocated up front
+from the table's sequence on PostgreSQL), and foreign keys are rewritten through the
+old -> new id map; company columns point at the target company. References to rows
+that are not in the archive (e.g. a platform admin who created a record) are set to
+NULL when the column allows it and rejected otherwise. Self-references
+(users.related_to_CEO) are filled in once the whole table is loaded.
+
+Each restore first runs a dry-run validation pass -- values parse, references
+resolve, unique values are free -- and only writes, in a single transaction, when it
+is clean. From the backend folder:
+
+    python -m services.backup_restore full.zip [diff1.zip ...] [--company-id ID] [--dry-run]
+"""
+
+from __future__ import annotations
+
+import ast
+import csv
+import io
+import json
+import os
+import time
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterable, Union
+
+from sqlalchemy import JSON, Boolean, Date, DateTime, Enum, Float, Integer, Numeric, bindparam, func, select, text
+
+from database import Base
+from services.backup_export import DELETIONS_NAME, EXCLUDED_TABLES, MANIFEST_NAME
+from services.notification_counters import backfill_notification_counters
+
+RESTORE_BATCH_ROWS = int(os.getenv("BACKUP_RESTORE_BATCH_ROWS", "5000"))
+MAX_REPORTED_ERRORS = 100
+
+# Derived data: the unread counters of restored users are rebuilt from audit_logs at the end
+SKIPPED_TABLES = {"notification_counters"} | EXCLUDED_TABLES
+
+ArchiveSource = Union[str, BinaryIO]
+
+
+class RestoreError(Exception):
+    """The archives cannot be restored at all (not a backup zip, broken chain, unknown company)."""
+
+
+@dataclass
+class TableReport:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    nulled_references: int = 0
+
+
+@dataclass
+class RestoreReport:
+    dry_run: bool
+    company_id: int | None = None
+    archives: list = field(default_factory=list)
+    tables: dict = field(default_factory=dict)
+    errors: list = field(default_factory=list)
+    error_count: int = 0
+    validation_seconds: float = 0.0
+    restore_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error_count == 0
+
+    @property
+    def rows(self) -> int:
+        return sum(t.inserted + t.updated + t.deleted for t in self.tables.values())
+
+    def table(self, name: str) -> TableReport:
+        return self.tables.setdefault(name, TableReport())
+
+    def error(self, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def to_dict(self) -> dict:
+        seconds = self.restore_seconds or self.validation_seconds
+        return {
+            "ok": self.ok,
+            "dry_run": self.dry_run,
+            "company_id": self.company_id,
+            "archives": self.archives,
+            "tables": {name: vars(report) for name, report in self.tables.items()},
+            "rows": self.rows,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "validation_seconds": round(self.validation_seconds, 3),
+            "restore_seconds": round(self.restore_seconds, 3),
+            "rows_per_second": round(self.rows / seconds, 1) if seconds else None,
+        }
+
+
+# =====================================================
+# CSV value parsing (inverse of serialize_csv_value)
+# =====================================================
+def _parse_bool(raw: str) -> bool:
+    value = raw.strip().lower()
+    if value in ("true", "t", "1"):
+        return True
+    if value in ("false", "f", "0"):
+        return False
+    raise ValueError(f"not a boolean: {raw!r}")
+
+
+def _parse_enum(enum_class, raw: str):
+    # Exported as str(member), e.g. "StatusCategory.COMPLETED"; accept bare names / values too
+    name = raw.rsplit(".", 1)[-1]
+    if name in enum_class.__members__:
+        return enum_class[name]
+    return enum_class(raw)
+
+
+def _parse_json(raw: str):
+    # The exporter wrote str(dict) (Python literal); JSON text is accepted as well
+    try:
+        return ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return json.loads(raw)
+
+
+def _column_parser(column):
+    col_type = column.type
+    if isinstance(col_type, Enum):
+        if col_type.enum_class:
+            return lambda raw: _parse_enum(col_type.enum_class, raw)
+        return str
+    if isinstance(col_type, Boolean):
+        return _parse_bool
+    if isinstance(col_type, DateTime):
+        def parse_datetime(raw: str):
+            value = datetime.fromisoformat(raw)
+            if not col_type.timezone and value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value
+        return parse_datetime
+    if isinstance(col_type, Date):
+        return lambda raw: date.fromisoformat(raw[:10])
+    if isinstance(col_type, Float) or (isinstance(col_type, Numeric) and not col_type.asdecimal):
+        return float
+    if isinstance(col_type, Numeric):
+        return Decimal
+    if isinstance(col_type, Integer):
+        return int
+    if isinstance(col_type, JSON):
+        return _parse_json
+    return None  # strings and anything else stay text
+
+
+def _row_parser(table, header: list[str]):
+    parsers = {}
+    for name in header:
+        if name not in table.c:
+            continue
+        column = table.c[name]
+        parsers[name] = (column, _column_parser(column))
+
+    def parse(raw_row: dict) -> dict:
+        row = {}
+        for name, (column, parser) in parsers.items():
+            raw = raw_row.get(name)
+            if raw is None or raw == "":
+                # None and "" are both written as an empty field
+                row[name] = "" if (parser is None and not column.nullable) else None
+                continue
+            try:
+                row[name] = parser(raw) if parser else raw
+            except (ValueError, TypeError, KeyError, InvalidOperation, SyntaxError) as exc:
+                raise ValueError(f"{name}: {exc}") from None
+        return row
+
+    return parse
+
+
+# =====================================================
+# Restoring
+# =====================================================
+def _single_int_pk(table):
+    pk = list(table.primary_key.columns)
+    if len(pk) == 1 and isinstance(pk[0].type, Integer) and not pk[0].foreign_keys:
+        return pk[0]
+    return None
+
+
+class _Restorer:
+    def __init__(self, connection, report: RestoreReport, company_id: int | None, dry_run: bool):
+        self.connection = connection
+        self.report = report
+        self.company_id = company_id
+        self.dry_run = dry_run
+        self.id_maps: dict[str, dict[int, int]] = {}
+        self._next_ids: dict[str, int] = {}
+        self._fake_id = 0
+        self._claimed_unique: dict[tuple, set] = {}
+
+    # ---------- ids ----------
+    def _allocate_ids(self, table, pk, count: int) -> list[int]:
+        if self.dry_run:
+            ids = list(range(self._fake_id - 1, self._fake_id - count - 1, -1))
+            self._fake_id -= count
+            return ids
+        if self.connection.dialect.name == "postgresql":
+            return list(self.connection.execute(
+                text("SELECT nextval(pg_get_serial_sequence(:table, :column)) FROM generate_series(1, :n)"),
+                {"table": table.name, "column": pk.name, "n": count},
+            ).scalars())
+        # SQLite and others: the restore holds the write lock, so max(id) + n is safe
+        start = self._next_ids.get(table.name)
+        if start is None:
+            start = (self.connection.execute(select(func.max(pk))).scalar() or 0) + 1
+        self._next_ids[table.name] = start + count
+        return list(range(start, start + count))
+
+    def _map_company(self, old_company_id: int | None):
+        if self.company_id is not None and old_company_id is not None:
+            self.id_maps.setdefault("companies", {})[old_company_id] = self.company_id
+
+    # ---------- references ----------
+    def _remap(self, table, row: dict, line: int, deferred: list) -> bool:
+        for column in table.columns:
+            old = row.get(column.name)
+            if old is None or not column.foreign_keys:
+                continue
+            target = next(iter(column.foreign_keys)).column.table.name
+            if target == table.name and old not in self.id_maps.get(target, {}):
+                # Self-reference to a row later in the same table: fill in afterwards
+                deferred.append((column.name, old))
+                row[column.name] = None
+                continue
+            new = self.id_maps.get(target, {}).get(old)
+            if new is not None:
+                row[column.name] = new
+            elif column.nullable:
+                row[column.name] = None
+                self.report.table(table.name).nulled_references += 1
+            else:
+                self.report.error(f"{table.name} line {line}: {column.name}={old} references a {target} row not in the backup")
+                return False
+        return True
+
+    def _check_unique(self, table, rows: list[dict], lines: list[int]):
+        for column in table.columns:
+            if not column.unique or column.primary_key:
+                continue
+            values = [row[column.name] for row in rows if row.get(column.name) is not None]
+            if not values:
+                continue
+            claimed = self._claimed_unique.setdefault((table.name, column.name), set())
+            taken = set(self.connection.execute(select(column).where(column.in_(values))).scalars()) | claimed
+            for row, line in zip(rows, lines):
+                value = row.get(column.name)
+                if value is not None and value in taken:
+                    self.report.error(f"{table.name} line {line}: {column.name}={value!r} already exists")
+                elif value is not None:
+                    claimed.add(value)
+
+    # ---------- tables ----------
+    def restore_table(self, zf: zipfile.ZipFile, table):
+        name = f"{table.name}.csv"
+        if name not in zf.namelist():
+            return
+        if table.name == "companies" and self.company_id is not None:
+            return  # restoring into an existing company: keep its own record
+
+        pk = _single_int_pk(table)
+        id_map = self.id_maps.setdefault(table.name, {})
+        fixups: list[tuple[int, str, int]] = []
+
+        with zf.open(name) as raw:
+            reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+            parse = _row_parser(table, reader.fieldnames or [])
+            batch, lines = [], []
+            for line, raw_row in enumerate(reader, start=2):
+                try:
+                    batch.append(parse(raw_row))
+                    lines.append(line)
+                except ValueError as exc:
+                    self.report.error(f"{table.name} line {line}: {exc}")
+                if len(batch) >= RESTORE_BATCH_ROWS:
+                    self._write_batch(table, pk, id_map, batch, lines, fixups)
+                    batch, lines = [], []
+            if batch:
+                self._write_batch(table, pk, id_map, batch, lines, fixups)
+
+        # Self-references now that every row of the table has its new id
+        updates = []
+        for new_id, column_name, old_ref in fixups:
+            new_ref = id_map.get(old_ref)
+            if new_ref is None:
+                self.report.table(table.name).nulled_references += 1
+            else:
+                updates.append({"_id": new_id, column_name: new_ref})
+        if updates and not self.dry_run:
+            for column_name in {key for u in updates for key in u if key != "_id"}:
+                rows = [u for u in updates if column_name in u]
+                self.connection.execute(
+                    table.update().where(pk == bindparam("_id")).values({column_name: bindparam(column_name)}),
+                    rows,
+                )
+
+    def _write_batch(self, table, pk, id_map: dict, batch: list[dict], lines: list[int], fixups: list):
+        table_report = self.report.table(table.name)
+        inserts, insert_lines, updates, pending_fixups = [], [], [], []
+
+        for row, line in zip(batch, lines):
+            deferred: list = []
+            if not self._remap(table, row, line, deferred):
+                continue
+            old_id = row.get(pk.name) if pk is not None else None
+            if old_id is not None and old_id in id_map:
+                # Already restored from an earlier archive in the chain
+                row[pk.name] = id_map[old_id]
+                updates.append(row)
+            else:
+                inserts.append(row)
+                insert_lines.append(line)
+            pending_fixups.append((row, old_id, deferred))
+
+        if inserts and pk is not None:
+            for row, new_id in zip(inserts, self._allocate_ids(table, pk, len(inserts))):
+                old_id = row[pk.name]
+                if old_id is not None:
+                    id_map[old_id] = new_id
+                row[pk.name] = new_id
+        for row, _old_id, deferred in pending_fixups:
+            fixups.extend((row[pk.name], column_name, old_ref) for column_name, old_ref in deferred)
+
+        if self.dry_run:
+            self._check_unique(table, inserts, insert_lines)
+        else:
+            if inserts:
+                self.connection.execute(table.insert(), inserts)
+            if updates:
+                for row in updates:
+                    row["_id"] = row[pk.name]
+                self.connection.execute(
+                    table.update().where(pk == bindparam("_id")).values(
+                        {key: bindparam(key) for key in updates[0] if key not in ("_id", pk.name)}
+                    ),
+                    updates,
+                )
+        table_report.inserted += len(inserts)
+        table_report.updated += len(updates)
+
+    def apply_deletions(self, zf: zipfile.ZipFile):
+        if DELETIONS_NAME not in zf.namelist():
+            return
+        targets: dict[str, list[int]] = {}
+        with zf.open(DELETIONS_NAME) as raw:
+            for row in csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline="")):
+                try:
+                    new_id = self.id_maps.get(row["table"], {}).get(int(row["id"]))
+                except (KeyError, ValueError):
+                    continue
+                if new_id is not None:
+                    targets.setdefault(row["table"], []).append(new_id)
+
+        tables = {t.name: t for t in Base.metadata.sorted_tables}
+        for table in reversed(Base.metadata.sorted_tables):
+            ids = targets.get(table.name)
+            pk = _single_int_pk(table) if table.name in tables else None
+            if not ids or pk is None:
+                continue
+            if not self.dry_run:
+                for start in range(0, len(ids), RESTORE_BATCH_ROWS):
+                    self.connection.execute(table.delete().where(pk.in_(ids[start:start + RESTORE_BATCH_ROWS])))
+            self.report.table(table.name).deleted += len(ids)
+            reverse = {new: old for old, new in self.id_maps[table.name].items()}
+            for new_id in ids:
+                self.id_maps[table.name].pop(reverse.get(new_id), None)
+
+    def restore_archive(self, zf: zipfile.ZipFile, manifest: dict):
+        self._map_company(manifest.get("company_id") or _first_company_id(zf))
+        for table in Base.metadata.sorted_tables:
+            if table.name in SKIPPED_TABLES:
+                continue
+            self.restore_table(zf, table)
+        self.apply_deletions(zf)
+
+
+def _first_company_id(zf: zipfile.ZipFile) -> int | None:
+    if "companies.csv" not in zf.namelist():
+        return None
+    with zf.open("companies.csv") as raw:
+        for row in csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline="")):
+            return int(row["id"]) if row.get("id") else None
+    return None
+
+
+def _open_archives(sources: Iterable[ArchiveSource]) -> list[tuple[zipfile.ZipFile, dict]]:
+    archives = []
+    for index, source in enumerate(sources):
+        try:
+            zf = zipfile.ZipFile(source)
+        except zipfile.BadZipFile:
+            raise RestoreError(f"Archive {index + 1} is not a zip file")
+        names = set(zf.namelist())
+        if not any(name.endswith(".csv") for name in names):
+            raise RestoreError(f"Archive {index + 1} contains no CSV tables")
+        # Backups taken before manifests existed are full backups
+        manifest = json.loads(zf.read(MANIFEST_NAME)) if MANIFEST_NAME in names else {"mode": "full"}
+        archives.append((zf, manifest))
+
+    if not archives:
+        raise RestoreError("No archives given")
+    if archives[0][1].get("mode") != "full":
+        raise RestoreError("The first archive must be a full backup")
+    for (_, previous), (_, current) in zip(archives, archives[1:]):
+        if current.get("mode") != "differential":
+            raise RestoreError("Only differential backups can follow the full backup")
+        if current.get("parent_backup_id") != previous.get("backup_id"):
+            raise RestoreError(
+                f"Backup {current.get('backup_id')} follows backup {current.get('parent_backup_id')}, "
+                f"not {previous.get('backup_id')}; restore the chain in order"
+            )
+    return archives
+
+
+def restore_archives(engine, sources: list[ArchiveSource], company_id: int | None = None,
+                     dry_run: bool = False) -> RestoreReport:
+    """
+    Validate and (unless dry_run) restore a backup chain into `company_id`, or into a new
+    company created from the archive's companies.csv when company_id is None.
+    """
+    archives = _open_archives(sources)
+    report = RestoreReport(dry_run=dry_run, company_id=company_id)
+    report.archives = [
+        {key: manifest.get(key) for key in ("backup_id", "mode", "company_id", "since", "snapshot_at")}
+        for _, manifest in archives
+    ]
+
+    with engine.connect() as connection:
+        if company_id is not None:
+            from models.company import Company
+            if connection.execute(select(Company.id).where(Company.id == company_id)).first() is None:
+                raise RestoreError(f"Company {company_id} does not exist")
+
+        started = time.perf_counter()
+        validator = _Restorer(connection, report, company_id, dry_run=True)
+        for zf, manifest in archives:
+            validator.restore_archive(zf, manifest)
+        report.validation_seconds = time.perf_counter() - started
+        connection.rollback()
+
+    if dry_run or not report.ok:
+        return report
+
+    # Validation passed: write for real in one transaction
+    report.tables = {}
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        restorer = _Restorer(connection, report, company_id, dry_run=False)
+        for zf, manifest in archives:
+            restorer.restore_archive(zf, manifest)
+        backfill_notification_counters(connection, list(restorer.id_maps.get("users", {}).values()))
+    report.restore_seconds = time.perf_counter() - started
+    report.company_id = company_id or next(iter(restorer.id_maps.get("companies", {}).values()), None)
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import models  # noqa: F401  (registers every table)
+    from database import engine as app_engine
+
+    parser = argparse.ArgumentParser(description="Restore CSV backup archives (full, then differentials) into a tenant")
+    parser.add_argument("archives", nargs="+", help="Full backup zip, then any differential zips in order")
+    parser.add_argument("--company-id", type=int, default=None, help="Existing company to restore into (default: create one)")
+    parser.add_argument("--dry-run", action="store_true", help="Only run the validation pass")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    try:
+        result = restore_archives(app_engine, args.archives, company_id=args.company_id, dry_run=args.dry_run)
+    except RestoreError as exc:
+        parser.exit(1, f"[Backup Restore] {exc}\n")
+
+    summary = result.to_dict()
+    if not result.dry_run and result.ok:
+        print(f"[Backup Restore] Restored {summary['rows']} rows into company {summary['company_id']} "
+              f"in {summary['restore_seconds']:.1f}s ({summary['rows_per_second']} rows/s)")
+    print(json.dumps({k: v for k, v in summary.items() if k != "tables"}, indent=2, default=str))
+    for table_name, counts in summary["tables"].items():
+        print(f"  {table_name:<28} {counts}")
+    if args.json_path:
+        with open(args.json_path, "w") as fh:
+            json.dump(summary, fh, indent=2, default=str)
+    raise SystemExit(0 if result.ok else 2)
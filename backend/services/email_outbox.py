@@ -0,0 +1,206 @@
+"""Durable outbound email queue.
+
+Request handlers never talk to SES. enqueue_email() adds an email_outbox row in the
+caller's transaction; once that transaction commits, the row's id is handed to this
+worker's send pool (EMAIL_SEND_WORKERS threads, so at most that many SES calls are in
+flight per process). A sender claims the row (queued -> sending), delivers it through
+services/email_transport.py and records the outcome:
+
+- sent: message id and sent_at recorded
+- transient failure: back to queued with exponential backoff, up to EMAIL_MAX_ATTEMPTS
+- permanent failure, attempts used up, or past expires_at (OTP codes): failed
+
+Bodies can carry credentials (welcome / reset passwords, OTP codes), so they are cleared
+as soon as a row is sent or failed. The scheduler sweeps the table every minute
+(process_email_outbox) to pick up retries, rows a restarted worker never sent, and rows
+stuck in sending.
+"""
+
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models.email_outbox import EmailOutbox
+from services.email_transport import EmailSendError, OutboundEmail, get_transport
+
+EMAIL_SEND_WORKERS = int(os.getenv("EMAIL_SEND_WORKERS", "4"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+EMAIL_SENDING_TIMEOUT_MINUTES = float(os.getenv("EMAIL_SENDING_TIMEOUT_MINUTES", "10"))
+EMAIL_SWEEP_BATCH = int(os.getenv("EMAIL_SWEEP_BATCH", "500"))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "30"))
+
+_PENDING_KEY = "email_outbox_pending"
+
+_executor = ThreadPoolExecutor(max_workers=EMAIL_SEND_WORKERS, thread_name_prefix="email")
+_inflight: set[int] = set()
+_inflight_lock = threading.Lock()
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# =====================================================
+# Queue
+# =====================================================
+def enqueue_email(
+    db: Session,
+    kind: str,
+    to_email: str,
+    subject: str,
+    body_text: str | None = None,
+    body_html: str | None = None,
+    expires_in: timedelta | None = None,
+) -> EmailOutbox:
+    """Queue an email in the caller's transaction; it is handed to the send pool on commit."""
+    now = _utc_now()
+    email = EmailOutbox(
+        kind=kind,
+        to_email=to_email,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        status="queued",
+        attempts=0,
+        next_attempt_at=now,
+        expires_at=now + expires_in if expires_in else None,
+    )
+    db.add(email)
+    db.flush()
+    db.info.setdefault(_PENDING_KEY, []).append(email.id)
+    return email
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_committed(session: Session):
+    for email_id in session.info.pop(_PENDING_KEY, ()):
+        submit_email(email_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def submit_email(email_id: int) -> bool:
+    """Hand a row to the send pool unless this worker already has it."""
+    with _inflight_lock:
+        if email_id in _inflight:
+            return False
+        _inflight.add(email_id)
+    _executor.submit(deliver_email, email_id)
+    return True
+
+
+# =====================================================
+# Deliver
+# =====================================================
+def _retry_delay(attempts: int) -> timedelta:
+    delay = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _finish(email: EmailOutbox, status: str, error: str | None = None):
+    email.status = status
+    email.last_error = error[:500] if error else None
+    email.locked_at = None
+    email.body_text = None
+    email.body_html = None
+
+
+def _claim(db: Session, email_id: int) -> EmailOutbox | None:
+    """queued (and due) -> sending; None when another worker got there first."""
+    now = _utc_now()
+    claimed = (
+        db.query(EmailOutbox)
+        .filter(EmailOutbox.id == email_id, EmailOutbox.status == "queued", EmailOutbox.next_attempt_at <= now)
+        .update(
+            {"status": "sending", "locked_at": now, "attempts": EmailOutbox.attempts + 1},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return db.get(EmailOutbox, email_id) if claimed else None
+
+
+def deliver_email(email_id: int):
+    db: Session = SessionLocal()
+    try:
+        email = _claim(db, email_id)
+        if email is None:
+            return
+
+        if email.expires_at is not None and _as_utc(email.expires_at) <= _utc_now():
+            _finish(email, "failed", "expired before delivery")
+            db.commit()
+            print(f"[Email Outbox] {email.kind} email {email.id} expired before delivery")
+            return
+
+        transport = get_transport()
+        email.transport = transport.name
+        try:
+            email.message_id = transport.send(
+                OutboundEmail(email.to_email, email.subject, email.body_text, email.body_html)
+            )
+        except Exception as e:
+            permanent = isinstance(e, EmailSendError) and e.permanent
+            if permanent or email.attempts >= EMAIL_MAX_ATTEMPTS:
+                _finish(email, "failed", str(e))
+                print(f"[Email Outbox Error] {email.kind} email {email.id} to {email.to_email} failed: {e}")
+            else:
+                email.status = "queued"
+                email.locked_at = None
+                email.last_error = str(e)[:500]
+                email.next_attempt_at = _utc_now() + _retry_delay(email.attempts)
+                print(f"[Email Outbox] {email.kind} email {email.id} attempt {email.attempts} failed, retrying: {e}")
+            db.commit()
+            return
+
+        email.sent_at = _utc_now()
+        _finish(email, "sent")
+        db.commit()
+        print(f"[Email Outbox] {email.kind} email sent to {email.to_email}")
+    except Exception as e:
+        print(f"[Email Outbox Error] {e}")
+        db.rollback()
+    finally:
+        db.close()
+        with _inflight_lock:
+            _inflight.discard(email_id)
+
+
+# =====================================================
+# Scheduler sweep
+# =====================================================
+def process_email_outbox(db: Session) -> int:
+    """Re-queue rows stuck in sending and submit every due queued row; returns rows submitted."""
+    now = _utc_now()
+    db.query(EmailOutbox).filter(
+        EmailOutbox.status == "sending",
+        EmailOutbox.locked_at < now - timedelta(minutes=EMAIL_SENDING_TIMEOUT_MINUTES),
+    ).update({"status": "queued", "locked_at": None, "next_attempt_at": now}, synchronize_session=False)
+    db.commit()
+
+    due = (
+        db.query(EmailOutbox.id)
+        .filter(EmailOutbox.status == "queued", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at.asc())
+        .limit(EMAIL_SWEEP_BATCH)
+        .all()
+    )
+    return sum(1 for (email_id,) in due if submit_email(email_id))
+
@@ -0,0 +1,142 @@
+"""Outbound email transports used by services/email_outbox.py.
+
+EMAIL_TRANSPORT selects one per process:
+
+- ses: Amazon SES through a single boto3 client, created on first use and shared by every
+  sending thread (boto3 clients are thread-safe; building one per email re-resolves
+  credentials and the endpoint and opens a new connection each time).
+- file: writes each message as an .eml file under EMAIL_FILE_DIR. No network; for local
+  development and tests (the file holds exactly what would have been sent).
+"""
+
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMAIL_TRANSPORT = os.getenv("EMAIL_TRANSPORT", "ses").strip().lower()  # ses | file
+EMAIL_FROM = os.getenv("EMAIL_FROM", "no-reply@forekas.com")  # must be verified in SES
+EMAIL_FILE_DIR = os.getenv("EMAIL_FILE_DIR", "./mail")
+SES_MAX_POOL_CONNECTIONS = int(os.getenv("SES_MAX_POOL_CONNECTIONS", "10"))
+SES_TIMEOUT_SECONDS = float(os.getenv("SES_TIMEOUT_SECONDS", "10"))
+
+
+class EmailSendError(Exception):
+    """A failed delivery attempt; permanent errors are not retried."""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+@dataclass
+class OutboundEmail:
+    to_email: str
+    subject: str
+    body_text: str | None = None
+    body_html: str | None = None
+
+
+class SesTransport:
+    name = "ses"
+
+    # SES rejects these for the message itself; retrying cannot help
+    PERMANENT_ERRORS = {
+        "MessageRejected",
+        "MailFromDomainNotVerifiedException",
+        "ConfigurationSetDoesNotExistException",
+        "InvalidParameterValue",
+    }
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+
+                    self._client = boto3.client(
+                        "ses",
+                        region_name=os.getenv("AWS_DEFAULT_REGION"),
+                        config=Config(
+                            max_pool_connections=SES_MAX_POOL_CONNECTIONS,
+                            connect_timeout=SES_TIMEOUT_SECONDS,
+                            read_timeout=SES_TIMEOUT_SECONDS,
+                            # Backoff across attempts is the outbox's job
+                            retries={"max_attempts": 1, "mode": "standard"},
+                        ),
+                    )
+        return self._client
+
+    def send(self, message: OutboundEmail) -> str:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        body = {}
+        if message.body_text is not None:
+            body["Text"] = {"Data": message.body_text}
+        if message.body_html is not None:
+            body["Html"] = {"Data": message.body_html}
+        try:
+            response = self.client.send_email(
+                Source=EMAIL_FROM,
+                Destination={"ToAddresses": [message.to_email]},
+                Message={"Subject": {"Data": message.subject}, "Body": body},
+            )
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            raise EmailSendError(
+                f"{code}: {e.response.get('Error', {}).get('Message', '')}",
+                permanent=code in self.PERMANENT_ERRORS,
+            ) from e
+        except BotoCoreError as e:
+            raise EmailSendError(str(e)) from e
+        return response.get("MessageId", "")
+
+
+class FileTransport:
+    name = "file"
+
+    def __init__(self, directory: str = EMAIL_FILE_DIR):
+        self.directory = directory
+
+    def send(self, message: OutboundEmail) -> str:
+        mail = EmailMessage()
+        mail["From"] = EMAIL_FROM
+        mail["To"] = message.to_email
+        mail["Subject"] = message.subject
+        mail.set_content(message.body_text or "")
+        if message.body_html is not None:
+            mail.add_alternative(message.body_html, subtype="html")
+
+        message_id = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:12]}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{message_id}.eml")
+        with open(path + ".part", "wb") as fh:
+            fh.write(bytes(mail))
+        os.replace(path + ".part", path)
+        return message_id
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """This process's transport (one SES client for every send)."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = FileTransport() if EMAIL_TRANSPORT == "file" else SesTransport()
+    return _transport
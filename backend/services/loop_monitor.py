@@ -0,0 +1,139 @@
+"""Event-loop lag monitor.
+
+Anything that blocks the event loop (sync DB or CPU work inside an async handler) stalls
+every request and websocket on the worker. Two probes run per worker:
+
+- a heartbeat task sleeps LOOP_MONITOR_INTERVAL_MS at a time and records how late it
+  wakes up (the lag); lags of LOOP_LAG_THRESHOLD_MS or more are counted as stalls and logged
+- a watchdog thread notices when the heartbeat is overdue by the threshold while the loop
+  is still blocked and captures the loop thread's stack, so the log names the code
+  that is blocking it
+
+Counters, a lag histogram and the most recent stalls are exported by
+GET /admin/event-loop/stats.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR", "1").strip().lower() not in ("0", "false", "no")
+LOOP_MONITOR_INTERVAL_MS = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100"))
+LOOP_STALL_HISTORY = int(os.getenv("LOOP_STALL_HISTORY", "20"))
+STACK_FRAMES = 12
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open-ended
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class LoopMonitor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._beat = time.monotonic()
+        self._stack: Optional[str] = None  # captured by the watchdog during the current stall
+
+        self.samples = 0
+        self.stalls = 0
+        self.lag_ms_total = 0.0
+        self.lag_ms_max = 0.0
+        self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.recent_stalls = deque(maxlen=LOOP_STALL_HISTORY)
+
+    # =====================================================
+    # Probes
+    # =====================================================
+    async def _heartbeat(self):
+        interval = LOOP_MONITOR_INTERVAL_MS / 1000
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            self._beat = now
+            self.record((now - expected) * 1000)
+
+    def _watch(self):
+        interval = LOOP_MONITOR_INTERVAL_MS / 1000
+        threshold = LOOP_LAG_THRESHOLD_MS / 1000
+        while not self._stop.wait(interval):
+            overdue = time.monotonic() - self._beat - interval
+            if overdue < threshold or self._stack is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame, limit=STACK_FRAMES))
+            with self._lock:
+                self._stack = stack
+            print(f"[Loop Monitor] Event loop blocked for {overdue * 1000:.0f} ms so far, in:\n{stack}")
+
+    def record(self, lag_ms: float):
+        lag_ms = max(lag_ms, 0.0)
+        with self._lock:
+            self.samples += 1
+            self.lag_ms_total += lag_ms
+            self.lag_ms_max = max(self.lag_ms_max, lag_ms)
+            self.buckets[next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))] += 1
+            if lag_ms < LOOP_LAG_THRESHOLD_MS:
+                self._stack = None
+                return
+            self.stalls += 1
+            stack, self._stack = self._stack, None
+            self.recent_stalls.append({
+                "at": time.time(),
+                "lag_ms": round(lag_ms, 1),
+                "stack": stack,
+            })
+        print(f"[Loop Monitor] Event loop stalled for {lag_ms:.0f} ms (threshold {LOOP_LAG_THRESHOLD_MS:.0f} ms)")
+
+    # =====================================================
+    # Lifecycle
+    # =====================================================
+    async def start(self):
+        if not LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._watchdog = None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+            return {
+                "enabled": LOOP_MONITOR_ENABLED,
+                "running": self._task is not None,
+                "interval_ms": LOOP_MONITOR_INTERVAL_MS,
+                "threshold_ms": LOOP_LAG_THRESHOLD_MS,
+                "samples": self.samples,
+                "stalls": self.stalls,
+                "lag_ms_avg": round(self.lag_ms_total / self.samples, 2) if self.samples else 0.0,
+                "lag_ms_max": round(self.lag_ms_max, 1),
+                "histogram": dict(zip(labels, self.buckets)),
+                "recent_stalls": list(self.recent_stalls),
+            }
+
+
+loop_monitor = LoopMonitor()
@@ -0,0 +1,249 @@
+"""Cross-worker fan-out for websocket notifications.
+
+gunicorn runs several Uvicorn workers and each keeps its own websocket connections, so a
+notification raised in one worker must also reach users connected to the others.
+broadcast_notification() delivers to local sockets first and then publishes the message
+on the backplane; every other worker receives it and delivers to its own sockets.
+
+Backends (WS_BACKPLANE):
+
+- postgres: LISTEN/NOTIFY on WS_BACKPLANE_CHANNEL over a dedicated connection, read from
+  the event loop (no extra thread). Chosen automatically when DATABASE_URL is PostgreSQL.
+- local: single-process stand-in; publish is a no-op (local delivery already happened).
+"""
+
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from database import DATABASE_URL, engine
+
+WS_BACKPLANE = os.getenv("WS_BACKPLANE", "auto").strip().lower()  # auto | postgres | local
+WS_BACKPLANE_CHANNEL = os.getenv("WS_BACKPLANE_CHANNEL", "crm_notifications")
+WS_BACKPLANE_RECONNECT_SECONDS = float(os.getenv("WS_BACKPLANE_RECONNECT_SECONDS", "5"))
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+PG_NOTIFY_MAX_BYTES = 7900
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+DeliverFn = Callable[[int, dict], Awaitable[int]]
+
+
+class BackplaneMetrics:
+    """Publish / receive / delivery / send-queue counters and fan-out latency for this worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.published = 0
+        self.publish_errors = 0
+        self.publish_skipped_oversize = 0
+        self.received = 0
+        self.receive_errors = 0
+        self.local_deliveries = 0
+        self.remote_deliveries = 0
+        self.delivery_failures = 0
+        self.no_local_recipient = 0
+        self.send_queue_overflows = 0
+        self.send_dropped = 0
+        self.slow_disconnects = 0
+        self.frames_sent = 0
+        self.batched_frames = 0
+        self.coalesced_messages = 0
+        self.heartbeats_sent = 0
+        self.fanout_count = 0
+        self.fanout_latency_total_ms = 0.0
+        self.fanout_latency_max_ms = 0.0
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def record_fanout(self, latency_ms: float):
+        with self._lock:
+            self.fanout_count += 1
+            self.fanout_latency_total_ms += latency_ms
+            self.fanout_latency_max_ms = max(self.fanout_latency_max_ms, latency_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg = (self.fanout_latency_total_ms / self.fanout_count) if self.fanout_count else 0.0
+            return {
+                "published": self.published,
+                "publish_errors": self.publish_errors,
+                "publish_skipped_oversize": self.publish_skipped_oversize,
+                "received": self.received,
+                "receive_errors": self.receive_errors,
+                "local_deliveries": self.local_deliveries,
+                "remote_deliveries": self.remote_deliveries,
+                "delivery_failures": self.delivery_failures,
+                "no_local_recipient": self.no_local_recipient,
+                "send_queue_overflows": self.send_queue_overflows,
+                "send_dropped": self.send_dropped,
+                "slow_disconnects": self.slow_disconnects,
+                "frames_sent": self.frames_sent,
+                "batched_frames": self.batched_frames,
+                "coalesced_messages": self.coalesced_messages,
+                "heartbeats_sent": self.heartbeats_sent,
+                "fanout_latency_avg_ms": round(avg, 3),
+                "fanout_latency_max_ms": round(self.fanout_latency_max_ms, 3),
+            }
+
+
+backplane_metrics = BackplaneMetrics()
+
+
+def encode_message(target_user_id: int, data: dict) -> str:
+    return json.dumps(
+        {"origin": WORKER_ID, "user_id": target_user_id, "sent_at": time.time(), "data": data},
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+class LocalBackplane:
+    name = "local"
+
+    async def start(self, deliver: DeliverFn):
+        self._deliver = deliver
+
+    async def publish(self, target_user_id: int, data: dict):
+        return None
+
+    async def stop(self):
+        return None
+
+
+class PostgresBackplane:
+    """LISTEN/NOTIFY fan-out; messages published by this worker are ignored on receipt."""
+
+    name = "postgres"
+
+    def __init__(self, channel: str = WS_BACKPLANE_CHANNEL):
+        self.channel = channel
+        self._deliver: Optional[DeliverFn] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._conn = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    # ---------- listening ----------
+    async def start(self, deliver: DeliverFn):
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        try:
+            self._listen()
+        except Exception as e:
+            print(f"[WS Backplane] LISTEN failed ({e}); retrying in {WS_BACKPLANE_RECONNECT_SECONDS}s")
+            self._schedule_reconnect()
+
+    def _listen(self):
+        raw = engine.raw_connection()
+        raw.detach()  # long-lived LISTEN connection must not go back to the pool
+        conn = raw.dbapi_connection
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        print(f"[WS Backplane] Listening on '{self.channel}' as {WORKER_ID}")
+
+    def _on_readable(self):
+        conn = self._conn
+        try:
+            conn.poll()
+        except Exception as e:
+            print(f"[WS Backplane] Listener connection lost: {e}")
+            self._close_listener()
+            self._schedule_reconnect()
+            return
+
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            self._loop.create_task(self._handle(notify.payload))
+
+    async def _handle(self, payload: str):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            backplane_metrics.incr("receive_errors")
+            return
+        if message.get("origin") == WORKER_ID:
+            return  # already delivered locally before publishing
+
+        backplane_metrics.incr("received")
+        delivered = await self._deliver(int(message["user_id"]), message["data"])
+        if delivered:
+            backplane_metrics.incr("remote_deliveries", delivered)
+            backplane_metrics.record_fanout((time.time() - float(message.get("sent_at", time.time()))) * 1000)
+
+    def _close_listener(self):
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except Exception:
+            pass
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def _schedule_reconnect(self):
+        if self._stopped or (self._reconnect_task and not self._reconnect_task.done()):
+            return
+        self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._stopped and self._conn is None:
+            await asyncio.sleep(WS_BACKPLANE_RECONNECT_SECONDS)
+            try:
+                self._listen()
+            except Exception as e:
+                print(f"[WS Backplane] Reconnect failed: {e}")
+
+    async def stop(self):
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        self._close_listener()
+
+    # ---------- publishing ----------
+    def _notify(self, payload: str):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+            conn.commit()
+
+    async def publish(self, target_user_id: int, data: dict):
+        payload = encode_message(target_user_id, data)
+        if len(payload.encode("utf-8")) >= PG_NOTIFY_MAX_BYTES:
+            backplane_metrics.incr("publish_skipped_oversize")
+            print(f"[WS Backplane] Notification for user {target_user_id} too large to fan out; delivered locally only")
+            return
+        try:
+            await asyncio.to_thread(self._notify, payload)
+            backplane_metrics.incr("published")
+        except Exception as e:
+            backplane_metrics.incr("publish_errors")
+            print(f"[WS Backplane] Publish failed: {e}")
+
+
+def _create_backplane():
+    choice = WS_BACKPLANE
+    if choice == "auto":
+        choice = "postgres" if (DATABASE_URL or "").startswith("postgres") else "local"
+    if choice == "postgres":
+        return PostgresBackplane()
+    return LocalBackplane()
+
+
+backplane = _create_backplane()
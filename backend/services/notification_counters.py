@@ -0,0 +1,309 @@
+"""Unread notification counters (notification_counters) for the notification badge.
+
+Notifications are the audit_logs rows owned by a user. Instead of counting them on every
+page load, each user has a counter row that is kept in step with audit_logs:
+
+- ORM inserts / deletes of unread logs are applied in the same flush (session hook below)
+- mark_read() / mark_all_read() flip is_read and decrement the counter in one transaction
+- Core bulk inserts / purges call record_new_notifications() / release_purged_unread() in
+  the same transaction
+
+A user without a counter row (e.g. restored from a backup) gets one seeded from audit_logs
+the first time a notification of theirs is read or written, never just the delta.
+
+rebuild_notification_counters() recomputes the table from audit_logs (e.g. after rows were
+written or purged with raw SQL) and can be run from the backend folder:
+
+    python -m services.notification_counters [--user-id ID]
+"""
+
+from collections import defaultdict
+from typing import Dict, Optional, Set
+
+from sqlalchemy import case, event, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.auditlog import Auditlog
+from models.notification import NotificationCounter
+
+counters = NotificationCounter.__table__
+
+# Rows per multi-row upsert (3 bind parameters each)
+UPSERT_BATCH_ROWS = 1000
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(counters)
+    if dialect_name == "sqlite":
+        return sqlite.insert(counters)
+    return None
+
+
+def _apply_increments(connection, stmt, deltas: Dict[int, int], last_ids: Dict[int, int], user_ids):
+    """One multi-row upsert for users whose count only grows (the inserted value is the delta)."""
+    stmt = stmt.values([
+        {"user_id": user_id, "unread_count": deltas.get(user_id, 0), "last_log_id": last_ids.get(user_id, 0)}
+        for user_id in user_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[counters.c.user_id],
+        set_={
+            "unread_count": counters.c.unread_count + stmt.excluded.unread_count,
+            "last_log_id": case(
+                (counters.c.last_log_id < stmt.excluded.last_log_id, stmt.excluded.last_log_id),
+                else_=counters.c.last_log_id,
+            ),
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def _seed_counters(connection, user_ids) -> Set[int]:
+    """Create missing counter rows from audit_logs with absolute values; returns the users it created.
+
+    Counts see the caller's transaction, so writes already made in it are included. Unlike
+    _apply_deltas this never adds to an existing row: when a concurrent transaction created
+    the row in the meantime, that row wins (ON CONFLICT DO NOTHING) and is left out of the result.
+    """
+    created: Set[int] = set()
+    user_ids = sorted(user_ids)
+    for start in range(0, len(user_ids), UPSERT_BATCH_ROWS):
+        batch = user_ids[start:start + UPSERT_BATCH_ROWS]
+        totals = {
+            user_id: (unread, last_id)
+            for user_id, unread, last_id in connection.execute(
+                select(
+                    Auditlog.user_id,
+                    func.count(Auditlog.id).filter(Auditlog.is_read == False),
+                    func.max(Auditlog.id),
+                )
+                .where(Auditlog.user_id.in_(batch))
+                .group_by(Auditlog.user_id)
+            )
+        }
+        rows = [
+            {"user_id": user_id, "unread_count": int(totals.get(user_id, (0, 0))[0] or 0),
+             "last_log_id": int(totals.get(user_id, (0, 0))[1] or 0)}
+            for user_id in batch
+        ]
+
+        stmt = _upsert(connection.dialect.name)
+        if stmt is not None:
+            stmt = stmt.values(rows).on_conflict_do_nothing(index_elements=[counters.c.user_id])
+            created.update(connection.execute(stmt.returning(counters.c.user_id)).scalars())
+            continue
+
+        for row in rows:
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(counters).values(**row))
+                created.add(row["user_id"])
+            except IntegrityError:
+                pass
+    return created
+
+
+def _apply_deltas(connection, deltas: Dict[int, int], last_ids: Dict[int, int], applied: bool = True):
+    """Add deltas[user_id] to the unread counts and advance last_log_id.
+
+    Users without a counter row get one seeded from audit_logs (_seed_counters). `applied`
+    says whether audit_logs already reflect the change (after an insert / update); then the
+    seeded count includes it and the delta is not added again.
+    """
+    user_ids = set(deltas) | set(last_ids)
+
+    existing = set(connection.execute(
+        select(counters.c.user_id).where(counters.c.user_id.in_(user_ids))
+    ).scalars()) if user_ids else set()
+    missing = user_ids - existing
+    if missing:
+        seeded = _seed_counters(connection, missing)
+        if applied:
+            user_ids -= seeded
+
+    increments = sorted(user_id for user_id in user_ids if deltas.get(user_id, 0) >= 0)
+    if len(increments) > 1 and _upsert(connection.dialect.name) is not None:
+        for start in range(0, len(increments), UPSERT_BATCH_ROWS):
+            batch = increments[start:start + UPSERT_BATCH_ROWS]
+            _apply_increments(connection, _upsert(connection.dialect.name), deltas, last_ids, batch)
+        user_ids -= set(increments)
+
+    for user_id in sorted(user_ids):
+        delta = deltas.get(user_id, 0)
+        last_id = last_ids.get(user_id, 0)
+
+        stmt = _upsert(connection.dialect.name)
+        if stmt is not None:
+            stmt = stmt.values(user_id=user_id, unread_count=max(delta, 0), last_log_id=last_id)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[counters.c.user_id],
+                set_={
+                    "unread_count": case(
+                        (counters.c.unread_count + delta < 0, 0),
+                        else_=counters.c.unread_count + delta,
+                    ),
+                    "last_log_id": case(
+                        (counters.c.last_log_id < last_id, last_id),
+                        else_=counters.c.last_log_id,
+                    ),
+                    "updated_at": func.now(),
+                },
+            )
+            connection.execute(stmt)
+            continue
+
+        result = connection.execute(
+            update(counters)
+            .where(counters.c.user_id == user_id)
+            .values(
+                unread_count=case(
+                    (counters.c.unread_count + delta < 0, 0),
+                    else_=counters.c.unread_count + delta,
+                ),
+                last_log_id=case((counters.c.last_log_id < last_id, last_id), else_=counters.c.last_log_id),
+            )
+        )
+        if not result.rowcount:
+            connection.execute(
+                insert(counters).values(user_id=user_id, unread_count=max(delta, 0), last_log_id=last_id)
+            )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_notification_writes(session, flush_context):
+    deltas: Dict[int, int] = defaultdict(int)
+    last_ids: Dict[int, int] = {}
+
+    for obj in session.new:
+        if isinstance(obj, Auditlog) and obj.user_id:
+            if not obj.is_read:
+                deltas[obj.user_id] += 1
+            last_ids[obj.user_id] = max(last_ids.get(obj.user_id, 0), obj.id or 0)
+
+    for obj in session.deleted:
+        if isinstance(obj, Auditlog) and obj.user_id and not obj.is_read:
+            deltas[obj.user_id] -= 1
+
+    if deltas or last_ids:
+        _apply_deltas(session.connection(), dict(deltas), last_ids)
+
+
+# =====================================================
+# Reads / mark-read
+# =====================================================
+def get_unread_summary(db: Session, user_id: int) -> dict:
+    """Unread count and newest notification id; the counter row is created on first use."""
+    row = db.get(NotificationCounter, user_id)
+    if row is None:
+        _seed_counters(db.connection(), [user_id])
+        db.commit()
+        row = db.get(NotificationCounter, user_id, populate_existing=True)
+
+    return {"unread_count": row.unread_count, "last_id": row.last_log_id}
+
+
+def mark_read(db: Session, user_id: int, log_id: int) -> Optional[bool]:
+    """Mark one notification read. Returns None if it is not the user's, else whether it changed."""
+    result = db.execute(
+        update(Auditlog)
+        .where(Auditlog.id == log_id, Auditlog.user_id == user_id, Auditlog.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        _apply_deltas(db.connection(), {user_id: -result.rowcount}, {})
+        db.commit()
+        return True
+
+    exists = db.query(Auditlog.id).filter(Auditlog.id == log_id, Auditlog.user_id == user_id).first()
+    return False if exists else None
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    """Mark every unread notification of the user read; returns how many changed."""
+    result = db.execute(
+        update(Auditlog)
+        .where(Auditlog.user_id == user_id, Auditlog.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    changed = result.rowcount or 0
+    if changed:
+        _apply_deltas(db.connection(), {user_id: -changed}, {})
+    db.commit()
+    return changed
+
+
+def record_new_notifications(connection, logs) -> None:
+    """Count unread audit logs written with a Core bulk INSERT (no flush hook); logs are (id, user_id)."""
+    deltas: Dict[int, int] = defaultdict(int)
+    last_ids: Dict[int, int] = {}
+    for log_id, user_id in logs:
+        if user_id:
+            deltas[user_id] += 1
+            last_ids[user_id] = max(last_ids.get(user_id, 0), log_id)
+    if deltas:
+        _apply_deltas(connection, dict(deltas), last_ids)
+
+
+def release_purged_unread(db: Session, condition) -> None:
+    """Before a bulk DELETE of the audit_logs matching `condition`: take their unread ones off the counters."""
+    unread = db.execute(
+        select(Auditlog.user_id, func.count(Auditlog.id))
+        .where(condition, Auditlog.user_id.isnot(None), Auditlog.is_read == False)
+        .group_by(Auditlog.user_id)
+    ).all()
+    if unread:
+        _apply_deltas(db.connection(), {user_id: -count for user_id, count in unread}, {}, applied=False)
+
+
+def backfill_notification_counters(connection, user_ids) -> int:
+    """Create counter rows from audit_logs for users that have none (e.g. just restored); returns how many."""
+    return len(_seed_counters(connection, user_ids)) if user_ids else 0
+
+
+def rebuild_notification_counters(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute counters from audit_logs (all users, or one). Commits and returns row count."""
+    delete_query = db.query(NotificationCounter)
+    if user_id is not None:
+        delete_query = delete_query.filter(NotificationCounter.user_id == user_id)
+    delete_query.delete(synchronize_session=False)
+
+    source = (
+        select(
+            Auditlog.user_id,
+            func.count(Auditlog.id).filter(Auditlog.is_read == False),
+            func.max(Auditlog.id),
+        )
+        .where(Auditlog.user_id.isnot(None))
+        .group_by(Auditlog.user_id)
+    )
+    if user_id is not None:
+        source = source.where(Auditlog.user_id == user_id)
+
+    result = db.execute(
+        insert(NotificationCounter).from_select(["user_id", "unread_count", "last_log_id"], source)
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild notification_counters from audit_logs")
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_notification_counters(db, args.user_id)
+        print(f"[Notification Counters] Rebuilt {rows} counter row(s)")
+    finally:
+        db.close()
@@ -0,0 +1,176 @@
+"""Password hashing on a bounded pool, off the event loop.
+
+An Argon2 hash or verify is deliberately expensive (with the passlib defaults kept here,
+m=64 MiB / t=3 / p=4, roughly 200 ms of CPU). Every hash / verify runs on a dedicated
+pool of PASSWORD_HASH_WORKERS threads (default: one per core). argon2-cffi and bcrypt
+release the GIL while hashing, so the threads use separate cores, and bounding them keeps
+a burst of logins from oversubscribing the CPU or holding every slot of Starlette's
+request threadpool; excess requests wait in the pool's queue (see hash_metrics).
+
+hash_password / verify_and_update block the calling thread; the handlers that use them
+are sync and already run in the request threadpool.
+
+verify_and_update() returns (ok, new_hash). new_hash is set when a correct password is
+stored in an outdated form -- a legacy bcrypt hash, or Argon2 with other cost parameters
+than ARGON2_TIME_COST / ARGON2_MEMORY_COST_KIB / ARGON2_PARALLELISM -- and the caller
+saves it, so hashes migrate on successful login.
+
+Legacy bcrypt hashes are checked with the bcrypt package directly: passlib 1.7.4's
+bcrypt backend does not load with bcrypt >= 4.1 (it probes with a >72-byte secret, which
+bcrypt 5 rejects). Like bcrypt always did, only the first 72 bytes count.
+
+Cost settings can be compared with benchmarks/password_hashing.py.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+from passlib.context import CryptContext
+from passlib.exc import UnknownHashError
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+BCRYPT_MAX_BYTES = 72
+
+
+def make_context(time_cost: int = ARGON2_TIME_COST, memory_cost: int = ARGON2_MEMORY_COST_KIB,
+                 parallelism: int = ARGON2_PARALLELISM) -> CryptContext:
+    return CryptContext(
+        schemes=["argon2"],
+        argon2__type="ID",
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+pwd_context = make_context()
+
+
+class HashMetrics:
+    """Queue depth, wait time and hashing time of this worker's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        self.run_ms_total = 0.0
+        self.run_ms_max = 0.0
+        self.bcrypt_verifications = 0
+        self.rehashes = 0
+
+    def queued(self):
+        with self._lock:
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.submitted - self.completed - self.running)
+
+    def started(self, wait_ms: float):
+        with self._lock:
+            self.running += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+
+    def finished(self, run_ms: float):
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+            self.run_ms_total += run_ms
+            self.run_ms_max = max(self.run_ms_max, run_ms)
+
+    def incr(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": PASSWORD_HASH_WORKERS,
+                "argon2": {
+                    "time_cost": ARGON2_TIME_COST,
+                    "memory_cost_kib": ARGON2_MEMORY_COST_KIB,
+                    "parallelism": ARGON2_PARALLELISM,
+                },
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "running": self.running,
+                "queue_depth": self.submitted - self.completed - self.running,
+                "max_queue_depth": self.max_queue_depth,
+                "wait_ms_avg": round(self.wait_ms_total / done, 2),
+                "wait_ms_max": round(self.wait_ms_max, 2),
+                "run_ms_avg": round(self.run_ms_total / done, 2),
+                "run_ms_max": round(self.run_ms_max, 2),
+                "bcrypt_verifications": self.bcrypt_verifications,
+                "rehashes": self.rehashes,
+            }
+
+
+hash_metrics = HashMetrics()
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _timed(fn, queued_at: float, *args):
+    started = time.perf_counter()
+    hash_metrics.started((started - queued_at) * 1000)
+    try:
+        return fn(*args)
+    finally:
+        hash_metrics.finished((time.perf_counter() - started) * 1000)
+
+
+def _submit(fn, *args):
+    hash_metrics.queued()
+    return _executor.submit(_timed, fn, time.perf_counter(), *args)
+
+
+# =====================================================
+# Hashing (runs on the pool)
+# =====================================================
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    if not password or not hashed:
+        return False, None
+
+    if hashed.startswith(BCRYPT_PREFIXES):
+        hash_metrics.incr("bcrypt_verifications")
+        try:
+            ok = bcrypt.checkpw(password.encode("utf-8")[:BCRYPT_MAX_BYTES], hashed.encode("utf-8"))
+        except ValueError:
+            return False, None
+        return ok, (pwd_context.hash(password) if ok else None)
+
+    try:
+        ok = pwd_context.verify(password, hashed)
+    except (UnknownHashError, ValueError, TypeError):
+        return False, None
+    return ok, (pwd_context.hash(password) if ok and pwd_context.needs_update(hashed) else None)
+
+
+# =====================================================
+# Public API
+# =====================================================
+def hash_password(password: str) -> str:
+    return _submit(_hash, password).result()
+
+
+def verify_and_update(password: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    ok, new_hash = _submit(_verify_and_update, password, hashed).result()
+    if new_hash:
+        hash_metrics.incr("rehashes")
+    return ok, new_hash
@@ -2,11 +2,12 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from models.auth import User
-from services.subscription_lifecycle import apply_trial_lifecycle
+from services.subscription_lifecycle import get_plan_status
 
 
 def get_current_plan(db: Session, current_user: User) -> str:
-    status = apply_trial_lifecycle(db, current_user.related_to_company)
+    # get_current_user already attached the status for this request
+    status = getattr(current_user, "subscription_status", None) or get_plan_status(db, current_user.related_to_company)
     return (status.get("current_plan") or "Free").strip().lower()
 
 
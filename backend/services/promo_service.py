@@ -13,6 +13,7 @@ from services.subscription_lifecycle import (
     apply_discount_lifecycle_for_subscription,
     apply_trial_lifecycle,
     get_latest_subscription,
+    invalidate_plan_status_after_commit,
     to_utc,
     utc_now,
 )
@@ -372,6 +373,7 @@ def redeem_promo_code(
     promo.total_redemptions = int(promo.total_redemptions or 0) + 1
 
     subscription_status = apply_trial_lifecycle(db, resolved_company_id, commit=False) if resolved_company_id else None
+    invalidate_plan_status_after_commit(db, resolved_company_id)
 
     return {
         "promo_id": promo.id,
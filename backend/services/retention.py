@@ -0,0 +1,123 @@
+"""Chunked, time-budgeted retention deletes.
+
+A single DELETE ... WHERE timestamp < cutoff on a large table holds its row locks and
+writes all of its WAL in one transaction. delete_in_batches() instead deletes the
+expired rows in primary-key windows of RETENTION_BATCH_SIZE matching rows
+(id BETWEEN start AND end AND <condition>, both ends taken from the matching ids, so
+sparse matches do not cost empty windows), committing each window on its own and
+pausing briefly between them so interactive writes get through.
+It stops once RETENTION_TIME_BUDGET_SECONDS is used up; whatever is left is picked up
+by the next run (deleted rows are gone, so every run resumes where the last stopped).
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.orm import Session
+
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "5000"))
+RETENTION_TIME_BUDGET_SECONDS = float(os.getenv("RETENTION_TIME_BUDGET_SECONDS", "60"))
+RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_MS", "50")) / 1000
+
+
+@dataclass
+class RetentionResult:
+    table: str
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    checkpoint_id: Optional[int] = None  # every expired row up to here is gone
+    finished: bool = False  # False: stopped on the time budget with rows left
+
+
+class RetentionMetrics:
+    """Rows deleted / batches / budget stops per table for this worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tables = {}
+
+    def record(self, result: RetentionResult):
+        with self._lock:
+            entry = self.tables.setdefault(
+                result.table,
+                {"rows_deleted": 0, "batches": 0, "runs": 0, "budget_exhausted": 0, "last_run": None},
+            )
+            entry["rows_deleted"] += result.deleted
+            entry["batches"] += result.batches
+            entry["runs"] += 1
+            entry["budget_exhausted"] += 0 if result.finished else 1
+            entry["last_run"] = {
+                "deleted": result.deleted,
+                "batches": result.batches,
+                "seconds": round(result.seconds, 3),
+                "finished": result.finished,
+            }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {table: dict(entry) for table, entry in self.tables.items()}
+
+
+retention_metrics = RetentionMetrics()
+
+
+def delete_in_batches(
+    db: Session,
+    model,
+    condition,
+    *,
+    before_delete: Callable[[Session, object], None] | None = None,
+    progress: Callable[[RetentionResult], None] | None = None,
+    batch_size: int | None = None,
+    time_budget: float | None = None,
+) -> RetentionResult:
+    """
+    Delete the rows of `model` matching `condition` one primary-key window at a time.
+
+    before_delete(db, window_condition) runs inside each window's transaction (e.g. to
+    adjust derived counters); progress(result) is called after every committed window.
+    """
+    batch_size = batch_size or RETENTION_BATCH_SIZE
+    time_budget = RETENTION_TIME_BUDGET_SECONDS if time_budget is None else time_budget
+    pk = model.__mapper__.primary_key[0]
+    result = RetentionResult(table=model.__tablename__)
+    started = time.monotonic()
+
+    last = None
+    while True:
+        after = condition if last is None else and_(condition, pk > last)
+        start = db.execute(select(func.min(pk)).where(after)).scalar()
+        if start is None:
+            result.finished = True
+            break
+        end = db.execute(
+            select(pk).where(condition, pk >= start).order_by(pk).offset(batch_size - 1).limit(1)
+        ).scalar()
+        if end is None:
+            end = db.execute(select(func.max(pk)).where(condition, pk >= start)).scalar()
+
+        window = and_(pk >= start, pk <= end, condition)
+        if before_delete is not None:
+            before_delete(db, window)
+        deleted = db.execute(delete(model).where(window).execution_options(synchronize_session=False)).rowcount
+        db.commit()
+
+        result.deleted += deleted or 0
+        result.batches += 1
+        result.checkpoint_id = last = end
+        if progress is not None:
+            progress(result)
+
+        if time.monotonic() - started >= time_budget:
+            break
+        if RETENTION_BATCH_PAUSE_SECONDS:
+            time.sleep(RETENTION_BATCH_PAUSE_SECONDS)
+
+    result.seconds = time.monotonic() - started
+    retention_metrics.record(result)
+    return result
@@ -0,0 +1,192 @@
+"""Daily CLOSED_WON revenue rollup (user_daily_revenue) used by target analytics.
+
+Routers that create, update or delete deals collect the affected (user_id, day) keys
+with deal_revenue_keys() before and after the change and call refresh_user_daily_revenue()
+inside the same transaction. rebuild_user_daily_revenue() recomputes the table from deals
+and can be run from the backend folder:
+
+    python -m services.revenue_rollup [--company-id ID]
+"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models.auth import User
+from models.deal import Deal, DealStage
+from models.revenue import UserDailyRevenue
+
+RevenueKey = Tuple[int, date]
+
+rollup = UserDailyRevenue.__table__
+
+
+def _as_day(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def deal_revenue_keys(deal: Optional[Deal]) -> Set[RevenueKey]:
+    """Return the rollup key a deal currently contributes to (empty if it contributes nothing)."""
+    if deal is None:
+        return set()
+
+    stage = (deal.stage or "").upper()
+    day = _as_day(deal.close_date)
+    if stage != DealStage.CLOSED_WON.value or not deal.assigned_to or day is None:
+        return set()
+
+    return {(deal.assigned_to, day)}
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        return postgresql.insert(rollup)
+    if dialect_name == "sqlite":
+        return sqlite.insert(rollup)
+    return None
+
+
+def _key_totals(db: Session, keys: Set[RevenueKey]) -> Dict[RevenueKey, Tuple[Decimal, int]]:
+    """CLOSED_WON amount and deal count for every key, in one grouped query."""
+    day = func.date(Deal.close_date)
+    windows = []
+    for user_id, key_day in keys:
+        day_start = datetime.combine(key_day, time.min)
+        windows.append(and_(
+            Deal.assigned_to == user_id,
+            Deal.close_date >= day_start,
+            Deal.close_date < day_start + timedelta(days=1),
+        ))
+
+    rows = db.execute(
+        select(Deal.assigned_to, day, func.coalesce(func.sum(Deal.amount), 0), func.count(Deal.id))
+        .where(Deal.stage == DealStage.CLOSED_WON.value, or_(*windows))
+        .group_by(Deal.assigned_to, day)
+    ).all()
+    return {(user_id, _as_day(row_day)): (Decimal(str(total or 0)), int(count)) for user_id, row_day, total, count in rows}
+
+
+def refresh_user_daily_revenue(db: Session, keys: Iterable[RevenueKey]) -> None:
+    """Recompute the rollup rows for the given (user_id, day) keys from deals.
+
+    Pending deal changes are flushed first; the caller owns the commit so the rollup
+    lands in the same transaction as the deal change. Rows are written with a single
+    INSERT ... ON CONFLICT (user_id, day) DO UPDATE, so concurrent deal writes for the
+    same owner and day do not race on the unique constraint.
+    """
+    keys = {(user_id, day) for user_id, day in (keys or []) if user_id and day}
+    if not keys:
+        return
+
+    db.flush()
+
+    totals = _key_totals(db, keys)
+    rows = [
+        {"user_id": user_id, "day": day, "closed_won_amount": totals[(user_id, day)][0],
+         "deal_count": totals[(user_id, day)][1]}
+        for user_id, day in sorted(keys) if totals.get((user_id, day), (0, 0))[1]
+    ]
+    emptied = sorted(key for key in keys if not totals.get(key, (0, 0))[1])
+
+    if emptied:
+        db.execute(delete(rollup).where(or_(*[
+            and_(rollup.c.user_id == user_id, rollup.c.day == day) for user_id, day in emptied
+        ])))
+
+    if not rows:
+        return
+
+    stmt = _upsert(db.get_bind().dialect.name)
+    if stmt is not None:
+        stmt = stmt.values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[rollup.c.user_id, rollup.c.day],
+            set_={
+                "closed_won_amount": stmt.excluded.closed_won_amount,
+                "deal_count": stmt.excluded.deal_count,
+                "updated_at": func.now(),
+            },
+        ))
+        return
+
+    for row in rows:
+        result = db.execute(
+            update(rollup)
+            .where(rollup.c.user_id == row["user_id"], rollup.c.day == row["day"])
+            .values(closed_won_amount=row["closed_won_amount"], deal_count=row["deal_count"])
+        )
+        if not result.rowcount:
+            db.execute(insert(rollup).values(**row))
+
+
+def rebuild_user_daily_revenue(db: Session, company_id: Optional[int] = None) -> int:
+    """Rebuild the rollup from deals (all companies, or a single company). Commits and returns row count."""
+    user_ids = select(User.id)
+    if company_id is not None:
+        user_ids = user_ids.where(User.related_to_company == company_id)
+
+    delete_query = db.query(UserDailyRevenue)
+    if company_id is not None:
+        delete_query = delete_query.filter(UserDailyRevenue.user_id.in_(user_ids))
+    delete_query.delete(synchronize_session=False)
+
+    day = func.date(Deal.close_date)
+    source = (
+        select(
+            Deal.assigned_to,
+            day,
+            func.coalesce(func.sum(Deal.amount), 0),
+            func.count(Deal.id),
+        )
+        .where(
+            Deal.assigned_to.isnot(None),
+            Deal.stage == DealStage.CLOSED_WON.value,
+            Deal.close_date.isnot(None),
+        )
+        .group_by(Deal.assigned_to, day)
+    )
+    if company_id is not None:
+        source = source.where(Deal.assigned_to.in_(user_ids))
+
+    result = db.execute(
+        insert(UserDailyRevenue).from_select(
+            ["user_id", "day", "closed_won_amount", "deal_count"],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount or 0
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Rebuild the user_daily_revenue rollup from deals.")
+    parser.add_argument("--company-id", type=int, default=None, help="Only rebuild rows for this company")
+    args = parser.parse_args()
+
+    session: Session = SessionLocal()
+    try:
+        rebuilt = rebuild_user_daily_revenue(session, company_id=args.company_id)
+        print(f"[Revenue Rollup] Rebuilt {rebuilt} user_daily_revenue rows.")
+    except Exception as e:
+        print(f"[Revenue Rollup Error] {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
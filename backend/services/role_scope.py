@@ -0,0 +1,207 @@
+"""Role-based record visibility shared by the list / lookup endpoints.
+
+A user's visible owner ids are resolved once (per user, company and role) and cached:
+
+- CEO / Admin: every user in the company
+- Group Manager: every company user except CEO / Admin accounts
+- Manager: users in territories they manage, plus themselves
+- Sales / Marketing / others: themselves
+
+apply_role_scope() turns that set into a single `owner IN (...)` predicate on the model
+(plus `created_by = me` for managers and below), so list queries no longer join `users`
+or run the territory subquery. Company-wide roles filter on the model's `company_id`
+column instead when it has one.
+
+The cache is dropped whenever a User or Territory row is written and committed in this
+process; ROLE_SCOPE_CACHE_TTL_SECONDS bounds staleness for writes made by other workers.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Type
+
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Query, Session
+
+from models.auth import User
+from models.territory import Territory
+
+ROLE_SCOPE_CACHE_TTL_SECONDS = float(os.getenv("ROLE_SCOPE_CACHE_TTL_SECONDS", "60"))
+
+COMPANY_WIDE_ROLES = {"CEO", "ADMIN"}
+GROUP_MANAGER_ROLES = {"GROUP MANAGER", "GROUP_MANAGER"}
+MANAGER_ROLES = {"MANAGER"}
+
+_ScopeKey = Tuple[int, Optional[int], str]
+_role_scope_cache: Dict[_ScopeKey, Tuple[float, "RoleScope"]] = {}
+_role_scope_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RoleScope:
+    user_id: int
+    company_id: Optional[int]
+    role: str
+    owner_ids: FrozenSet[int]
+
+    @property
+    def company_wide(self) -> bool:
+        return self.role in COMPANY_WIDE_ROLES or self.role in GROUP_MANAGER_ROLES
+
+    @property
+    def includes_own_created(self) -> bool:
+        """Managers and below also see records they created but assigned elsewhere."""
+        return not self.company_wide
+
+
+def _normalize_role(role: Optional[str]) -> str:
+    return (role or "").strip().upper()
+
+
+def _resolve_owner_ids(db: Session, user_id: int, company_id: Optional[int], role: str) -> FrozenSet[int]:
+    if company_id is None:
+        return frozenset({user_id})
+
+    if role in COMPANY_WIDE_ROLES or role in GROUP_MANAGER_ROLES:
+        rows = db.query(User.id, User.role).filter(User.related_to_company == company_id).all()
+        if role in GROUP_MANAGER_ROLES:
+            rows = [row for row in rows if _normalize_role(row.role) not in COMPANY_WIDE_ROLES]
+        return frozenset(row.id for row in rows)
+
+    if role in MANAGER_ROLES:
+        rows = (
+            db.query(Territory.user_id)
+            .join(User, Territory.user_id == User.id)
+            .filter(Territory.manager_id == user_id)
+            .filter(User.related_to_company == company_id)
+            .distinct()
+            .all()
+        )
+        return frozenset({user_id, *(row.user_id for row in rows if row.user_id)})
+
+    return frozenset({user_id})
+
+
+def invalidate_role_scope() -> None:
+    """Drop every cached scope (territory / user membership changed)."""
+    with _role_scope_lock:
+        _role_scope_cache.clear()
+
+
+def get_role_scope(db: Session, current_user: User) -> RoleScope:
+    """Return the (cached) visibility scope for the current user."""
+    role = _normalize_role(current_user.role)
+    company_id = getattr(current_user, "related_to_company", None)
+    key: _ScopeKey = (current_user.id, company_id, role)
+
+    if ROLE_SCOPE_CACHE_TTL_SECONDS > 0:
+        now = time.monotonic()
+        with _role_scope_lock:
+            cached = _role_scope_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    scope = RoleScope(
+        user_id=current_user.id,
+        company_id=company_id,
+        role=role,
+        owner_ids=_resolve_owner_ids(db, current_user.id, company_id, role),
+    )
+
+    if ROLE_SCOPE_CACHE_TTL_SECONDS > 0:
+        with _role_scope_lock:
+            _role_scope_cache[key] = (time.monotonic() + ROLE_SCOPE_CACHE_TTL_SECONDS, scope)
+
+    return scope
+
+
+def role_scope_predicate(
+    model: Type[Any],
+    scope: RoleScope,
+    owner_attr: str = "assigned_to",
+    creator_attr: Optional[str] = "created_by",
+    match_creator_in_scope: bool = False,
+):
+    """Build the visibility predicate for `model` under `scope`.
+
+    owner_attr is the column holding the record owner (assigned_to, lead_owner, user_id...).
+    match_creator_in_scope also admits records *created* by anyone in the scope, for
+    endpoints that historically matched either column.
+    """
+    if scope.role in COMPANY_WIDE_ROLES and scope.company_id is not None and hasattr(model, "company_id"):
+        # Whole tenant: direct lookup on the denormalized company_id column.
+        return model.company_id == scope.company_id
+
+    owner_col = getattr(model, owner_attr)
+    creator_col = getattr(model, creator_attr) if creator_attr else None
+    owner_ids = sorted(scope.owner_ids)
+
+    clauses = [owner_col.in_(owner_ids)]
+    if creator_col is not None:
+        if match_creator_in_scope:
+            clauses.append(creator_col.in_(owner_ids))
+        elif scope.includes_own_created:
+            clauses.append(creator_col == scope.user_id)
+
+    return or_(*clauses) if len(clauses) > 1 else clauses[0]
+
+
+def apply_role_scope(query: Query, model: Type[Any], scope: RoleScope, **kwargs) -> Query:
+    return query.filter(role_scope_predicate(model, scope, **kwargs))
+
+
+def scoped_query(db: Session, current_user: User, model: Type[Any], **kwargs) -> Query:
+    """db.query(model) restricted to what current_user may see."""
+    return apply_role_scope(db.query(model), model, get_role_scope(db, current_user), **kwargs)
+
+
+# =====================================================
+# Cache invalidation on User / Territory writes
+# =====================================================
+_SCOPE_MODELS = (User, Territory)
+_USER_SCOPE_FIELDS = ("role", "related_to_company")
+_PENDING_KEY = "role_scope_dirty"
+
+
+def _affects_scope(obj) -> bool:
+    if isinstance(obj, Territory):
+        return True
+    if isinstance(obj, User):
+        # Profile edits, logins etc. do not change who sees what.
+        attrs = inspect(obj).attrs
+        return any(attrs[name].history.has_changes() for name in _USER_SCOPE_FIELDS)
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_scope_dirty_after_flush(session, flush_context):
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, _SCOPE_MODELS):
+            session.info[_PENDING_KEY] = True
+            return
+    for obj in session.dirty:
+        if _affects_scope(obj):
+            session.info[_PENDING_KEY] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_scope_dirty_on_bulk(orm_execute_state):
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in _SCOPE_MODELS:
+        orm_execute_state.session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_scope_after_commit(session):
+    if session.info.pop(_PENDING_KEY, False):
+        invalidate_role_scope()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_scope_mark_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
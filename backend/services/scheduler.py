@@ -1,134 +1,261 @@
 # backend/services/scheduler.py
 
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import os
+import time
+import traceback
 import pytz
 
 from database import SessionLocal
 from models.lead import Lead, LeadStatus
 from models.auditlog import Auditlog
+from models.job_run import JobRun
+from models.email_outbox import EmailOutbox
+from services.backup_jobs import expire_backup_artifacts, process_scheduled_backups, recover_backup_jobs
 from services.backup_reminder import process_backup_reminders
+from services.email_outbox import EMAIL_OUTBOX_RETENTION_DAYS, process_email_outbox
+from services.notification_backplane import WORKER_ID
+from services.notification_counters import release_purged_unread
+from services.retention import RetentionResult, delete_in_batches
+from services.scheduler_leader import SCHEDULER_LEADER_CHECK_SECONDS, leader
 from services.subscription_lifecycle import process_subscription_discount_lifecycle, process_trial_notifications
+from services.ttl_store import ttl_store
 
+JOB_RUNS_RETENTION_DAYS = int(os.getenv("JOB_RUNS_RETENTION_DAYS", "30"))
 
-def delete_old_converted_leads():
+_scheduler: BackgroundScheduler | None = None
+
+
+def _checkpoint(db: Session, result: RetentionResult):
+    """Record retention progress on the current job run, so a long run is visible while it works."""
+    run_id = db.info.get("job_run_id")
+    if run_id is not None:
+        db.query(JobRun).filter(JobRun.id == run_id).update(
+            {"rows_affected": result.deleted}, synchronize_session=False
+        )
+        db.commit()
+
+
+def delete_old_converted_leads(db: Session) -> int:
     """
     Hard deletes leads that have been CONVERTED for more than 7 days
     based on their last updated_at timestamp.
     """
-    db: Session = SessionLocal()
-    try:
-        cutoff_date = datetime.now(pytz.utc) - timedelta(days=7)
+    cutoff_date = datetime.now(pytz.utc) - timedelta(days=7)
 
-        deleted_count = db.query(Lead).filter(
-            Lead.status == LeadStatus.CONVERTED.value,
-            Lead.updated_at < cutoff_date
-        ).delete(synchronize_session=False)
+    result = delete_in_batches(
+        db,
+        Lead,
+        and_(Lead.status == LeadStatus.CONVERTED.value, Lead.updated_at < cutoff_date),
+        progress=lambda r: _checkpoint(db, r),
+    )
 
-        db.commit()
+    if result.deleted > 0:
+        print(f"[Auto-Cleanup] Deleted {result.deleted} converted leads in {result.batches} batches"
+              f"{'' if result.finished else ' (time budget reached, continuing next run)'}.")
+    return result.deleted
 
-        if deleted_count > 0:
-            print(f"[Auto-Cleanup] Deleted {deleted_count} converted leads.")
 
-    except Exception as e:
-        print(f"[Auto-Cleanup Leads Error] {e}")
-        db.rollback()
-    finally:
-        db.close()
+def delete_old_audit_logs(db: Session) -> int:
+    """
+    Hard deletes all audit logs older than 6 months.
+    """
+    cutoff_date = datetime.now(pytz.utc) - timedelta(days=180)
+
+    result = delete_in_batches(
+        db,
+        Auditlog,
+        Auditlog.timestamp < cutoff_date,
+        before_delete=release_purged_unread,
+        progress=lambda r: _checkpoint(db, r),
+    )
+
+    if result.deleted > 0:
+        print(f"[Auto-Cleanup] Purged {result.deleted} audit logs in {result.batches} batches"
+              f"{'' if result.finished else ' (time budget reached, continuing next run)'}.")
+    return result.deleted
 
 
-def delete_old_audit_logs():
+def delete_old_job_runs(db: Session) -> int:
     """
-    Hard deletes all audit logs older than 6 months.
+    Hard deletes scheduler run history older than JOB_RUNS_RETENTION_DAYS.
     """
-    db: Session = SessionLocal()
-    try:
-        cutoff_date = datetime.now(pytz.utc) - timedelta(days=180)
+    cutoff_date = datetime.now(pytz.utc) - timedelta(days=JOB_RUNS_RETENTION_DAYS)
+    return delete_in_batches(db, JobRun, JobRun.started_at < cutoff_date).deleted
+
+
+def delete_old_outbox_emails(db: Session) -> int:
+    """
+    Hard deletes sent / failed outbox emails older than EMAIL_OUTBOX_RETENTION_DAYS.
+    """
+    cutoff_date = datetime.now(pytz.utc) - timedelta(days=EMAIL_OUTBOX_RETENTION_DAYS)
+    return delete_in_batches(
+        db, EmailOutbox, and_(EmailOutbox.status.in_(["sent", "failed"]), EmailOutbox.created_at < cutoff_date)
+    ).deleted
+
+
+def purge_expired_ttl_entries(db: Session) -> int:
+    """
+    Removes expired short-lived entries (OTP codes) from the shared TTL store.
+    """
+    return ttl_store.purge_expired()
+
+
+def run_email_outbox(db: Session) -> int:
+    submitted = process_email_outbox(db)
+    if submitted:
+        print(f"[Email Outbox] Submitted {submitted} queued emails.")
+    return submitted
+
+
+def run_trial_subscription_processor(db: Session) -> int:
+    processed = process_trial_notifications(db)
+    if processed:
+        print(f"[Subscription Lifecycle] Processed {processed} trial subscriptions.")
+
+    discount_processed = process_subscription_discount_lifecycle(db)
+    if discount_processed:
+        print(f"[Subscription Lifecycle] Recomputed {discount_processed} subscription discount prices.")
+    return processed + discount_processed
+
+
+def run_backup_reminder_processor(db: Session) -> int:
+    created = process_backup_reminders(db)
+    if created:
+        print(f"[Backup Reminder] Created {created} notifications.")
+    return created
 
-        deleted_count = db.query(Auditlog).filter(
-            Auditlog.timestamp < cutoff_date
-        ).delete(synchronize_session=False)
 
+def run_scheduled_backups(db: Session) -> int:
+    queued = process_scheduled_backups(db)
+    if queued:
+        print(f"[Backup Job] Queued {queued} scheduled backups.")
+    return queued
+
+
+def run_backup_job_maintenance(db: Session) -> int:
+    expired = expire_backup_artifacts(db)
+    if expired:
+        print(f"[Backup Job] Deleted {expired} expired backup artifacts.")
+    recovered = recover_backup_jobs(db)
+    if recovered:
+        print(f"[Backup Job] Re-queued or failed {recovered} stalled backup jobs.")
+    return expired + recovered
+
+
+# =====================================================
+# Leader-only execution with run history
+# =====================================================
+def run_job(job_id: str, job) -> JobRun | None:
+    """
+    Run job(db) -> rows affected if this worker is the scheduler leader, recording
+    duration, rows affected and any error in job_runs. Other workers skip it.
+    """
+    if not leader.check():
+        return None
+
+    db: Session = SessionLocal()
+    try:
+        run = JobRun(job_id=job_id, worker_id=WORKER_ID, status="running", started_at=datetime.now(timezone.utc))
+        db.add(run)
         db.commit()
+        db.info["job_run_id"] = run.id
 
-        if deleted_count > 0:
-            print(f"[Auto-Cleanup] Purged {deleted_count} audit logs.")
+        started = time.perf_counter()
+        try:
+            rows = job(db)
+            run.status = "success"
+            run.rows_affected = int(rows or 0)
+        except Exception as e:
+            print(f"[Scheduler Error] {job_id}: {e}")
+            db.rollback()
+            run.status = "failed"
+            run.error = traceback.format_exc()[-4000:]
 
+        run.finished_at = datetime.now(timezone.utc)
+        run.duration_ms = int((time.perf_counter() - started) * 1000)
+        db.commit()
+        db.refresh(run)
+        db.expunge(run)
+        return run
     except Exception as e:
-        print(f"[Auto-Cleanup Audit Error] {e}")
+        print(f"[Scheduler Error] {job_id}: could not record run: {e}")
         db.rollback()
+        return None
     finally:
         db.close()
 
 
+def _add_job(scheduler: BackgroundScheduler, job_id: str, job, **trigger):
+    scheduler.add_job(run_job, args=[job_id, job], id=job_id, replace_existing=True, **trigger)
+
+
+def scheduler_jobs() -> list:
+    """Jobs registered on this worker's scheduler and their next fire time."""
+    if _scheduler is None:
+        return []
+    return [
+        {
+            "id": job.id,
+            "trigger": str(job.trigger),
+            "next_run_time": job.next_run_time.isoformat() if job.next_run_time else None,
+        }
+        for job in _scheduler.get_jobs()
+        if job.id != "scheduler_leader_election"
+    ]
+
+
 def start_scheduler() -> BackgroundScheduler:
     """
-    Starts and returns the APScheduler instance.
+    Starts and returns the APScheduler instance. Every worker schedules the jobs; only
+    the leader (services/scheduler_leader.py) executes them.
     """
+    global _scheduler
     scheduler = BackgroundScheduler(timezone=pytz.utc)
 
+    leader.check()
     scheduler.add_job(
-        delete_old_converted_leads,
+        leader.check,
         trigger="interval",
-        days=1,
-        id="cleanup_converted_leads",
-        replace_existing=True
+        seconds=SCHEDULER_LEADER_CHECK_SECONDS,
+        id="scheduler_leader_election",
+        replace_existing=True,
     )
 
-    scheduler.add_job(
-        delete_old_audit_logs,
-        trigger="interval",
-        days=1,
-        id="cleanup_audit_logs",
-        replace_existing=True
-    )
+    # Retention deletes are chunked and time-budgeted; hourly runs keep each one short.
+    _add_job(scheduler, "cleanup_converted_leads", delete_old_converted_leads, trigger="interval", hours=1)
+    _add_job(scheduler, "cleanup_audit_logs", delete_old_audit_logs, trigger="interval", hours=1)
+    _add_job(scheduler, "cleanup_job_runs", delete_old_job_runs, trigger="interval", days=1)
+    _add_job(scheduler, "cleanup_email_outbox", delete_old_outbox_emails, trigger="interval", days=1)
+    _add_job(scheduler, "cleanup_ttl_store", purge_expired_ttl_entries, trigger="interval", minutes=15)
 
-    def run_trial_subscription_processor():
-        db: Session = SessionLocal()
-        try:
-            processed = process_trial_notifications(db)
-            if processed:
-                print(f"[Subscription Lifecycle] Processed {processed} trial subscriptions.")
+    # Retries and emails a restarted worker never sent; new emails are sent as soon as they commit
+    _add_job(scheduler, "email_outbox", run_email_outbox, trigger="interval", minutes=1)
 
-            discount_processed = process_subscription_discount_lifecycle(db)
-            if discount_processed:
-                print(f"[Subscription Lifecycle] Recomputed {discount_processed} subscription discount prices.")
-        except Exception as e:
-            print(f"[Subscription Lifecycle Error] {e}")
-            db.rollback()
-        finally:
-            db.close()
+    # Trial expiry and discount end happen here; request handlers only read the cached plan status.
+    _add_job(scheduler, "process_trial_subscriptions", run_trial_subscription_processor, trigger="interval", hours=1)
 
-    scheduler.add_job(
-        run_trial_subscription_processor,
-        trigger="interval",
-        hours=12,
-        id="process_trial_subscriptions",
-        replace_existing=True,
+    _add_job(
+        scheduler, "backup_reminder_notifications", run_backup_reminder_processor,
+        trigger="cron", hour=8, minute=0, timezone=pytz.timezone("Asia/Manila"),
     )
 
-    def run_backup_reminder_processor():
-        db: Session = SessionLocal()
-        try:
-            created = process_backup_reminders(db)
-            if created:
-                print(f"[Backup Reminder] Created {created} notifications.")
-        except Exception as e:
-            print(f"[Backup Reminder Error] {e}")
-            db.rollback()
-        finally:
-            db.close()
-
-    scheduler.add_job(
-        run_backup_reminder_processor,
-        trigger="cron",
-        hour=8,
-        minute=0,
-        timezone=pytz.timezone("Asia/Manila"),
-        id="backup_reminder_notifications",
-        replace_existing=True,
+    # Same frequency as the reminders, generated overnight so the 08:00 reminder finds it ready
+    _add_job(
+        scheduler, "scheduled_backups", run_scheduled_backups,
+        trigger="cron", hour=2, minute=0, timezone=pytz.timezone("Asia/Manila"),
     )
 
+    _add_job(scheduler, "backup_job_maintenance", run_backup_job_maintenance, trigger="interval", minutes=15)
+
     scheduler.start()
+    _scheduler = scheduler
     return scheduler
+
+
+def stop_scheduler(scheduler: BackgroundScheduler):
+    scheduler.shutdown(wait=False)
+    leader.release()
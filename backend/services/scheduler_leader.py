@@ -0,0 +1,111 @@
+"""Leader election for the background scheduler.
+
+Every gunicorn worker starts APScheduler (main.lifespan), but scheduled jobs must run
+once cluster-wide. Each worker keeps one dedicated connection and retries
+pg_try_advisory_lock(SCHEDULER_LOCK_KEY) on it every SCHEDULER_LEADER_CHECK_SECONDS; the
+worker holding the lock is the leader and the only one whose jobs execute. The lock is
+tied to that session, so when the leader exits or its connection drops PostgreSQL
+releases it and another worker takes over on its next check.
+
+Modes (SCHEDULER_LEADER):
+
+- postgres: advisory lock as above. Chosen automatically when DATABASE_URL is PostgreSQL.
+- always: this process is always the leader (single-process dev / SQLite).
+- never: never run scheduled jobs here (e.g. web-only replicas).
+"""
+
+import os
+import threading
+from datetime import datetime, timezone
+
+from database import DATABASE_URL, engine
+from services.notification_backplane import WORKER_ID
+
+SCHEDULER_LEADER = os.getenv("SCHEDULER_LEADER", "auto").strip().lower()  # auto | postgres | always | never
+SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", "727274001"))
+SCHEDULER_LEADER_CHECK_SECONDS = int(os.getenv("SCHEDULER_LEADER_CHECK_SECONDS", "30"))
+
+
+class SchedulerLeader:
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.is_leader = mode == "always"
+        self.leader_since = datetime.now(timezone.utc) if self.is_leader else None
+        self.last_checked_at = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        raw = engine.raw_connection()
+        raw.detach()  # the lock lives as long as this session; keep it out of the pool
+        conn = raw.dbapi_connection
+        conn.autocommit = True
+        self._conn = conn
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+        self._conn = None
+
+    def _lost(self, reason):
+        if self.is_leader:
+            print(f"[Scheduler] {WORKER_ID} lost scheduler leadership: {reason}")
+        self.is_leader = False
+        self.leader_since = None
+        self._close()
+
+    def check(self) -> bool:
+        """Acquire or confirm leadership; returns whether this worker is the leader."""
+        if self.mode != "postgres":
+            return self.is_leader
+
+        with self._lock:
+            self.last_checked_at = datetime.now(timezone.utc)
+            try:
+                if self._conn is None:
+                    self._connect()
+                with self._conn.cursor() as cur:
+                    if self.is_leader:
+                        # A session-level lock is held until the session ends: a live
+                        # connection means we still lead (a dead one raises below).
+                        cur.execute("SELECT 1")
+                    else:
+                        cur.execute("SELECT pg_try_advisory_lock(%s)", (SCHEDULER_LOCK_KEY,))
+                        if cur.fetchone()[0]:
+                            self.is_leader = True
+                            self.leader_since = datetime.now(timezone.utc)
+                            print(f"[Scheduler] {WORKER_ID} is now the scheduler leader")
+            except Exception as e:
+                self._lost(e)
+            return self.is_leader
+
+    def release(self):
+        with self._lock:
+            if self.mode == "postgres":
+                if self.is_leader:
+                    print(f"[Scheduler] {WORKER_ID} releasing scheduler leadership")
+                self.is_leader = False
+                self.leader_since = None
+                self._close()  # closing the session releases the advisory lock
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": self.mode,
+            "worker_id": WORKER_ID,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since.isoformat() if self.leader_since else None,
+            "last_checked_at": self.last_checked_at.isoformat() if self.last_checked_at else None,
+            "lock_key": SCHEDULER_LOCK_KEY if self.mode == "postgres" else None,
+        }
+
+
+def _leader_mode() -> str:
+    if SCHEDULER_LEADER in ("postgres", "always", "never"):
+        return SCHEDULER_LEADER
+    return "postgres" if DATABASE_URL and DATABASE_URL.startswith("postgres") else "always"
+
+
+leader = SchedulerLeader(_leader_mode())
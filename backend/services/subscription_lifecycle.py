@@ -1,8 +1,11 @@
 import os
+import threading
+import time
 from datetime import datetime, timezone
 from math import ceil
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 
 from models.auth import User
@@ -13,6 +16,11 @@ from routers.aws_ses_utils import send_trial_ending_soon_email
 TRIAL_DAYS = 15
 TRIAL_WARNING_DAYS = 3
 
+# Per-process cache of the effective plan payload, keyed by company_id.
+PLAN_STATUS_CACHE_TTL_SECONDS = float(os.getenv("PLAN_STATUS_CACHE_TTL_SECONDS", "60"))
+_plan_status_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+_plan_status_lock = threading.Lock()
+
 DEFAULT_PLAN_PRICES = {
     PlanName.FREE.value.lower(): 0.0,
     PlanName.BASIC.value.lower(): 99.0,
@@ -206,6 +214,38 @@ def _create_free_tier_subscription(db: Session, company_id: int) -> Subscription
     return free_subscription
 
 
+def _expire_trial(db: Session, subscription: Subscription) -> Subscription:
+    # Expire old trial
+    subscription.status = StatusList.EXPIRED.value
+    subscription.is_trial = False
+    subscription.updated_at = utc_now()
+    subscription.downgraded_to_free_at = utc_now()
+
+    # Create a new Free-tier active subscription as the latest effective subscription
+    return _create_free_tier_subscription(db, subscription.company_id)
+
+
+def latest_subscriptions(*company_conditions):
+    """
+    Subquery of each company's newest subscription (what get_latest_subscription returns),
+    picked with row_number() in one pass; restrict the companies with company_conditions.
+    """
+    ranked = (
+        select(
+            Subscription.id.label("id"),
+            func.row_number()
+            .over(
+                partition_by=Subscription.company_id,
+                order_by=(Subscription.created_at.desc(), Subscription.id.desc()),
+            )
+            .label("rank"),
+        )
+        .where(*company_conditions)
+        .subquery()
+    )
+    return select(ranked.c.id).where(ranked.c.rank == 1)
+
+
 def apply_trial_lifecycle(db: Session, company_id: Optional[int], *, commit: bool = True) -> Dict[str, Any]:
     if not company_id:
         return _build_payload(None)
@@ -220,14 +260,7 @@ def apply_trial_lifecycle(db: Session, company_id: Optional[int], *, commit: boo
     end_at = to_utc(subscription.end_date)
 
     if is_trial and end_at and utc_now() >= end_at:
-        # Expire old trial
-        subscription.status = StatusList.EXPIRED.value
-        subscription.is_trial = False
-        subscription.updated_at = utc_now()
-        subscription.downgraded_to_free_at = utc_now()
-
-        # Create a new Free-tier active subscription as the latest effective subscription
-        downgraded_subscription = _create_free_tier_subscription(db, company_id)
+        downgraded_subscription = _expire_trial(db, subscription)
 
         if commit:
             db.commit()
@@ -256,50 +289,173 @@ def apply_trial_lifecycle(db: Session, company_id: Optional[int], *, commit: boo
     return _build_payload(subscription)
 
 
+def read_plan_status(db: Session, company_id: Optional[int]) -> Dict[str, Any]:
+    """
+    apply_trial_lifecycle without the writes, for the request path: an ended trial (or an
+    expired paid plan) reads as Free and an ended discount as the regular price until
+    process_trial_notifications / process_subscription_discount_lifecycle record it.
+    """
+    if not company_id:
+        return _build_payload(None)
+
+    subscription = get_latest_subscription(db, company_id)
+    if not subscription:
+        return _build_payload(None)
+
+    is_trial = bool(subscription.is_trial) or subscription.status == StatusList.TRIAL.value
+    end_at = to_utc(subscription.end_date)
+    trial_ended = bool(is_trial and end_at and utc_now() >= end_at)
+    paid_expired = (
+        subscription.status == StatusList.EXPIRED.value
+        and (subscription.plan_name or "").strip().lower() != PlanName.FREE.value.lower()
+    )
+    if trial_ended or paid_expired:
+        # Not added to the session: only describes the Free tier the scheduler will create
+        free_tier = Subscription(
+            company_id=company_id,
+            plan_name=PlanName.FREE.value,
+            price=0.0,
+            status=StatusList.ACTIVE.value,
+            is_trial=False,
+        )
+        return _build_payload(free_tier, downgraded=True)
+
+    payload = _build_payload(subscription)
+    if subscription.promo_discount_is_active:
+        base_price = get_regular_plan_price(subscription.plan_name, subscription.price)
+        ends_at = to_utc(subscription.promo_discount_ends_at)
+        if not ends_at or utc_now() >= ends_at:
+            payload.update(
+                current_price=base_price,
+                promo_discount_active=False,
+                promo_discount_ends_at=None,
+                promo_discount_type=None,
+                promo_discount_value=None,
+            )
+        else:
+            payload["current_price"] = _apply_discount(
+                base_price, subscription.promo_discount_type, subscription.promo_discount_value
+            )
+    return payload
+
+
+def _plan_status_cache_deadline(payload: Dict[str, Any]) -> float:
+    """Monotonic deadline for a cached payload: the TTL, cut short at the next trial/discount boundary."""
+    ttl = PLAN_STATUS_CACHE_TTL_SECONDS
+    now = utc_now()
+    boundaries = []
+    if payload.get("is_trial"):
+        boundaries.append(to_utc(payload.get("trial_ends_at")))
+    if payload.get("promo_discount_active"):
+        boundaries.append(to_utc(payload.get("promo_discount_ends_at")))
+    for boundary in boundaries:
+        if boundary is not None:
+            ttl = min(ttl, max(0.0, (boundary - now).total_seconds()))
+    return time.monotonic() + ttl
+
+
+def invalidate_plan_status(company_id: Optional[int] = None) -> None:
+    """Drop the cached plan status for one company (or every company when company_id is None)."""
+    with _plan_status_lock:
+        if company_id is None:
+            _plan_status_cache.clear()
+        else:
+            _plan_status_cache.pop(company_id, None)
+
+
+def invalidate_plan_status_after_commit(db: Session, company_id: Optional[int]) -> None:
+    """Invalidate once the caller's transaction commits (for services that leave the commit to the router)."""
+    if not company_id:
+        return
+    event.listen(db, "after_commit", lambda session: invalidate_plan_status(company_id), once=True)
+
+
+def get_plan_status(db: Session, company_id: Optional[int]) -> Dict[str, Any]:
+    """Cached read_plan_status for the request path.
+
+    Never writes: trial expiry and discount recomputation are driven by the scheduler.
+    Entries never outlive the trial/discount end they describe, so a boundary still takes
+    effect on time.
+    """
+    if not company_id or PLAN_STATUS_CACHE_TTL_SECONDS <= 0:
+        return read_plan_status(db, company_id)
+
+    with _plan_status_lock:
+        cached = _plan_status_cache.get(company_id)
+    if cached and cached[0] > time.monotonic():
+        return dict(cached[1])
+
+    payload = read_plan_status(db, company_id)
+    with _plan_status_lock:
+        _plan_status_cache[company_id] = (_plan_status_cache_deadline(payload), dict(payload))
+    return payload
+
+
 def process_trial_notifications(db: Session) -> int:
     """Send trial reminder emails and process auto-downgrades. Returns processed count."""
-    processed = 0
+    trial_condition = (Subscription.status == StatusList.TRIAL.value, Subscription.is_trial == True)
+
+    # Companies whose newest subscription is a trial, in one query
+    trial_companies = select(Subscription.company_id).where(*trial_condition)
     trials = (
         db.query(Subscription)
         .filter(
-            Subscription.status == StatusList.TRIAL.value,
-            Subscription.is_trial == True,
+            Subscription.id.in_(latest_subscriptions(Subscription.company_id.in_(trial_companies))),
+            *trial_condition,
         )
         .all()
     )
 
+    warn = {}  # company_id -> (subscription, days remaining)
     for subscription in trials:
-        payload = apply_trial_lifecycle(db, subscription.company_id, commit=False)
-        processed += 1
+        apply_discount_lifecycle_for_subscription(subscription)
+
+        end_at = to_utc(subscription.end_date)
+        if end_at and utc_now() >= end_at:
+            _expire_trial(db, subscription)
+            continue
 
         # If still in trial and within warning window, send reminder once.
+        days_remaining = _trial_days_remaining(subscription.end_date)
         if (
-            payload.get("is_trial")
-            and payload.get("trial_days_remaining") is not None
-            and 0 < payload["trial_days_remaining"] <= TRIAL_WARNING_DAYS
+            days_remaining is not None
+            and 0 < days_remaining <= TRIAL_WARNING_DAYS
             and subscription.trial_notification_sent_at is None
         ):
-            tenant = (
-                db.query(User)
-                .filter(
-                    User.related_to_company == subscription.company_id,
-                    User.is_active == True,
-                    User.role.ilike("ceo"),
-                )
-                .order_by(User.id.asc())
-                .first()
+            warn[subscription.company_id] = (subscription, days_remaining)
+
+    if warn:
+        # First active CEO of every company to warn, in one query
+        ranked = (
+            select(
+                User.related_to_company.label("company_id"),
+                User.email.label("email"),
+                User.first_name.label("first_name"),
+                func.row_number().over(partition_by=User.related_to_company, order_by=User.id.asc()).label("rank"),
             )
-
-            if tenant:
-                send_trial_ending_soon_email(
-                    to_email=tenant.email,
-                    first_name=tenant.first_name,
-                    days_remaining=payload["trial_days_remaining"],
-                )
-                subscription.trial_notification_sent_at = utc_now()
+            .where(
+                User.related_to_company.in_(list(warn)),
+                User.is_active == True,
+                User.role.ilike("ceo"),
+            )
+            .subquery()
+        )
+        for recipient in db.execute(select(ranked).where(ranked.c.rank == 1)):
+            subscription, days_remaining = warn[recipient.company_id]
+            # Queued in this transaction: marked sent exactly when the email is durably queued
+            send_trial_ending_soon_email(
+                db,
+                to_email=recipient.email,
+                first_name=recipient.first_name,
+                days_remaining=days_remaining,
+                commit=False,
+            )
+            subscription.trial_notification_sent_at = utc_now()
 
     db.commit()
-    return processed
+    for subscription in trials:
+        invalidate_plan_status(subscription.company_id)
+    return len(trials)
 
 
 def process_subscription_discount_lifecycle(db: Session) -> int:
@@ -311,5 +467,7 @@ def process_subscription_discount_lifecycle(db: Session) -> int:
 
     if processed:
         db.commit()
+        for sub in subscriptions:
+            invalidate_plan_status(sub.company_id)
 
     return processed
@@ -0,0 +1,232 @@
+"""Short-lived key/value store shared by every worker (password reset OTPs).
+
+gunicorn runs several workers, so a value written while handling one request (the OTP
+from forgot-password) must be readable by whichever worker gets the next one
+(verify-otp). Every entry has a TTL and is invisible once expired.
+
+Operations: put(key, value, ttl_seconds), get(key), take(key, expected=None) -- atomic
+get-and-delete, so a value can be consumed once only; with `expected` it is consumed
+only when it matches -- delete(key) and purge_expired().
+
+Backends (TTL_STORE):
+
+- db: the kv_entries table. put is an upsert, take a single DELETE ... RETURNING, so
+  concurrent takes of one key have exactly one winner. Expired rows are ignored on read
+  and removed by the scheduler (purge_expired). Chosen automatically when DATABASE_URL
+  is PostgreSQL.
+- memory: per-process stand-in for single-process dev / SQLite.
+
+Both keep an in-process LRU of at most TTL_STORE_LRU_SIZE entries. For memory it is the
+store itself (bounded, expired entries dropped on access and by purge_expired). For db it
+is a read-through front for get(): an entry is served from it for at most
+TTL_STORE_LRU_SECONDS, so another worker's write can be missed for that long. take() and
+delete() always go to the table and drop the local copy.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import and_, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import DATABASE_URL, engine
+from models.kv_entry import KvEntry
+
+TTL_STORE = os.getenv("TTL_STORE", "auto").strip().lower()  # auto | db | memory
+TTL_STORE_LRU_SIZE = int(os.getenv("TTL_STORE_LRU_SIZE", "10000"))
+TTL_STORE_LRU_SECONDS = float(os.getenv("TTL_STORE_LRU_SECONDS", "2"))
+
+entries = KvEntry.__table__
+
+
+class _LRU:
+    """Bounded key -> (value, expires_at monotonic, cached_at monotonic), oldest evicted first."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(max_size, 1)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set(self, key: str, value: str, ttl_seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            self._data[key] = (value, now + ttl_seconds, now)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str, max_age: float | None = None) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at, cached_at = item
+            if expires_at <= now or (max_age is not None and now - cached_at > max_age):
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def pop(self, key: str, expected: str | None = None) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at, _cached_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            if expected is not None and value != expected:
+                return None
+            del self._data[key]
+            return value
+
+    def discard(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def purge_expired(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_value, expires_at, _cached) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+            return len(expired)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class MemoryTTLStore:
+    name = "memory"
+
+    def __init__(self, max_size: int = TTL_STORE_LRU_SIZE):
+        self._lru = _LRU(max_size)
+
+    def put(self, key: str, value: str, ttl_seconds: float):
+        self._lru.set(key, value, ttl_seconds)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._lru.get(key)
+
+    def take(self, key: str, expected: str | None = None) -> Optional[str]:
+        return self._lru.pop(key, expected)
+
+    def delete(self, key: str):
+        self._lru.discard(key)
+
+    def purge_expired(self) -> int:
+        return self._lru.purge_expired()
+
+    def snapshot(self) -> dict:
+        return {"backend": self.name, "lru": self._lru.snapshot()}
+
+
+class DatabaseTTLStore:
+    name = "db"
+
+    def __init__(self, max_size: int = TTL_STORE_LRU_SIZE):
+        self._lru = _LRU(max_size)
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def put(self, key: str, value: str, ttl_seconds: float):
+        expires_at = self._now() + timedelta(seconds=ttl_seconds)
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                stmt = postgresql.insert(entries).values(key=key, value=value, expires_at=expires_at)
+            elif conn.dialect.name == "sqlite":
+                stmt = sqlite.insert(entries).values(key=key, value=value, expires_at=expires_at)
+            else:
+                stmt = None
+
+            if stmt is not None:
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=[entries.c.key],
+                    set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+                ))
+            elif not conn.execute(
+                update(entries).where(entries.c.key == key).values(value=value, expires_at=expires_at)
+            ).rowcount:
+                conn.execute(insert(entries).values(key=key, value=value, expires_at=expires_at))
+        self._lru.set(key, value, ttl_seconds)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._lru.get(key, max_age=TTL_STORE_LRU_SECONDS)
+        if value is not None:
+            return value
+
+        with engine.connect() as conn:
+            row = conn.execute(
+                select(entries.c.value, entries.c.expires_at)
+                .where(entries.c.key == key, entries.c.expires_at > self._now())
+            ).first()
+        if row is None:
+            return None
+        expires_at = row.expires_at if row.expires_at.tzinfo else row.expires_at.replace(tzinfo=timezone.utc)
+        self._lru.set(key, row.value, (expires_at - self._now()).total_seconds())
+        return row.value
+
+    def take(self, key: str, expected: str | None = None) -> Optional[str]:
+        self._lru.discard(key)
+        condition = and_(entries.c.key == key, entries.c.expires_at > self._now())
+        if expected is not None:
+            condition = and_(condition, entries.c.value == expected)
+
+        with engine.begin() as conn:
+            if conn.dialect.delete_returning:
+                row = conn.execute(delete(entries).where(condition).returning(entries.c.value)).first()
+                return row.value if row else None
+
+            # Read, then delete only that value: one of several concurrent takers wins
+            row = conn.execute(select(entries.c.value).where(condition)).first()
+            if row is None:
+                return None
+            deleted = conn.execute(delete(entries).where(condition, entries.c.value == row.value)).rowcount
+            return row.value if deleted else None
+
+    def delete(self, key: str):
+        self._lru.discard(key)
+        with engine.begin() as conn:
+            conn.execute(delete(entries).where(entries.c.key == key))
+
+    def purge_expired(self) -> int:
+        self._lru.purge_expired()
+        with engine.begin() as conn:
+            return conn.execute(delete(entries).where(entries.c.expires_at <= self._now())).rowcount or 0
+
+    def snapshot(self) -> dict:
+        with engine.connect() as conn:
+            stored = conn.execute(select(func.count()).select_from(entries)).scalar_one()
+        return {"backend": self.name, "stored_entries": stored, "lru": self._lru.snapshot()}
+
+
+def _create_store():
+    mode = TTL_STORE
+    if mode not in ("db", "memory"):
+        mode = "db" if DATABASE_URL and DATABASE_URL.startswith("postgres") else "memory"
+    return DatabaseTTLStore() if mode == "db" else MemoryTTLStore()
+
+
+ttl_store = _create_store()
@@ -0,0 +1,63 @@
+"""Shared test setup: a throwaway SQLite database, configured before the app modules read the environment.
+
+Run from the backend folder:
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="crm-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["MEDIA_ROOT"] = os.path.join(_TMP_DIR, "media")
+os.environ["EMAIL_TRANSPORT"] = "file"
+os.environ["EMAIL_FILE_DIR"] = os.path.join(_TMP_DIR, "mail")
+os.environ["TTL_STORE"] = "db"
+os.makedirs(os.environ["MEDIA_ROOT"], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import itertools  # noqa: E402
+
+import pytest  # noqa: E402
+
+import models  # noqa: E402,F401  (registers every table)
+from database import Base, SessionLocal, engine  # noqa: E402
+from models import Company, User  # noqa: E402
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_tenant(db):
+    """Create a company with a CEO; returns (company, ceo)."""
+    def _make(role: str = "CEO"):
+        n = next(_ids)
+        company = Company(company_name=f"Company {n}", company_number=str(n), tenant_number=f"T{n:08d}")
+        db.add(company)
+        db.flush()
+        user = User(first_name="Test", last_name=str(n), email=f"user{n}@example.com", role=role,
+                    related_to_company=company.id, is_active=True)
+        db.add(user)
+        db.commit()
+        return company, user
+    return _make
@@ -0,0 +1,34 @@
+import asyncio
+import gc
+
+from starlette.requests import Request
+
+from models.backup import BackupRun
+from routers.backup import download_backup_csv_zip
+
+
+def _request():
+    return Request({"type": "http", "method": "GET", "path": "/admin/backup/csv", "headers": [],
+                    "query_string": b"", "client": ("127.0.0.1", 1234)})
+
+
+def test_disconnected_download_fails_its_run(db, make_tenant):
+    company, ceo = make_tenant()
+    ceo.subscription_status = {"current_plan": "Pro"}
+
+    response = download_backup_csv_zip(_request(), mode="full", db=db, current_user=ceo)
+
+    async def read_one_chunk_then_disconnect():
+        body = response.body_iterator
+        await body.__anext__()
+        await body.aclose()
+
+    asyncio.run(read_one_chunk_then_disconnect())
+    del response
+    gc.collect()
+
+    db.expire_all()
+    run = db.query(BackupRun).filter(BackupRun.company_id == company.id).one()
+    assert run.trigger == "download"
+    assert run.status == "failed"
+    assert run.completed_at is not None
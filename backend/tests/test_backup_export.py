@@ -0,0 +1,35 @@
+import io
+import zipfile
+
+from services.backup_export import stream_backup_zip
+from services.email_outbox import enqueue_email
+from services.ttl_store import DatabaseTTLStore
+
+
+def _archive_names(db, company, users) -> set:
+    data = b"".join(stream_backup_zip(db, company.id, [user.id for user in users]))
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return set(zf.namelist())
+
+
+def test_tenant_backup_excludes_kv_entries(db, make_tenant):
+    company, ceo = make_tenant()
+    _other_company, victim = make_tenant()
+    DatabaseTTLStore().put(f"otp:{victim.email}", "123456", ttl_seconds=60)
+
+    names = _archive_names(db, company, [ceo])
+
+    assert "users.csv" in names
+    assert "kv_entries.csv" not in names
+
+
+def test_tenant_backup_excludes_email_outbox(db, make_tenant):
+    company, ceo = make_tenant()
+    _other_company, victim = make_tenant()
+    enqueue_email(db, "otp", victim.email, "Your code", "Your code is 123456")
+    db.commit()
+
+    names = _archive_names(db, company, [ceo])
+
+    assert "users.csv" in names
+    assert "email_outbox.csv" not in names
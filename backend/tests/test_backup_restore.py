@@ -0,0 +1,40 @@
+import io
+import os
+import tempfile
+
+from sqlalchemy import create_engine, select
+
+from database import Base
+from models.auditlog import Auditlog
+from models.auth import User
+from models.notification import NotificationCounter
+from services.backup_export import stream_backup_zip
+from services.backup_restore import restore_archives
+
+
+def test_restore_round_trip_rebuilds_unread_counters(db, make_tenant):
+    company, ceo = make_tenant()
+    db.add_all([Auditlog(description="n", user_id=ceo.id, action="TASK_ASSIGNMENT") for _ in range(3)])
+    db.add(Auditlog(description="n", user_id=ceo.id, action="TASK_ASSIGNMENT", is_read=True))
+    db.commit()
+    archive = io.BytesIO(b"".join(stream_backup_zip(db, company.id, [ceo.id])))
+
+    target = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='crm-restore-'), 'restore.db')}")
+    Base.metadata.create_all(target)
+    try:
+        report = restore_archives(target, [archive])
+        assert report.ok, report.errors
+
+        with target.connect() as connection:
+            user_id = connection.execute(select(User.id).where(User.email == ceo.email)).scalar_one()
+            logs = connection.execute(select(Auditlog.id).where(Auditlog.user_id == user_id)).scalars().all()
+            counter = connection.execute(
+                select(NotificationCounter.unread_count, NotificationCounter.last_log_id)
+                .where(NotificationCounter.user_id == user_id)
+            ).one()
+    finally:
+        target.dispose()
+
+    assert report.company_id is not None
+    assert len(logs) == 4
+    assert counter == (3, max(logs))
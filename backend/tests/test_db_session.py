@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import database
+import main
+from routers.auth_utils import create_access_token
+
+
+def test_authenticated_request_uses_one_session(db, make_tenant, monkeypatch):
+    _company, user = make_tenant()
+    token = create_access_token({"sub": str(user.id)})
+    created, used = [], set()
+
+    def counting_session_local():
+        session = database.SessionLocal.__wrapped__()
+        created.append(session)
+        return session
+
+    counting_session_local.__wrapped__ = database.SessionLocal
+    monkeypatch.setattr(database, "SessionLocal", counting_session_local)
+
+    def record(orm_execute_state):
+        used.add(id(orm_execute_state.session))
+
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        client = TestClient(main.app)
+        client.cookies.set("access_token", token)
+        response = client.get("/api/accounts/sales/fetch-all")
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+
+    assert response.status_code == 200
+    # get_current_user and the handler share get_db's session
+    assert len(created) == 1
+    assert used == {id(created[0])}
@@ -0,0 +1,63 @@
+from models.auditlog import Auditlog
+from models.notification import NotificationCounter
+from services.notification_counters import _seed_counters, get_unread_summary, mark_read, record_new_notifications
+
+
+def _user_with_unread(db, make_tenant, unread: int):
+    _company, user = make_tenant()
+    db.add_all([Auditlog(description="n", user_id=user.id, action="TASK_ASSIGNMENT") for _ in range(unread)])
+    db.commit()
+    # Counter rows are created lazily (e.g. users restored from a backup have none)
+    db.query(NotificationCounter).filter(NotificationCounter.user_id == user.id).delete()
+    db.commit()
+    return user
+
+
+def test_first_read_seeds_counter(db, make_tenant):
+    user = _user_with_unread(db, make_tenant, 3)
+
+    first = get_unread_summary(db, user.id)
+    assert first["unread_count"] == 3
+    assert first["last_id"] > 0
+    assert get_unread_summary(db, user.id) == first
+
+
+def test_seed_does_not_add_to_existing_row(db, make_tenant):
+    user = _user_with_unread(db, make_tenant, 3)
+
+    # Two first reads racing: both count 3 and both try to create the row
+    _seed_counters(db.connection(), [user.id])
+    _seed_counters(db.connection(), [user.id])
+    db.commit()
+
+    assert get_unread_summary(db, user.id)["unread_count"] == 3
+
+
+def test_flushed_log_without_counter_row_counts_earlier_unread(db, make_tenant):
+    user = _user_with_unread(db, make_tenant, 3)
+
+    db.add(Auditlog(description="n", user_id=user.id, action="TASK_ASSIGNMENT"))
+    db.commit()
+
+    assert get_unread_summary(db, user.id)["unread_count"] == 4
+
+
+def test_bulk_insert_without_counter_row_counts_earlier_unread(db, make_tenant):
+    user = _user_with_unread(db, make_tenant, 3)
+
+    log = Auditlog(description="n", user_id=user.id, action="TASK_ASSIGNMENT")
+    db.add(log)
+    db.flush()
+    db.query(NotificationCounter).filter(NotificationCounter.user_id == user.id).delete()
+    record_new_notifications(db.connection(), [(log.id, user.id)])
+    db.commit()
+
+    assert get_unread_summary(db, user.id)["unread_count"] == 4
+
+
+def test_mark_read_without_counter_row(db, make_tenant):
+    user = _user_with_unread(db, make_tenant, 3)
+    log_id = db.query(Auditlog.id).filter(Auditlog.user_id == user.id).first()[0]
+
+    assert mark_read(db, user.id, log_id) is True
+    assert get_unread_summary(db, user.id)["unread_count"] == 2
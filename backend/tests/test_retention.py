@@ -0,0 +1,44 @@
+from sqlalchemy import insert
+
+import services.retention as retention
+from models.auditlog import Auditlog
+from services.retention import delete_in_batches
+
+
+def test_sparse_matches_do_not_cost_empty_windows(db, make_tenant, monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    _company, user = make_tenant()
+    expired_ids = list(range(100_000, 1_000_000, 36_000))  # 25 rows spread over a wide id range
+    db.execute(insert(Auditlog), [
+        {"id": log_id, "description": "old", "user_id": user.id, "action": "RETENTION_TEST", "is_read": True}
+        for log_id in expired_ids
+    ] + [
+        {"id": log_id + 1, "description": "kept", "user_id": user.id, "action": "KEEP", "is_read": True}
+        for log_id in expired_ids
+    ])
+    db.commit()
+
+    result = delete_in_batches(db, Auditlog, Auditlog.action == "RETENTION_TEST", batch_size=10, time_budget=60)
+
+    assert result.finished
+    assert result.deleted == 25
+    assert result.batches == 3
+    assert result.checkpoint_id == expired_ids[-1]
+    assert db.query(Auditlog).filter(Auditlog.action == "RETENTION_TEST").count() == 0
+    assert db.query(Auditlog).filter(Auditlog.action == "KEEP", Auditlog.user_id == user.id).count() == 25
+
+
+def test_time_budget_leaves_the_rest_for_the_next_run(db, make_tenant, monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE_SECONDS", 0)
+    _company, user = make_tenant()
+    db.execute(insert(Auditlog), [
+        {"id": 2_000_000 + i, "description": "old", "user_id": user.id, "action": "BUDGET_TEST", "is_read": True}
+        for i in range(30)
+    ])
+    db.commit()
+
+    first = delete_in_batches(db, Auditlog, Auditlog.action == "BUDGET_TEST", batch_size=10, time_budget=0)
+    assert (first.deleted, first.batches, first.finished) == (10, 1, False)
+
+    second = delete_in_batches(db, Auditlog, Auditlog.action == "BUDGET_TEST", batch_size=10, time_budget=60)
+    assert (second.deleted, second.finished) == (20, True)
@@ -0,0 +1,66 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models import Account, Deal
+from models.revenue import UserDailyRevenue
+from services.revenue_rollup import deal_revenue_keys, refresh_user_daily_revenue
+
+
+def _rollup(db, user_id):
+    db.expire_all()
+    rows = db.query(UserDailyRevenue).filter(UserDailyRevenue.user_id == user_id).order_by(UserDailyRevenue.day).all()
+    return [(row.day, row.closed_won_amount, row.deal_count) for row in rows]
+
+
+def _deal(db, user, account, amount, close_date, stage="CLOSED_WON"):
+    deal = Deal(name="Deal", account_id=account.id, stage=stage, amount=amount, close_date=close_date,
+                assigned_to=user.id, created_by=user.id, company_id=user.related_to_company)
+    db.add(deal)
+    return deal
+
+
+def test_refresh_writes_and_removes_rows(db, make_tenant):
+    company, user = make_tenant()
+    account = Account(name="Account", created_by=user.id, company_id=company.id)
+    db.add(account)
+    db.flush()
+    first = _deal(db, user, account, 100, datetime(2026, 3, 1, 9))
+    _deal(db, user, account, 50, datetime(2026, 3, 1, 17))
+    _deal(db, user, account, 70, datetime(2026, 3, 2, 12))
+    _deal(db, user, account, 999, datetime(2026, 3, 2, 12), stage="PROPOSAL")
+    db.flush()
+
+    refresh_user_daily_revenue(db, {(user.id, date(2026, 3, 1)), (user.id, date(2026, 3, 2))})
+    db.commit()
+    assert _rollup(db, user.id) == [
+        (date(2026, 3, 1), Decimal("150.00"), 2),
+        (date(2026, 3, 2), Decimal("70.00"), 1),
+    ]
+
+    keys = deal_revenue_keys(first)
+    first.stage = "CLOSED_LOST"
+    refresh_user_daily_revenue(db, keys | deal_revenue_keys(first))
+    db.commit()
+    assert _rollup(db, user.id)[0] == (date(2026, 3, 1), Decimal("50.00"), 1)
+
+    db.query(Deal).filter(Deal.assigned_to == user.id, Deal.close_date < datetime(2026, 3, 2)).delete()
+    refresh_user_daily_revenue(db, {(user.id, date(2026, 3, 1))})
+    db.commit()
+    assert [row[0] for row in _rollup(db, user.id)] == [date(2026, 3, 2)]
+
+
+def test_refresh_updates_a_row_written_concurrently(db, make_tenant):
+    company, user = make_tenant()
+    account = Account(name="Account", created_by=user.id, company_id=company.id)
+    db.add(account)
+    db.flush()
+    _deal(db, user, account, 40, datetime(2026, 5, 5, 10))
+    db.commit()
+
+    # Another transaction inserted the (user, day) row after this one looked for it
+    db.add(UserDailyRevenue(user_id=user.id, day=date(2026, 5, 5), closed_won_amount=1, deal_count=1))
+    db.commit()
+
+    refresh_user_daily_revenue(db, {(user.id, date(2026, 5, 5))})
+    db.commit()
+    assert _rollup(db, user.id) == [(date(2026, 5, 5), Decimal("40.00"), 1)]
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from models.subscription import PlanName, StatusList, Subscription
+from services.subscription_lifecycle import get_plan_status, invalidate_plan_status, utc_now
+
+
+def test_ended_trial_reads_as_free_without_writing(db, make_tenant):
+    company, _ceo = make_tenant()
+    trial = Subscription(company_id=company.id, plan_name=PlanName.PRO.value, price=0.0,
+                         status=StatusList.TRIAL.value, is_trial=True,
+                         start_date=utc_now() - timedelta(days=16), end_date=utc_now() - timedelta(hours=1))
+    db.add(trial)
+    db.commit()
+    invalidate_plan_status(company.id)
+
+    status = get_plan_status(db, company.id)
+
+    assert status["current_plan"] == PlanName.FREE.value
+    assert status["is_free_tier"] is True
+    assert status["show_downgraded_banner"] is True
+    assert not db.new and not db.dirty
+    db.expire_all()
+    rows = db.query(Subscription).filter(Subscription.company_id == company.id).all()
+    assert [(row.status, row.is_trial) for row in rows] == [(StatusList.TRIAL.value, True)]
@@ -146,33 +146,52 @@ export default function AdminCompanyDetails() {
     }
   };
 
+  const waitForBackupJob = async (job) => {
+    // The backup is generated in the background; poll until the artifact is ready.
+    const deadline = Date.now() + 30 * 60 * 1000;
+    while (job.status === "queued" || job.status === "running") {
+      if (Date.now() > deadline) throw new Error("Backup is taking too long. You will be notified when it is ready.");
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      const res = await api.get(`/admin/backup/jobs/${job.id}`);
+      job = res.data;
+    }
+    return job;
+  };
+
   const handleDownloadBackup = async () => {
     setDownloadingBackup(true);
 
     try {
-      const res = await api.get("/admin/backup/csv", {
-        responseType: "blob",
-      });
+      let job;
+      try {
+        const res = await api.post("/admin/backup/jobs");
+        job = res.data;
+      } catch (error) {
+        // A backup is already being generated: wait for that one instead
+        job = error?.response?.status === 409 ? error.response.data?.detail?.job : null;
+        if (!job) throw error;
+      }
 
-      // Try to use the filename from Content-Disposition if present
-      const contentDisposition = res.headers?.["content-disposition"] || "";
-      const match = /filename="?([^";]+)"?/i.exec(contentDisposition);
-      const filename = match?.[1] || "crm-backup.zip";
+      job = await waitForBackupJob(job);
+      if (job.status !== "completed" || !job.download_url) {
+        throw new Error(job.error || "Backup failed. Please try again.");
+      }
 
-      const blobUrl = window.URL.createObjectURL(new Blob([res.data]));
+      // Served as a static file (supports resuming); the browser streams it to disk
       const link = document.createElement("a");
-      link.href = blobUrl;
-      link.setAttribute("download", filename);
+      link.href = new URL(job.download_url, api.defaults.baseURL).href;
+      link.setAttribute("download", job.download_url.split("/").pop() || "crm-backup.zip");
       document.body.appendChild(link);
       link.click();
       link.remove();
-      window.URL.revokeObjectURL(blobUrl);
 
       toast.success("Backup downloaded successfully!");
     } catch (error) {
       console.error("Backup download error:", error);
+      const detail = error?.response?.data?.detail;
       const errorDetail =
-        error?.response?.data?.detail ||
+        (typeof detail === "string" ? detail : detail?.message) ||
+        error?.message ||
         "Failed to download backup. Please try again.";
       toast.error(errorDetail);
     } finally {
@@ -488,7 +507,7 @@ export default function AdminCompanyDetails() {
                   className="flex items-center justify-center gap-2 border border-gray-300 bg-white text-gray-700 px-4 py-2 rounded-md font-medium hover:bg-gray-50 disabled:opacity-50 transition"
                 >
                   <FiDownload />
-                  {downloadingBackup ? "Downloading..." : "Download Backup (CSV)"}
+                  {downloadingBackup ? "Preparing backup..." : "Download Backup (CSV)"}
                 </button>
 
                 <button
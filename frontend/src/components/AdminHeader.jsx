@@ -6,6 +6,12 @@ import useAuth from '../hooks/useAuth.js';
 import useFetchUser from "../hooks/useFetchUser.js";
 import api from "../api.js";
 import { getWebSocketUrl } from "../utils/getWebSocketUrl.js";
+import {
+  parseWsNotifications,
+  fetchUnreadSummary,
+  replayNotifications,
+  maxNotificationId,
+} from "../utils/wsMessages.js";
 
 export default function AdminHeader({ toggleSidebar }) {
   const [open, setOpen] = useState(false);
@@ -15,6 +21,7 @@ export default function AdminHeader({ toggleSidebar }) {
 
   const dropdownRef = useRef(null);
   const notifRef = useRef(null);
+  const lastNotificationIdRef = useRef(0);
   const location = useLocation();
   const navigate = useNavigate();
   const { logout } = useAuth();
@@ -105,10 +112,14 @@ export default function AdminHeader({ toggleSidebar }) {
 
     const loadNotifications = async () => {
       try {
-        const { data } = await api.get("/logs/notifications");
+        const [{ data }, summary] = await Promise.all([
+          api.get("/logs/notifications"),
+          fetchUnreadSummary(api),
+        ]);
         const items = Array.isArray(data) ? data.map(normalizeNotification) : [];
         setNotifications(items);
-        setUnreadCount(items.filter((item) => !item.is_read).length);
+        setUnreadCount(summary.unread_count);
+        lastNotificationIdRef.current = Math.max(lastNotificationIdRef.current, summary.last_id);
       } catch (error) {
         console.error("Failed to load notifications:", error);
       }
@@ -132,17 +143,36 @@ export default function AdminHeader({ toggleSidebar }) {
       }, 3000);
     };
 
+    // Catch up on anything created while the socket was down
+    const catchUp = async () => {
+      if (!lastNotificationIdRef.current) return;
+      try {
+        const missed = (await replayNotifications(api, lastNotificationIdRef.current))
+          .filter((n) => n.id > lastNotificationIdRef.current);
+        if (!missed.length) return;
+        lastNotificationIdRef.current = maxNotificationId(missed, lastNotificationIdRef.current);
+        setNotifications((prev) => [...missed.map(normalizeNotification).reverse(), ...prev]);
+        setUnreadCount((prev) => prev + missed.filter((n) => !n.is_read).length);
+      } catch (error) {
+        console.error("Failed to replay notifications:", error);
+      }
+    };
+
     ws.onopen = () => {
       console.log("✅ Admin WS Connected");
       clearTimeout(reconnectTimeout);
+      catchUp();
     };
 
     ws.onmessage = (event) => {
       try {
-        const incoming = JSON.parse(event.data);
+        const incoming = parseWsNotifications(event);
+        if (!incoming.length) return;
         console.log("📨 Notification received:", incoming);
-        setNotifications((prev) => [normalizeNotification(incoming), ...prev]);
-        setUnreadCount((prev) => prev + 1);
+        lastNotificationIdRef.current = maxNotificationId(incoming, lastNotificationIdRef.current);
+        const newNotifs = incoming.map(normalizeNotification).reverse();
+        setNotifications((prev) => [...newNotifs, ...prev]);
+        setUnreadCount((prev) => prev + newNotifs.length);
       } catch (error) {
         console.error("Error parsing notification:", error);
       }
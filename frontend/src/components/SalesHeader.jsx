@@ -6,6 +6,12 @@ import useAuth from "../hooks/useAuth.js";
 import useFetchUser from "../hooks/useFetchUser.js";
 import api from "../api.js";
 import { getWebSocketUrl } from "../utils/getWebSocketUrl.js";
+import {
+  parseWsNotifications,
+  fetchUnreadSummary,
+  replayNotifications,
+  maxNotificationId,
+} from "../utils/wsMessages.js";
 
 export default function SalesHeader({ toggleSidebar }) {
   const [open, setOpen] = useState(false);
@@ -15,6 +21,7 @@ export default function SalesHeader({ toggleSidebar }) {
 
   const dropdownRef = useRef(null);
   const notifRef = useRef(null);
+  const lastNotificationIdRef = useRef(0);
   const location = useLocation();
   const navigate = useNavigate();
   const { logout } = useAuth();
@@ -60,34 +67,41 @@ export default function SalesHeader({ toggleSidebar }) {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
+  // Audit log row -> notification shape used by the dropdown
+  const mapLogToNotif = (log) => {
+    // Extract entity ID from various possible sources
+    const entityId = log.entity_id || log.new_data?.id;
+    const entityType = (log.entity_type || "").toLowerCase();
+    
+    return normalizeNotif({
+      id: log.id,
+      type: log.notif_type || log.notification_type || log.type || deriveTypeFromLog(log),
+      title: log.title || log.description,
+      assignedBy: log.assignedBy || log.name,
+      createdAt: log.createdAt || log.timestamp,
+      read: log.is_read ?? log.read ?? false,
+      // Use entity_id based on entity_type
+      leadId: entityType === "lead" ? entityId : (log.leadId || log.lead_id),
+      taskId: entityType === "task" ? entityId : (log.taskId || log.task_id),
+      contactId: entityType === "contact" ? entityId : (log.contactId || log.contact_id),
+      dealId: entityType === "deal" ? entityId : (log.dealId || log.deal_id),
+      accountId: entityType === "account" ? entityId : (log.accountId || log.account_id),
+    });
+  };
+
   // Fetch history notifications on component mount and when user changes
   useEffect(() => {
     const fetchInitialNotifications = async () => {
       try {
-        const res = await api.get("/logs/notifications");
+        const [res, summary] = await Promise.all([
+          api.get("/logs/notifications"),
+          fetchUnreadSummary(api),
+        ]);
         console.log("📋 Fetched notifications from DB:", res.data);
-        const mappedLogs = (res.data || []).map((log) => {
-          // Extract entity ID from various possible sources
-          const entityId = log.entity_id || log.new_data?.id;
-          const entityType = (log.entity_type || "").toLowerCase();
-          
-          return normalizeNotif({
-            id: log.id,
-            type: log.notif_type || log.notification_type || log.type || deriveTypeFromLog(log),
-            title: log.title || log.description,
-            assignedBy: log.assignedBy || log.name,
-            createdAt: log.createdAt || log.timestamp,
-            read: log.is_read ?? log.read ?? false,
-            // Use entity_id based on entity_type
-            leadId: entityType === "lead" ? entityId : (log.leadId || log.lead_id),
-            taskId: entityType === "task" ? entityId : (log.taskId || log.task_id),
-            contactId: entityType === "contact" ? entityId : (log.contactId || log.contact_id),
-            dealId: entityType === "deal" ? entityId : (log.dealId || log.deal_id),
-            accountId: entityType === "account" ? entityId : (log.accountId || log.account_id),
-          });
-        });
+        const mappedLogs = (res.data || []).map(mapLogToNotif);
         setNotifications(mappedLogs);
-        setUnreadCount(mappedLogs.filter((n) => !n.read).length);
+        setUnreadCount(summary.unread_count);
+        lastNotificationIdRef.current = Math.max(lastNotificationIdRef.current, summary.last_id);
       } catch (err) {
         console.error("Failed to load history notifications", err);
       }
@@ -261,18 +275,37 @@ export default function SalesHeader({ toggleSidebar }) {
       }, 3000);
     };
 
+    // Catch up on anything created while the socket was down
+    const catchUp = async () => {
+      if (!lastNotificationIdRef.current) return;
+      try {
+        const missed = (await replayNotifications(api, lastNotificationIdRef.current))
+          .filter((log) => log.id > lastNotificationIdRef.current);
+        if (!missed.length) return;
+        lastNotificationIdRef.current = maxNotificationId(missed, lastNotificationIdRef.current);
+        const newNotifs = missed.map(mapLogToNotif).reverse();
+        setNotifications((prev) => [...newNotifs, ...prev]);
+        setUnreadCount((prev) => prev + newNotifs.filter((n) => !n.read).length);
+      } catch (err) {
+        console.error("Failed to replay notifications", err);
+      }
+    };
+
     ws.onopen = () => {
       console.log("✅ Sales WS Connected to:", wsUrl);
       clearTimeout(reconnectTimeout);
+      catchUp();
     };
 
     ws.onmessage = (event) => {
       try {
-        const incoming = JSON.parse(event.data);
+        const incoming = parseWsNotifications(event);
+        if (!incoming.length) return;
         console.log("📨 Notification received:", incoming);
-        const newNotif = normalizeNotif(incoming);
-        setNotifications((prev) => [newNotif, ...prev]);
-        setUnreadCount((prev) => prev + 1);
+        lastNotificationIdRef.current = maxNotificationId(incoming, lastNotificationIdRef.current);
+        const newNotifs = incoming.map(normalizeNotif).reverse();
+        setNotifications((prev) => [...newNotifs, ...prev]);
+        setUnreadCount((prev) => prev + newNotifs.length);
       } catch (error) {
         console.error("Error parsing notification:", error);
       }
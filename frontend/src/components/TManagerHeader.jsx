@@ -4,6 +4,12 @@ import { useLocation, useNavigate } from "react-router-dom";
 import useAuth from '../hooks/useAuth.js';
 import useFetchUser from "../hooks/useFetchUser.js";
 import api from "../api.js";
+import {
+  parseWsNotifications,
+  fetchUnreadSummary,
+  replayNotifications,
+  maxNotificationId,
+} from "../utils/wsMessages.js";
 
 export default function AdminHeader({ toggleSidebar }) {
   const [open, setOpen] = useState(false);
@@ -47,6 +53,7 @@ export default function AdminHeader({ toggleSidebar }) {
 
   const dropdownRef = useRef(null);
   const notifRef = useRef(null);
+  const lastNotificationIdRef = useRef(0);
   const location = useLocation();
   const navigate = useNavigate();
   const { logout } = useAuth();
@@ -110,10 +117,14 @@ export default function AdminHeader({ toggleSidebar }) {
 
     const loadNotifications = async () => {
       try {
-        const { data } = await api.get("/logs/notifications");
+        const [{ data }, summary] = await Promise.all([
+          api.get("/logs/notifications"),
+          fetchUnreadSummary(api),
+        ]);
         const items = Array.isArray(data) ? data.map(normalizeNotification) : [];
         setNotifications(items);
-        setUnreadCount(items.filter((item) => !item.is_read).length);
+        setUnreadCount(summary.unread_count);
+        lastNotificationIdRef.current = Math.max(lastNotificationIdRef.current, summary.last_id);
       } catch (error) {
         console.error("Failed to load notifications:", error);
       }
@@ -130,13 +141,32 @@ export default function AdminHeader({ toggleSidebar }) {
     const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
     const host = isLocalhost ? "localhost:8000" : window.location.host;
 
-    const wsUrl = `${protocol}//${host}/ws/notifications?user_id=${user.id}`;
+    const wsUrl = `${protocol}//${host}/ws/notifications?user_id=${user.id}&v=2`;
     const ws = new WebSocket(wsUrl);
 
+    // Catch up on anything created while the socket was down
+    const catchUp = async () => {
+      if (!lastNotificationIdRef.current) return;
+      try {
+        const missed = (await replayNotifications(api, lastNotificationIdRef.current))
+          .filter((n) => n.id > lastNotificationIdRef.current);
+        if (!missed.length) return;
+        lastNotificationIdRef.current = maxNotificationId(missed, lastNotificationIdRef.current);
+        setNotifications((prev) => [...missed.map(normalizeNotification).reverse(), ...prev]);
+        setUnreadCount((prev) => prev + missed.filter((n) => !n.is_read).length);
+      } catch (error) {
+        console.error("Failed to replay notifications:", error);
+      }
+    };
+
+    ws.onopen = () => catchUp();
+
     ws.onmessage = (event) => {
-      const incoming = JSON.parse(event.data);
-      setNotifications((prev) => [incoming, ...prev]);
-      setUnreadCount((prev) => prev + 1);
+      const incoming = parseWsNotifications(event);
+      if (!incoming.length) return;
+      lastNotificationIdRef.current = maxNotificationId(incoming, lastNotificationIdRef.current);
+      setNotifications((prev) => [...incoming.reverse(), ...prev]);
+      setUnreadCount((prev) => prev + incoming.length);
     };
 
     return () => ws.close();
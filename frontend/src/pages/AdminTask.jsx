@@ -20,6 +20,7 @@ import useFetchUser from "../hooks/useFetchUser";
 import LoadingSpinner from "../components/LoadingSpinner.jsx";
 import { useLocation, useNavigate } from "react-router-dom";
 import { getWebSocketUrl } from "../utils/getWebSocketUrl";
+import { parseWsNotifications } from "../utils/wsMessages";
 import {
   DndContext,
   DragOverlay,
@@ -503,14 +504,16 @@ export default function AdminTask() {
       
       ws.onmessage = (event) => {
         try {
-          const notification = JSON.parse(event.data);
-          if (notification.type === 'task_status_updated') {
+          const updates = parseWsNotifications(event).filter(
+            (notification) => notification.type === 'task_status_updated'
+          );
+          updates.forEach((notification) => {
             toast.info(
               `📋 ${notification.message}`,
               { position: "top-right", autoClose: 4000 }
             );
-            fetchTasks();
-          }
+          });
+          if (updates.length) fetchTasks();
         } catch (error) {
           console.error('Error parsing notification:', error);
         }
@@ -37,6 +37,7 @@ import useFetchUser from "../hooks/useFetchUser";
 import LoadingSpinner from "../components/LoadingSpinner";
 import AdminTabs from "../components/AdminTabs";
 import FunnelWidget from "../components/FunnelWidget";
+import { parseWsNotifications } from "../utils/wsMessages";
 import { LineChart } from "@mui/x-charts/LineChart";
 
 // --- Icon Components using React Icons ---
@@ -2874,7 +2875,7 @@ const SalesOverview = () => {
         window.location.hostname === "localhost"
           ? "localhost:8000"
           : window.location.host;
-      const wsUrl = `${wsProtocol}//${wsHost}/ws/notifications?user_id=${user.id}`;
+      const wsUrl = `${wsProtocol}//${wsHost}/ws/notifications?user_id=${user.id}&v=2`;
 
       try {
         const ws = new WebSocket(wsUrl);
@@ -2887,34 +2888,33 @@ const SalesOverview = () => {
 
         ws.onmessage = (event) => {
           try {
-            const notification = JSON.parse(event.data);
-            console.log("🔔 Real-time notification received:", notification);
-
-            // Refresh data when we receive notifications about changes
-            if (notification.event) {
-              const refreshEvents = [
-                "new_task",
-                "task_updated",
-                "new_lead",
-                "lead_updated",
-                "new_deal",
-                "deal_updated",
-                "new_account",
-                "account_updated",
-                "new_meeting",
-                "meeting_updated",
-                "new_call",
-                "call_updated",
-              ];
-
-              if (refreshEvents.includes(notification.event)) {
-                console.log(
-                  "🔄 Refreshing dashboard due to:",
-                  notification.event
-                );
-                fetchAllData();
-                setLastUpdate(new Date());
-              }
+            const notifications = parseWsNotifications(event);
+            if (!notifications.length) return;
+            console.log("🔔 Real-time notification received:", notifications);
+
+            // Refresh data (once per frame) when we receive notifications about changes
+            const refreshEvents = [
+              "new_task",
+              "task_updated",
+              "new_lead",
+              "lead_updated",
+              "new_deal",
+              "deal_updated",
+              "new_account",
+              "account_updated",
+              "new_meeting",
+              "meeting_updated",
+              "new_call",
+              "call_updated",
+            ];
+            const trigger = notifications.find((notification) =>
+              refreshEvents.includes(notification.event)
+            );
+
+            if (trigger) {
+              console.log("🔄 Refreshing dashboard due to:", trigger.event);
+              fetchAllData();
+              setLastUpdate(new Date());
             }
           } catch (error) {
             console.error("Error parsing WebSocket message:", error);
@@ -21,6 +21,7 @@ import useFetchUser from "../hooks/useFetchUser";
 import LoadingSpinner from "../components/LoadingSpinner.jsx";
 import { useLocation, useNavigate } from "react-router-dom";
 import { getWebSocketUrl } from "../utils/getWebSocketUrl";
+import { parseWsNotifications } from "../utils/wsMessages";
 import {
   DndContext,
   DragOverlay,
@@ -494,17 +495,19 @@ export default function AdminTask() {
       
       ws.onmessage = (event) => {
         try {
-          const notification = JSON.parse(event.data);
+          const updates = parseWsNotifications(event).filter(
+            (notification) => notification.type === 'task_status_updated'
+          );
           
           // Handle task status update notifications
-          if (notification.type === 'task_status_updated') {
+          updates.forEach((notification) => {
             toast.info(
               `📋 ${notification.message}`,
               { position: "top-right", autoClose: 4000 }
             );
-            // Refresh tasks to show updated status
-            fetchTasks();
-          }
+          });
+          // Refresh tasks once per frame to show updated status
+          if (updates.length) fetchTasks();
         } catch (error) {
           console.error('Error parsing notification:', error);
         }
@@ -17,13 +17,13 @@ export const getWebSocketUrl = (userId) => {
     const port = apiUrlObj.port || (apiUrlObj.protocol === 'https:' ? 443 : 80);
     
     // Construct WebSocket URL
-    const wsUrl = `${protocol}://${hostname}:${port}/ws/notifications?user_id=${userId}`;
+    const wsUrl = `${protocol}://${hostname}:${port}/ws/notifications?user_id=${userId}&v=2`;
     console.log("📡 WebSocket URL:", wsUrl);
     
     return wsUrl;
   } catch (error) {
     console.error("Error parsing API URL:", error);
     // Fallback to localhost
-    return `ws://localhost:8000/ws/notifications?user_id=${userId}`;
+    return `ws://localhost:8000/ws/notifications?user_id=${userId}&v=2`;
   }
 };
@@ -0,0 +1,47 @@
+/**
+ * Unpack a notification WebSocket frame (protocol v=2)
+ * Bursts arrive as one {type: "batch", items: [...]} frame and the server sends
+ * {type: "ping"} heartbeats, which carry no notification
+ * @param {MessageEvent} event - The WebSocket message event
+ * @returns {Array<object>} The notifications in the order they were sent
+ */
+export const parseWsNotifications = (event) => {
+  const message = JSON.parse(event.data);
+
+  if (message?.type === "ping") return [];
+  if (message?.type === "batch") {
+    return (message.items || []).filter((item) => item?.type !== "ping");
+  }
+  return [message];
+};
+
+/**
+ * Badge count and replay cursor for the bell icon
+ * @param {object} api - The axios instance
+ * @returns {Promise<{unread_count: number, last_id: number}>}
+ */
+export const fetchUnreadSummary = async (api) => {
+  const { data } = await api.get("/logs/notifications/unread-count");
+  return { unread_count: data?.unread_count || 0, last_id: data?.last_id || 0 };
+};
+
+/**
+ * Notifications created after `sinceId` (oldest first), used to catch up after
+ * the WebSocket (re)connects instead of reloading the whole list
+ * @param {object} api - The axios instance
+ * @param {number} sinceId - Highest notification id the client already has
+ * @returns {Promise<Array<object>>}
+ */
+export const replayNotifications = async (api, sinceId) => {
+  const { data } = await api.get("/logs/notifications", { params: { since: sinceId } });
+  return Array.isArray(data) ? data : [];
+};
+
+/**
+ * Highest numeric notification id in `items`, or `current` if none is higher
+ * @param {Array<object>} items - Notifications (raw or normalized)
+ * @param {number} current - The cursor so far
+ * @returns {number}
+ */
+export const maxNotificationId = (items, current = 0) =>
+  items.reduce((max, item) => (Number.isInteger(item?.id) && item.id > max ? item.id : max), current);
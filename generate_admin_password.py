@@ -1,6 +1,7 @@
 """
 Helper script to generate password hashes for Super Admin accounts.
-Run this script to generate a bcrypt hash for your desired password.
+Run this script to generate an Argon2 hash for your desired password
+(the same settings the backend uses; see backend/services/password_hashing.py).
 
 Usage:
     python generate_admin_password.py
@@ -12,9 +13,7 @@ import os
 # Add backend directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from services.password_hashing import pwd_context
 
 def generate_password_hash():
     print("=" * 60)
@@ -78,4 +77,4 @@ if __name__ == "__main__":
         print("\n\nAborted by user.")
     except Exception as e:
         print(f"\n❌ Error: {e}")
-        print("\nMake sure you have passlib installed: pip install passlib[bcrypt]")
+        print("\nMake sure you have passlib and argon2-cffi installed: pip install passlib argon2-cffi")